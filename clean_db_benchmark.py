@@ -0,0 +1,949 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import clean_db_builder as builder
+
+# ============================================================================
+# BENCHMARK CONFIGURATION
+# ============================================================================
+# Runs against a dedicated local database: every benchmark table is dropped and
+# reloaded. The database name must contain "bench" as a guard against pointing this
+# at a real one.
+BENCH_DSN = os.environ.get("CLEAN_DB_BENCH_DSN", "dbname=clean_db_bench host=localhost")
+BENCH_REPORT_DIR = "benchmark_reports"
+
+# Scales are the number of athlete_fact rows; every other table is sized from it.
+BENCH_SCALES = {
+    "1m": 1_000_000,
+    "10m": 10_000_000,
+    "100m": 100_000_000,
+}
+FACTS_PER_ATHLETE = 25
+STAT_ROWS_PER_FACT = 2          # stat is the largest source table in production
+ATHLETES_PER_SCHOOL = 50
+TP_PAGE_SHARE = 0.3             # athletes with a transfer portal entry (main_tp_page)
+OFFERS_PER_ATHLETE = 0.6
+HONORS_PER_ATHLETE = 0.2
+CAMP_ATTENDANCE_PER_ATHLETE = 0.3
+CAMP_EVENTS = 2_000
+BENCH_USERS = 500               # simulated app users in user_package_access
+LOAD_BATCH_ROWS = 5_000_000     # rows per INSERT when loading the large tables
+
+# A timing this much slower than the baseline report is flagged as a regression
+REGRESSION_THRESHOLD = 1.2
+
+# Read benchmark: app queries replayed against each tier view of these sports, as
+# simulated users (auth.uid() is set per query). A share of the queries come from users
+# without the view's package, who still pay for the entitlement check.
+READ_SUFFIXES = ["fb", "bsb", "wbb"]
+READ_ITERATIONS = 200           # queries per (view, query shape)
+READ_CONCURRENCY = 8
+READ_DENIED_SHARE = 0.2
+READ_PAGE_SIZE = 25
+READ_MAX_PAGE = 8
+READ_PARAM_SAMPLE = 200         # MV rows sampled for realistic filter values
+
+# Pivot benchmark: the SELECT of each pivot MV is EXPLAIN ANALYZEd under every pivot
+# strategy (see PIVOT_STRATEGY in clean_db_builder.py). It builds no MV, but it creates
+# the tablefunc extension for crosstab and runs the full pivots under their heavy
+# session profile. Pointing it at a database whose name lacks "bench" (e.g. a copy of
+# production with its MVs built) needs --allow-non-bench.
+PIVOT_MVS = ["mv_athlete_fact_wide", "mv_athlete_stat_wide", "mv_school_fact_wide"]
+PIVOT_STRATEGIES = ["case", "filter", "jsonb", "crosstab"]
+PIVOT_REPEATS = 3               # runs per (MV, strategy); the median is reported
+
+# Entitlement benchmark: the package check of the tier views, inline EXISTS versus the
+# has_any_package() lookup, over one sport's rows of mv_tp_athletes_wide, for an entitled
+# and a denied user. Reports time and whether the check ran once per row.
+ENTITLEMENT_REPEATS = 20        # runs per (sport, check, user); the median is reported
+ENTITLEMENT_CHECKS = {
+    "exists": """EXISTS (
+        SELECT 1 FROM public.user_package_access upa
+        WHERE upa.user_id = auth.uid() AND upa.customer_package_id IN ({packages})
+    )""",
+    "function": builder.package_check_sql("{packages}"),
+}
+
+# Typical app queries: name -> (columns the view must expose, query). %(limit)s and
+# %(offset)s paginate; other parameters are filled from sampled rows of the view's MV.
+READ_QUERIES = {
+    "list": (
+        {"athlete_last_name"},
+        "SELECT * FROM public.{view} ORDER BY athlete_last_name, athlete_id LIMIT %(limit)s OFFSET %(offset)s",
+    ),
+    "by_school": (
+        {"school_id", "athlete_last_name"},
+        "SELECT * FROM public.{view} WHERE school_id = %(school_id)s "
+        "ORDER BY athlete_last_name, athlete_id LIMIT %(limit)s",
+    ),
+    "by_position_grad_year": (
+        {"primary_position", "grad_year", "athlete_last_name"},
+        "SELECT * FROM public.{view} WHERE primary_position = %(primary_position)s AND grad_year = %(grad_year)s "
+        "ORDER BY athlete_last_name, athlete_id LIMIT %(limit)s OFFSET %(offset)s",
+    ),
+    "feed_recent": (
+        {"offer_created_at"},
+        "SELECT * FROM public.{view} ORDER BY offer_created_at DESC LIMIT %(limit)s OFFSET %(offset)s",
+    ),
+    "feed_by_position_grad_year": (
+        {"afw_primary_position", "afw_grad_year", "offer_created_at"},
+        "SELECT * FROM public.{view} WHERE afw_primary_position = %(afw_primary_position)s "
+        "AND afw_grad_year = %(afw_grad_year)s ORDER BY offer_created_at DESC LIMIT %(limit)s OFFSET %(offset)s",
+    ),
+}
+
+# Relative frequency of each athlete_fact / athlete_stat data_type_id (default 1). The
+# profile basics are present for nearly every athlete; most other facts are sparse.
+FACT_TYPE_WEIGHTS = {
+    1: 12, 2: 12, 4: 10, 5: 10, 6: 10, 7: 8, 1015: 10, 308: 6, 35: 6, 13: 5,
+    23: 5, 24: 6, 250: 4, 1048: 2, 1062: 2, 1026: 3,
+}
+STAT_TYPE_WEIGHTS = {98: 20, 84: 5}  # gp (98) is written for every athlete-season
+
+# Share of athletes per sport (sport_id); unlisted sports in view_configs get 1
+SPORT_WEIGHTS = {21: 30, 6: 8, 7: 6, 3: 6, 4: 6, 1: 5, 2: 5, 5: 5}
+
+SCHOOL_TYPES = [("High School", 70), ("University/College", 20), ("Junior College", 8), ("Dropped", 2)]
+CONF_GROUPS = [("P4", 5), ("G5", 5), ("FCS", 10), ("D2", 15), ("D3", 20), ("NAIA", 10), ("JUCO", 10), ("Other", 25)]
+CONFERENCES = [("ACC", 3), ("Big 12", 3), ("Big 10", 3), ("SEC", 3), ("MAC", 4), ("Sun Belt", 4), ("Other", 80)]
+
+# Values for the facts the MVs and views actually filter or compute on; every other
+# fact gets a short random string.
+FACT_VALUE_SQL = {
+    1: "(ARRAY['FR','SO','JR','SR','GR'])[1 + floor(random() * 5)::int]",
+    2: "(ARRAY['QB','RB','WR','TE','OL','DL','LB','DB','K','P'])[1 + floor(random() * 10)::int]",
+    4: "(5 + floor(random() * 2))::text",
+    5: "floor(random() * 12)::text",
+    6: "(150 + floor(random() * 170))::text",
+    35: "round((2 + random() * 2)::numeric, 2)::text",
+    250: "(ARRAY['true','false'])[1 + floor(random() * 2)::int]",
+    308: "(2021 + floor(random() * 5))::text",
+    1015: "(2025 + floor(random() * 5))::text",
+    1026: "(ARRAY['FBS P4','FBS G5','FCS','D2','D3','D3 Walk-On'])[1 + floor(random() * 6)::int]",
+    1048: "CASE WHEN random() < 0.05 THEN '1' END",
+    1062: "(20000 + floor(random() * 200000))::text",
+}
+SCHOOL_FACT_VALUE_SQL = {
+    117: "{school_type}",
+    252: "{conf_group}",
+    259: "{conference}",
+    966: "(1 + floor(random() * 3000))::text",
+    982: "(ARRAY['Yes','No'])[1 + floor(random() * 2)::int]",
+    907: "round((25 + random() * 20)::numeric, 5)::text",
+    908: "round((-120 + random() * 45)::numeric, 5)::text",
+}
+
+
+safe_print = builder.safe_print
+
+
+def weighted_pick_sql(weighted_values, quote=True) -> str:
+    """SQL expression picking one of `weighted_values` ((value, weight) pairs) per row."""
+    items = []
+    for value, weight in weighted_values:
+        items += [f"'{value}'" if quote else str(value)] * weight
+    return f"(ARRAY[{', '.join(items)}])[1 + floor(random() * {len(items)})::int]"
+
+
+def weighted_ids(mapping: dict, weights: dict) -> list:
+    return [(dtid, weights.get(dtid, 1)) for dtid in sorted(mapping)]
+
+
+def athlete_id_sql(n_sql: str) -> str:
+    """Deterministic uuid for synthetic athlete number `n_sql`, so facts need no join to pick one."""
+    return f"md5('athlete' || ({n_sql}))::uuid"
+
+
+def random_athlete_sql(n_athletes: int) -> str:
+    return athlete_id_sql(f"1 + floor(random() * {n_athletes})::bigint")
+
+
+def school_id_sql(n_sql: str) -> str:
+    """Deterministic uuid for synthetic school number `n_sql`, like athlete_id_sql."""
+    return f"md5('school' || ({n_sql}))::uuid"
+
+
+def random_school_sql(n_schools: int) -> str:
+    return school_id_sql(f"1 + floor(random() * {n_schools})::bigint")
+
+
+def value_case_sql(value_sql: dict, column: str = "data_type_id") -> str:
+    """CASE over data_type_id producing a realistic value where one is defined."""
+    whens = "\n            ".join(f"WHEN {dtid} THEN {expr}" for dtid, expr in value_sql.items())
+    return f"""CASE {column}
+            {whens}
+            ELSE substr(md5(random()::text), 1, 12)
+        END"""
+
+
+def scale_sizes(fact_rows: int) -> dict:
+    """Row counts for every table at a given scale."""
+    athletes = max(1_000, fact_rows // FACTS_PER_ATHLETE)
+    return {
+        "athlete_fact": fact_rows,
+        "athlete": athletes,
+        "stat": fact_rows * STAT_ROWS_PER_FACT,
+        "school": max(500, athletes // ATHLETES_PER_SCHOOL),
+        "main_tp_page": int(athletes * TP_PAGE_SHARE),
+        "offer": int(athletes * OFFERS_PER_ATHLETE),
+        "athlete_honor": int(athletes * HONORS_PER_ATHLETE),
+        "camp_attendance": int(athletes * CAMP_ATTENDANCE_PER_ATHLETE),
+        "camp_event": CAMP_EVENTS,
+        "user_package_access": BENCH_USERS,
+    }
+
+
+# ============================================================================
+# SCHEMA
+# ============================================================================
+# Source tables with the columns the builder reads, plus stand-ins for what Supabase
+# provides: auth.uid() reads the request.jwt.claim.sub GUC, as PostgREST sets it.
+SCHEMA_SQL = [
+    "DROP SCHEMA IF EXISTS intermediate CASCADE;",
+    f"DROP SCHEMA IF EXISTS {builder.SHADOW_SCHEMA} CASCADE;",
+    f"DROP SCHEMA IF EXISTS {builder.RETIRED_SCHEMA} CASCADE;",
+    "CREATE SCHEMA intermediate;",
+    "CREATE SCHEMA IF NOT EXISTS auth;",
+    """CREATE OR REPLACE FUNCTION auth.uid() RETURNS uuid
+    LANGUAGE sql STABLE AS $$
+        SELECT NULLIF(current_setting('request.jwt.claim.sub', true), '')::uuid
+    $$;""",
+    """DROP TABLE IF EXISTS athlete_fact, stat, athlete, school, school_fact, county, state,
+        athlete_school, sport_season_selector, athlete_honor, offer, main_tp_page,
+        details_tp_page, camp_event, camp_attendance, coach_stub, user_package_access CASCADE;""",
+    """CREATE TABLE athlete (
+        id uuid PRIMARY KEY, sport_id int, first_name text, last_name text,
+        knack_id text, created_at timestamptz
+    );""",
+    """CREATE TABLE athlete_fact (
+        id bigserial PRIMARY KEY, athlete_id uuid, data_type_id int, value text,
+        inactive timestamptz, created_at timestamptz
+    );""",
+    """CREATE TABLE stat (
+        id bigserial PRIMARY KEY, athlete_id uuid, data_type_id int, value text,
+        season int, game_id bigint, created_at timestamptz
+    );""",
+    "CREATE TABLE school (id uuid PRIMARY KEY, name text);",
+    """CREATE TABLE school_fact (
+        id bigserial PRIMARY KEY, school_id uuid, data_type_id int, value text,
+        inactive timestamptz, created_at timestamptz
+    );""",
+    "CREATE TABLE state (id bigint PRIMARY KEY, name text, abbrev text);",
+    "CREATE TABLE county (id bigint PRIMARY KEY, name text, state_id bigint);",
+    """CREATE TABLE athlete_school (
+        id bigserial PRIMARY KEY, athlete_id uuid, school_id uuid, start_date date, end_date date
+    );""",
+    "CREATE TABLE sport_season_selector (sport_id int, is_juco boolean, season int);",
+    "CREATE TABLE athlete_honor (id bigserial PRIMARY KEY, athlete_id uuid, award text);",
+    """CREATE TABLE offer (
+        id bigserial PRIMARY KEY, athlete_id uuid, school_id uuid, type text, source text,
+        created_at timestamptz, coach_ask_to_remove timestamptz, ended_at timestamptz,
+        walk_on boolean, offer_date date
+    );""",
+    """CREATE TABLE main_tp_page (
+        id bigserial PRIMARY KEY, athlete_id uuid, school_id uuid, ncaa_id text,
+        initiated_date timestamptz, last_updated timestamptz, knack_id text, first_name text,
+        last_name text, year text, division text, sport text, conference text, status text,
+        link text, created_at timestamptz, designated_student_athlete boolean
+    );""",
+    """CREATE TABLE details_tp_page (
+        id bigserial PRIMARY KEY, main_tp_page_id bigint, ok_to_contact boolean,
+        is_transfer_graduate_student boolean, is_receiving_athletic_aid boolean,
+        is_recruited boolean, commit text, db_update timestamptz, expected_grad_date date,
+        is_four_year_transfer boolean, athlete_survey_sent boolean, is_aid_cancelled boolean,
+        comments text, link text, email text
+    );""",
+    """CREATE TABLE camp_event (
+        id bigint PRIMARY KEY, start_date date, source text, org text, name text, state_id bigint
+    );""",
+    "CREATE TABLE camp_attendance (id bigserial PRIMARY KEY, athlete_id uuid, event_id bigint);",
+    """CREATE TABLE coach_stub (
+        school_id uuid, sport_id int, coach_id bigint, first_name text, last_name text,
+        coach_facts_json jsonb
+    );""",
+    "CREATE TABLE user_package_access (user_id uuid, customer_package_id bigint);",
+    """CREATE OR REPLACE VIEW athlete_with_school AS
+    SELECT a.id, a.sport_id, a.first_name, a.last_name, s.id AS school_id, s.name AS school_name
+    FROM athlete a
+    LEFT JOIN athlete_school aths ON aths.athlete_id = a.id AND aths.end_date IS NULL
+    LEFT JOIN school s ON s.id = aths.school_id;""",
+    """CREATE OR REPLACE VIEW vw_school_active_coach_with_facts AS
+    SELECT school_id, sport_id, coach_id, first_name, last_name, coach_facts_json
+    FROM coach_stub;""",
+]
+
+
+def bench_user_id_sql(n_sql: str) -> str:
+    return f"md5('bench-user' || ({n_sql}))::uuid"
+
+
+def batched_insert(table: str, total: int, select_sql: str):
+    """INSERT `total` rows from `select_sql` (a SELECT over generate_series(lo, hi) AS g(n)) in batches."""
+    started = time.monotonic()
+    for lo in range(1, total + 1, LOAD_BATCH_ROWS):
+        hi = min(total, lo + LOAD_BATCH_ROWS - 1)
+        builder.run_sql(select_sql.format(lo=lo, hi=hi), profile="unbounded")
+        safe_print(f"[LOAD] {table}: {hi:,}/{total:,} rows")
+    return time.monotonic() - started
+
+
+def load_data(sizes: dict) -> dict:
+    """Fill the benchmark schema with synthetic data sized by `sizes`; returns load seconds per table."""
+    n_athletes, n_schools = sizes["athlete"], sizes["school"]
+    sport_ids = [(c["sport_id"], SPORT_WEIGHTS.get(c["sport_id"], 1)) for c in builder.view_configs]
+    fact_types = weighted_ids(builder.athlete_fact_mapping, FACT_TYPE_WEIGHTS)
+    stat_types = weighted_ids(builder.athlete_stat_mapping, STAT_TYPE_WEIGHTS)
+    timings = {}
+
+    started = time.monotonic()
+    builder.run_sql("""
+    INSERT INTO state (id, name, abbrev)
+    SELECT n, 'State ' || n, 'S' || n FROM generate_series(1, 60) AS g(n);""")
+    builder.run_sql("""
+    INSERT INTO county (id, name, state_id)
+    SELECT n, 'County ' || n, 1 + n % 60 FROM generate_series(1, 3000) AS g(n);""")
+    builder.run_sql(f"""
+    INSERT INTO camp_event (id, start_date, source, org, name, state_id)
+    SELECT n, date '2020-01-01' + floor(random() * 2000)::int,
+        (ARRAY['Rivals','247','Camp Site'])[1 + floor(random() * 3)::int],
+        CASE WHEN random() < 0.5 THEN 'Org ' || n % 100 END, 'Camp ' || n, 1 + n % 60
+    FROM generate_series(1, {CAMP_EVENTS}) AS g(n);""")
+    builder.run_sql(f"""
+    INSERT INTO sport_season_selector (sport_id, is_juco, season)
+    SELECT sport_id, is_juco, 2025
+    FROM unnest(ARRAY[{', '.join(str(c['sport_id']) for c in builder.view_configs)}]) AS sport_id
+    CROSS JOIN (VALUES (true), (false)) AS j(is_juco);""")
+    timings["reference"] = time.monotonic() - started
+
+    timings["school"] = batched_insert("school", n_schools, f"""
+    INSERT INTO school (id, name) SELECT {school_id_sql('n')}, 'School ' || n FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+
+    school_fact_values = {
+        dtid: expr.format(
+            school_type=weighted_pick_sql(SCHOOL_TYPES),
+            conf_group=weighted_pick_sql(CONF_GROUPS),
+            conference=weighted_pick_sql(CONFERENCES),
+        )
+        for dtid, expr in SCHOOL_FACT_VALUE_SQL.items()
+    }
+    sparse_school_types = ", ".join(str(d) for d in sorted(builder.school_fact_mapping) if d not in SCHOOL_FACT_VALUE_SQL)
+    timings["school_fact"] = batched_insert("school_fact", n_schools, f"""
+    INSERT INTO school_fact (school_id, data_type_id, value, created_at)
+    SELECT {school_id_sql('s.n')}, t.data_type_id, {value_case_sql(school_fact_values, 't.data_type_id')}, now() - random() * interval '3 years'
+    FROM generate_series({{lo}}, {{hi}}) AS s(n)
+    CROSS JOIN unnest(ARRAY[{', '.join(str(d) for d in SCHOOL_FACT_VALUE_SQL)}, {sparse_school_types}]) AS t(data_type_id)
+    WHERE t.data_type_id IN ({', '.join(str(d) for d in SCHOOL_FACT_VALUE_SQL)}) OR random() < 0.3;""")
+    builder.run_sql(f"""
+    INSERT INTO coach_stub (school_id, sport_id, coach_id, first_name, last_name, coach_facts_json)
+    SELECT {school_id_sql('n')}, 21, n, 'Coach', 'Number ' || n, jsonb_build_object('email', 'coach' || n || '@example.com')
+    FROM generate_series(1, {n_schools}) AS g(n)
+    WHERE random() < 0.2;""")
+
+    timings["athlete"] = batched_insert("athlete", n_athletes, f"""
+    INSERT INTO athlete (id, sport_id, first_name, last_name, knack_id, created_at)
+    SELECT {athlete_id_sql('n')}, {weighted_pick_sql(sport_ids, quote=False)},
+        'First' || n, 'Last' || n, 'k' || n, now() - random() * interval '5 years'
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+    timings["athlete_school"] = batched_insert("athlete_school", n_athletes, f"""
+    INSERT INTO athlete_school (athlete_id, school_id, start_date, end_date)
+    SELECT {athlete_id_sql('n')}, {random_school_sql(n_schools)}, date '2021-08-01', NULL
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+
+    timings["athlete_fact"] = batched_insert("athlete_fact", sizes["athlete_fact"], f"""
+    INSERT INTO athlete_fact (athlete_id, data_type_id, value, inactive, created_at)
+    SELECT athlete_id, data_type_id, {value_case_sql(FACT_VALUE_SQL)},
+        CASE WHEN random() < 0.05 THEN now() END, now() - random() * interval '3 years'
+    FROM (
+        SELECT {random_athlete_sql(n_athletes)} AS athlete_id,
+            {weighted_pick_sql(fact_types, quote=False)} AS data_type_id
+        FROM generate_series({{lo}}, {{hi}}) AS g(n)
+    ) f;""")
+
+    timings["stat"] = batched_insert("stat", sizes["stat"], f"""
+    INSERT INTO stat (athlete_id, data_type_id, value, season, game_id, created_at)
+    SELECT {random_athlete_sql(n_athletes)}, {weighted_pick_sql(stat_types, quote=False)},
+        round((random() * 60)::numeric, 1)::text,
+        2023 + floor(random() * 3)::int,
+        CASE WHEN random() < 0.6 THEN n END,
+        now() - random() * interval '3 years'
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+
+    timings["main_tp_page"] = batched_insert("main_tp_page", sizes["main_tp_page"], f"""
+    INSERT INTO main_tp_page (athlete_id, school_id, ncaa_id, initiated_date, last_updated, knack_id,
+        first_name, last_name, year, division, sport, conference, status, link, created_at,
+        designated_student_athlete)
+    SELECT {random_athlete_sql(n_athletes)}, {random_school_sql(n_schools)}, (1000000 + n)::text,
+        now() - random() * interval '2 years', now() - random() * interval '30 days', 'tp' || n,
+        'First' || n, 'Last' || n, (ARRAY['FR','SO','JR','SR'])[1 + floor(random() * 4)::int],
+        (ARRAY['D1','D2','D3'])[1 + floor(random() * 3)::int], 'Sport', {weighted_pick_sql(CONFERENCES)},
+        (ARRAY['Active','Withdrawn','Committed'])[1 + floor(random() * 3)::int], 'https://example.com/' || n,
+        now() - random() * interval '2 years', random() < 0.1
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+    timings["details_tp_page"] = batched_insert("details_tp_page", sizes["main_tp_page"], """
+    INSERT INTO details_tp_page (main_tp_page_id, ok_to_contact, is_receiving_athletic_aid, is_recruited,
+        expected_grad_date, email)
+    SELECT n, random() < 0.8, random() < 0.5, random() < 0.3, date '2026-05-01', 'athlete' || n || '@example.com'
+    FROM generate_series({lo}, {hi}) AS g(n);""")
+
+    timings["offer"] = batched_insert("offer", sizes["offer"], f"""
+    INSERT INTO offer (athlete_id, school_id, type, source, created_at, coach_ask_to_remove, walk_on, offer_date)
+    SELECT {random_athlete_sql(n_athletes)}, {random_school_sql(n_schools)},
+        {weighted_pick_sql([("offer", 80), ("commit", 10), ("signed", 10)])},
+        (ARRAY['twitter','coach','rivals'])[1 + floor(random() * 3)::int],
+        now() - random() * interval '2 years', CASE WHEN random() < 0.01 THEN now() END,
+        random() < 0.05, current_date - floor(random() * 700)::int
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+    timings["athlete_honor"] = batched_insert("athlete_honor", sizes["athlete_honor"], f"""
+    INSERT INTO athlete_honor (athlete_id, award)
+    SELECT {random_athlete_sql(n_athletes)},
+        (ARRAY['All American','All Region','All Conference','Rookie All Conference','Academic'])[1 + floor(random() * 5)::int]
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+    timings["camp_attendance"] = batched_insert("camp_attendance", sizes["camp_attendance"], f"""
+    INSERT INTO camp_attendance (athlete_id, event_id)
+    SELECT {random_athlete_sql(n_athletes)}, 1 + floor(random() * {CAMP_EVENTS})::bigint
+    FROM generate_series({{lo}}, {{hi}}) AS g(n);""")
+
+    # Each user holds one to three packages drawn from the view configs
+    package_ids = sorted({
+        value
+        for config in builder.view_configs
+        for key, value in config.items()
+        if key.endswith("package_id") and value is not None
+    } | set(builder.EXTRA_FULL_ACCESS_PKGS))
+    builder.run_sql(f"""
+    INSERT INTO user_package_access (user_id, customer_package_id)
+    SELECT DISTINCT {bench_user_id_sql('u.n')}, p.package_id
+    FROM generate_series(1, {BENCH_USERS}) AS u(n)
+    CROSS JOIN LATERAL (
+        SELECT (ARRAY[{', '.join(str(p) for p in package_ids)}])[1 + floor(random() * {len(package_ids)})::int] AS package_id
+        FROM generate_series(1, 1 + (u.n % 3))
+    ) p;""")
+
+    builder.run_sql("ANALYZE;", profile="unbounded")
+    return {table: round(seconds, 3) for table, seconds in timings.items()}
+
+
+def source_table_sizes() -> dict:
+    rows = builder.fetch_all("""
+    SELECT c.relname, c.reltuples::bigint, pg_total_relation_size(c.oid)
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind = 'r';""")
+    return {name: {"rows": rows_estimate, "size_bytes": size} for name, rows_estimate, size in rows}
+
+
+# ============================================================================
+# BUILD BENCHMARK
+# ============================================================================
+def configure_builder(dsn: str):
+    """Point the builder at the benchmark database and make it build everything, unconditionally."""
+    builder.DB_SETTINGS = {"dsn": dsn}
+    builder.close_pool()
+    builder.CREATE_SOURCE_INDEXES = True
+    builder.START_FROM_MV = None
+    builder.SKIP_UNCHANGED_MVS = False
+    builder.SKIP_UNCHANGED_VIEWS = False
+    builder.BUILD_JOURNAL_PATH = None
+    builder.VIEW_TARGETS = None
+    for mv_name in builder.BUILD_MVS:
+        builder.BUILD_MVS[mv_name] = True
+    for group in builder.BUILD_VIEWS:
+        builder.BUILD_VIEWS[group] = True
+
+
+def check_bench_database():
+    ((database,),) = builder.fetch_all("SELECT current_database();")
+    if "bench" not in database:
+        raise SystemExit(
+            f"clean_db_benchmark: refusing to run against '{database}' "
+            "(the database name must contain 'bench')"
+        )
+
+
+def run_build_benchmark(scale: str, dsn: str, skip_load: bool = False) -> dict:
+    """Load `scale` worth of synthetic data, run a full build and return the report."""
+    configure_builder(dsn)
+    check_bench_database()
+    sizes = scale_sizes(BENCH_SCALES[scale])
+    load_seconds = {}
+    if not skip_load:
+        safe_print(f"[BENCH] Creating schema and loading the {scale} scale: {sizes}")
+        for stmt in SCHEMA_SQL:
+            builder.run_sql(stmt)
+        load_seconds = load_data(sizes)
+
+    # A fresh report so the load statements are not counted as build time
+    builder.build_report = builder.BuildReport()
+    builder.build_journal = builder.BuildJournal()
+    started = time.monotonic()
+    builder.main(["--dsn", dsn])
+    build_seconds = time.monotonic() - started
+
+    return {
+        "suite": "build",
+        "scale": scale,
+        "fact_rows": BENCH_SCALES[scale],
+        "generated_at": datetime.datetime.now().isoformat(),
+        "mv_build_mode": builder.MV_BUILD_MODE,
+        "mv_build_concurrency": builder.MV_BUILD_CONCURRENCY,
+        "planned_rows": sizes,
+        "source_tables": source_table_sizes(),
+        "load_s": load_seconds,
+        "build_s": round(build_seconds, 3),
+        "targets": builder.build_report.totals_by_target(),
+    }
+
+
+# ============================================================================
+# READ BENCHMARK
+# ============================================================================
+def view_packages(create_stmt: str) -> set:
+    """Package ids a generated view's package check (see package_check_sql) accepts."""
+    packages = set()
+    for package_list in re.findall(r"has_any_package\(ARRAY\[([^\]]*)\]", create_stmt):
+        packages |= {int(p) for p in package_list.split(",") if p.strip().lstrip("-").isdigit()}
+    return packages
+
+
+def percentiles(samples: list) -> dict:
+    """p50/p95/p99 (nearest rank) and mean of latencies in seconds, reported in ms."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))] * 1000
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p50_ms": round(rank(50), 2),
+        "p95_ms": round(rank(95), 2),
+        "p99_ms": round(rank(99), 2),
+    }
+
+
+def plan_shape(plan: dict) -> dict:
+    """Compact description of an EXPLAIN (ANALYZE, FORMAT JSON) plan of a view query.
+
+    `per_row_subplans` lists SubPlans executed once per row; the package check should
+    show up as a one-time InitPlan instead.
+    """
+    nodes = list(builder.plan_nodes(plan["Plan"]))
+    return {
+        "execution_ms": round(plan.get("Execution Time", 0), 2),
+        "planning_ms": round(plan.get("Planning Time", 0), 2),
+        "nodes": ["  " * depth + builder.describe_plan_node(node) for node, depth, _, _ in nodes],
+        "per_row_subplans": [
+            builder.describe_plan_node(node) for node, _, _, _ in nodes
+            if node.get("Parent Relationship") == "SubPlan" and node.get("Actual Loops", 1) > 1
+        ],
+        "seq_scans": sorted({
+            node["Relation Name"] for node, _, _, _ in nodes
+            if node["Node Type"] == "Seq Scan" and "Relation Name" in node
+        }),
+    }
+
+
+def load_bench_users() -> dict:
+    users = {}
+    for user_id, package_id in builder.fetch_all("SELECT user_id::text, customer_package_id FROM user_package_access;"):
+        users.setdefault(user_id, set()).add(package_id)
+    return users
+
+
+def sample_params(mv_name: str, sport_id: int) -> list:
+    """Rows of an MV for one sport, as dicts, to draw realistic filter values from."""
+    rows = builder.fetch_all(
+        f"SELECT to_jsonb(t) FROM intermediate.{mv_name} t WHERE t.sport_id = %s ORDER BY random() LIMIT %s;",
+        (sport_id, READ_PARAM_SAMPLE)
+    )
+    return [row[0] if isinstance(row[0], dict) else json.loads(row[0]) for row in rows]
+
+
+def view_columns(view_name: str) -> set:
+    return {row[0] for row in builder.fetch_all(
+        "SELECT column_name FROM information_schema.columns WHERE table_schema = 'public' AND table_name = %s;",
+        (view_name,)
+    )}
+
+
+def timed_view_query(user_id: str, sql: str, params: dict) -> float:
+    """Run one query as `user_id` and return its latency in seconds (fetch included)."""
+    with builder.pooled_conn({"request.jwt.claim.sub": user_id}) as conn, conn.cursor() as cur:
+        started = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        return time.perf_counter() - started
+
+
+def explain_view_query(user_id: str, sql: str, params: dict) -> dict:
+    with builder.pooled_conn({"request.jwt.claim.sub": user_id}) as conn, conn.cursor() as cur:
+        cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}", params)
+        explain = cur.fetchone()[0]
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    return explain[0]
+
+
+def query_params(required: set, samples: list) -> dict:
+    params = {"limit": READ_PAGE_SIZE, "offset": READ_PAGE_SIZE * random.randrange(READ_MAX_PAGE)}
+    row = random.choice(samples) if samples else {}
+    for column in required:
+        params[column] = row.get(column)
+    return params
+
+
+def benchmark_view(view_name: str, view_def: dict, sport_id: int, users: dict, executor) -> dict:
+    """Replay every applicable READ_QUERIES shape against one view."""
+    packages = view_packages(view_def["create"])
+    entitled = [u for u, pkgs in users.items() if pkgs & packages]
+    denied = [u for u, pkgs in users.items() if not pkgs & packages]
+    # The wide MV, not the per_sport layout's stat MV (which has no sport_id)
+    sport_stat_mvs = set(builder.SPORT_STAT_WIDE_MVS.values())
+    mv_name = sorted(n for n in builder.referenced_mvs(view_def["create"]) if n not in sport_stat_mvs)[0]
+    samples = sample_params(mv_name, sport_id)
+    columns = view_columns(view_name)
+
+    results = {}
+    for query_name, (required, template) in READ_QUERIES.items():
+        if not required <= columns or not entitled:
+            continue
+        sql = template.format(view=view_name)
+        filters = {c for c in required if f"%({c})s" in sql}
+        runs = []
+        for _ in range(READ_ITERATIONS):
+            is_denied = bool(denied) and random.random() < READ_DENIED_SHARE
+            user_id = random.choice(denied if is_denied else entitled)
+            runs.append((is_denied, executor.submit(timed_view_query, user_id, sql, query_params(filters, samples))))
+
+        results[query_name] = {
+            "entitled": percentiles([f.result() for is_denied, f in runs if not is_denied]),
+            "denied": percentiles([f.result() for is_denied, f in runs if is_denied]),
+            "plan": plan_shape(explain_view_query(random.choice(entitled), sql, query_params(filters, samples))),
+        }
+        stats = results[query_name]["entitled"]
+        safe_print(
+            f"[READ] {view_name} {query_name}: p50 {stats['p50_ms']:.1f}ms, "
+            f"p95 {stats['p95_ms']:.1f}ms, p99 {stats['p99_ms']:.1f}ms"
+        )
+    return results
+
+
+def run_read_benchmark(dsn: str, suffixes: list, scale: str) -> dict:
+    """Replay app queries against the tier views of `suffixes` on the data already built."""
+    configure_builder(dsn)
+    check_bench_database()
+    users = load_bench_users()
+    configs = [c for c in builder.view_configs if c["suffix"] in suffixes]
+
+    views = {}
+    with ThreadPoolExecutor(max_workers=READ_CONCURRENCY) as executor:
+        for config in configs:
+            for view_name, view_def in builder.build_view_statements(config).items():
+                safe_print(f"[READ] Replaying queries against {view_name}...")
+                views[view_name] = benchmark_view(view_name, view_def, config["sport_id"], users, executor)
+    builder.close_pool()
+
+    return {
+        "suite": "read",
+        "scale": scale,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "users": len(users),
+        "iterations": READ_ITERATIONS,
+        "concurrency": READ_CONCURRENCY,
+        "views": views,
+        # p95 per view and query, in the same shape as build reports so --baseline works
+        "targets": {
+            f"{view_name}:{query_name}": {"elapsed_s": result["entitled"]["p95_ms"] / 1000, "statements": result["entitled"]["n"]}
+            for view_name, queries in views.items()
+            for query_name, result in queries.items()
+            if result["entitled"]["n"]
+        },
+    }
+
+
+# ============================================================================
+# PIVOT BENCHMARK
+# ============================================================================
+def time_pivot(mv_name: str, strategy: str) -> dict:
+    """EXPLAIN ANALYZE the SELECT of `mv_name` built with `strategy`, PIVOT_REPEATS times."""
+    builder.MV_PIVOT_STRATEGIES[mv_name] = strategy
+    builder.ensure_pivot_extensions([mv_name])
+    body = builder.mv_select_body(builder.build_mv_statements()[mv_name]["create"])
+    runs = []
+    for _ in range(PIVOT_REPEATS):
+        explain = builder.fetch_all(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {body}",
+            profile=builder.MV_SESSION_PROFILES.get(mv_name)
+        )[0][0]
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        runs.append(explain[0])
+    times = sorted(run["Execution Time"] for run in runs)
+    # Buffer counts of the top node include its children
+    return {
+        "median_ms": round(times[len(times) // 2], 1),
+        "min_ms": round(times[0], 1),
+        "rows": runs[-1]["Plan"].get("Actual Rows", 0),
+        "temp_blocks_written": runs[-1]["Plan"].get("Temp Written Blocks", 0),
+    }
+
+
+def run_pivot_benchmark(dsn: str, mv_names: list, strategies: list, scale: str,
+                        allow_non_bench: bool = False) -> dict:
+    """Compare the pivot strategies on each of `mv_names` against the data already built."""
+    builder.DB_SETTINGS = {"dsn": dsn}
+    builder.close_pool()
+    if not allow_non_bench:
+        check_bench_database()
+    configured = dict(builder.MV_PIVOT_STRATEGIES)
+    build_mode = builder.MV_BUILD_MODE
+    # Only the SELECTs are timed, so crosstab's restriction to rebuild mode does not apply
+    builder.MV_BUILD_MODE = "rebuild"
+    results = {}
+    try:
+        for mv_name in mv_names:
+            results[mv_name] = {}
+            for strategy in strategies:
+                safe_print(f"[PIVOT] {mv_name} with {strategy}...")
+                results[mv_name][strategy] = time_pivot(mv_name, strategy)
+                result = results[mv_name][strategy]
+                safe_print(f"[PIVOT] {mv_name} {strategy}: median {result['median_ms'] / 1000:.2f}s ({result['rows']:,} rows)")
+    finally:
+        builder.MV_PIVOT_STRATEGIES.clear()
+        builder.MV_PIVOT_STRATEGIES.update(configured)
+        builder.MV_BUILD_MODE = build_mode
+        builder.close_pool()
+
+    return {
+        "suite": "pivot",
+        "scale": scale,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "repeats": PIVOT_REPEATS,
+        "mvs": results,
+        "targets": {
+            f"{mv_name}:{strategy}": {"elapsed_s": result["median_ms"] / 1000, "statements": PIVOT_REPEATS}
+            for mv_name, by_strategy in results.items()
+            for strategy, result in by_strategy.items()
+        },
+    }
+
+
+# ============================================================================
+# ENTITLEMENT BENCHMARK
+# ============================================================================
+def time_entitlement_check(user_id: str, sql: str, params: dict) -> dict:
+    """Median latency of `sql` as `user_id` over ENTITLEMENT_REPEATS runs, and its plan shape."""
+    times = sorted(timed_view_query(user_id, sql, params) for _ in range(ENTITLEMENT_REPEATS))
+    shape = plan_shape(explain_view_query(user_id, sql, params))
+    return {
+        "median_ms": round(times[len(times) // 2] * 1000, 2),
+        "execution_ms": shape["execution_ms"],
+        "per_row_subplans": shape["per_row_subplans"],
+    }
+
+
+def run_entitlement_benchmark(dsn: str, suffixes: list, scale: str) -> dict:
+    """Compare ENTITLEMENT_CHECKS on the tier views' filter, against the data already built."""
+    builder.DB_SETTINGS = {"dsn": dsn}
+    builder.close_pool()
+    # Creates the lookup's index and function, so only on a benchmark database
+    check_bench_database()
+    builder.create_entitlement_lookup()
+    users = load_bench_users()
+
+    results = {}
+    for config in [c for c in builder.view_configs if c["suffix"] in suffixes]:
+        suffix = config["suffix"]
+        view_def = builder.build_view_statements(config)[f"vw_tp_athletes_wide_{suffix}"]
+        packages = view_packages(view_def["create"])
+        entitled = [u for u, pkgs in users.items() if pkgs & packages]
+        denied = [u for u, pkgs in users.items() if not pkgs & packages]
+        package_list = ", ".join(str(p) for p in sorted(packages))
+
+        results[suffix] = {}
+        for check_name, check in ENTITLEMENT_CHECKS.items():
+            sql = (
+                "SELECT count(*) FROM intermediate.mv_tp_athletes_wide t "
+                f"WHERE t.sport_id = %(sport_id)s AND {check.format(packages=package_list)}"
+            )
+            for user_kind, candidates in (("entitled", entitled), ("denied", denied)):
+                if not candidates:
+                    continue
+                result = time_entitlement_check(random.choice(candidates), sql, {"sport_id": config["sport_id"]})
+                results[suffix][f"{check_name}:{user_kind}"] = result
+                per_row = " (check runs per row)" if result["per_row_subplans"] else ""
+                safe_print(f"[ENTITLEMENT] {suffix} {check_name}, {user_kind}: median {result['median_ms']:.1f}ms{per_row}")
+    builder.close_pool()
+
+    return {
+        "suite": "entitlement",
+        "scale": scale,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "repeats": ENTITLEMENT_REPEATS,
+        "sports": results,
+        "targets": {
+            f"{suffix}:{case}": {"elapsed_s": result["median_ms"] / 1000, "statements": ENTITLEMENT_REPEATS}
+            for suffix, cases in results.items()
+            for case, result in cases.items()
+        },
+    }
+
+
+def compare_reports(report: dict, baseline: dict) -> list:
+    """Per-target timing ratios against a baseline report, slowest regression first."""
+    rows = []
+    for target, total in report["targets"].items():
+        before = baseline.get("targets", {}).get(target)
+        if not before or not before["elapsed_s"]:
+            continue
+        ratio = total["elapsed_s"] / before["elapsed_s"]
+        rows.append({
+            "target": target,
+            "baseline_s": before["elapsed_s"],
+            "elapsed_s": total["elapsed_s"],
+            "ratio": round(ratio, 2),
+            "regression": ratio > REGRESSION_THRESHOLD,
+        })
+    return sorted(rows, key=lambda row: -row["ratio"])
+
+
+def write_report(report: dict) -> str:
+    os.makedirs(BENCH_REPORT_DIR, exist_ok=True)
+    stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(BENCH_REPORT_DIR, f"{report['suite']}_{report['scale']}_{stamp}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def print_read_summary(report: dict):
+    safe_print("\n[READ] Slowest view queries (p95, entitled users):")
+    slowest = sorted(report["targets"].items(), key=lambda item: -item[1]["elapsed_s"])[:15]
+    for target, total in slowest:
+        safe_print(f"  {target}: {total['elapsed_s'] * 1000:.1f}ms")
+    for view_name, queries in report["views"].items():
+        for query_name, result in queries.items():
+            if result["plan"]["per_row_subplans"]:
+                safe_print(
+                    f"  [PLAN] {view_name} {query_name} runs a SubPlan per row: "
+                    f"{', '.join(result['plan']['per_row_subplans'])}"
+                )
+    for row in report.get("comparison", []):
+        if row["regression"]:
+            safe_print(f"  [REGRESSION] {row['target']}: p95 x{row['ratio']}")
+
+
+def print_pivot_summary(report: dict):
+    safe_print("\n[PIVOT] Median SELECT time per strategy:")
+    for mv_name, by_strategy in report["mvs"].items():
+        fastest = min(by_strategy, key=lambda strategy: by_strategy[strategy]["median_ms"])
+        timings = ", ".join(f"{strategy} {result['median_ms'] / 1000:.2f}s" for strategy, result in by_strategy.items())
+        safe_print(f"  {mv_name}: {timings} (fastest: {fastest})")
+    for row in report.get("comparison", []):
+        if row["regression"]:
+            safe_print(f"  [REGRESSION] {row['target']}: x{row['ratio']}")
+
+
+def print_entitlement_summary(report: dict):
+    safe_print("\n[ENTITLEMENT] Median query time per package check:")
+    for suffix, cases in report["sports"].items():
+        timings = ", ".join(f"{case} {result['median_ms']:.1f}ms" for case, result in cases.items())
+        safe_print(f"  {suffix}: {timings}")
+        for case, result in cases.items():
+            if result["per_row_subplans"]:
+                safe_print(f"  [PLAN] {suffix} {case} runs a SubPlan per row: {', '.join(result['per_row_subplans'])}")
+    for row in report.get("comparison", []):
+        if row["regression"]:
+            safe_print(f"  [REGRESSION] {row['target']}: x{row['ratio']}")
+
+
+def print_build_summary(report: dict):
+    safe_print(f"\n[BENCH] {report['scale']} scale built in {report['build_s']:.1f}s")
+    for target, total in list(report["targets"].items())[:15]:
+        size = total.get("size_bytes")
+        size_text = f", {size / 1024 ** 2:,.0f} MB" if size else ""
+        safe_print(f"  {target}: {total['elapsed_s']:.1f}s{size_text}")
+    for row in report.get("comparison", []):
+        if row["regression"]:
+            safe_print(
+                f"  [REGRESSION] {row['target']}: {row['baseline_s']:.1f}s -> {row['elapsed_s']:.1f}s "
+                f"(x{row['ratio']})"
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark clean_db_builder against synthetic data.")
+    parser.add_argument("--dsn", default=BENCH_DSN, help="benchmark database (name must contain 'bench')")
+    subparsers = parser.add_subparsers(dest="suite", required=True)
+
+    build = subparsers.add_parser("build", help="time every MV and view build at a data scale")
+    build.add_argument("--scale", choices=sorted(BENCH_SCALES), default="1m")
+    build.add_argument("--skip-load", action="store_true", help="reuse the data already loaded")
+    build.add_argument("--baseline", help="earlier build report to compare timings against")
+
+    read = subparsers.add_parser("read", help="replay app queries against the built tier views")
+    read.add_argument("--suffixes", nargs="+", default=READ_SUFFIXES, help="sports whose views are replayed")
+    read.add_argument("--scale", default="current", help="label for the report (the data is not reloaded)")
+    read.add_argument("--baseline", help="earlier read report to compare p95 latencies against")
+
+    pivot = subparsers.add_parser("pivot", help="compare pivot strategies on the pivot MVs' SELECTs")
+    pivot.add_argument("--mvs", nargs="+", choices=PIVOT_MVS, default=PIVOT_MVS)
+    pivot.add_argument("--strategies", nargs="+", choices=PIVOT_STRATEGIES, default=PIVOT_STRATEGIES)
+    pivot.add_argument("--scale", default="current", help="label for the report (the data is not reloaded)")
+    pivot.add_argument("--baseline", help="earlier pivot report to compare median timings against")
+    pivot.add_argument(
+        "--allow-non-bench", action="store_true",
+        help="run against a database whose name lacks 'bench' (creates tablefunc, runs the heavy pivots)"
+    )
+
+    entitlement = subparsers.add_parser(
+        "entitlement", help="compare the views' package check, inline EXISTS versus has_any_package()"
+    )
+    entitlement.add_argument("--suffixes", nargs="+", default=READ_SUFFIXES, help="sports whose rows are filtered")
+    entitlement.add_argument("--scale", default="current", help="label for the report (the data is not reloaded)")
+    entitlement.add_argument("--baseline", help="earlier entitlement report to compare median timings against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.suite == "build":
+        report = run_build_benchmark(args.scale, args.dsn, skip_load=args.skip_load)
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["comparison"] = compare_reports(report, json.load(f))
+        print_build_summary(report)
+        safe_print(f"Benchmark report written to {write_report(report)}")
+    elif args.suite == "read":
+        report = run_read_benchmark(args.dsn, args.suffixes, args.scale)
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["comparison"] = compare_reports(report, json.load(f))
+        print_read_summary(report)
+        safe_print(f"Benchmark report written to {write_report(report)}")
+    elif args.suite == "pivot":
+        report = run_pivot_benchmark(args.dsn, args.mvs, args.strategies, args.scale, args.allow_non_bench)
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["comparison"] = compare_reports(report, json.load(f))
+        print_pivot_summary(report)
+        safe_print(f"Benchmark report written to {write_report(report)}")
+    elif args.suite == "entitlement":
+        report = run_entitlement_benchmark(args.dsn, args.suffixes, args.scale)
+        if args.baseline:
+            with open(args.baseline) as f:
+                report["comparison"] = compare_reports(report, json.load(f))
+        print_entitlement_summary(report)
+        safe_print(f"Benchmark report written to {write_report(report)}")
+
+
+if __name__ == "__main__":
+    main()
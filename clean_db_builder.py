@@ -1,7 +1,18 @@
+import argparse
+import contextlib
 import datetime
+import functools
+import hashlib
+import json
+import os
+import re
+import time
 import psycopg2
+from psycopg2 import errors as pg_errors
+from psycopg2 import pool as pg_pool
 import keyring
 import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # Configuration
 EXTRA_FULL_ACCESS_PKGS = [3, 4, 5]
@@ -10,8 +21,9 @@ HIDE_PREDICATE = "AND TRIM(afw.hs_coach_hide) IS DISTINCT FROM '1'"
 # ============================================================================
 # BUILD CONFIGURATION
 # ============================================================================
-# Control which components get built by setting True/False for each item
-# Set START_FROM_MV to skip earlier MVs (useful for resuming after a failure)
+# Control which components get built by setting True/False for each item, or pass
+# targets on the command line (`python clean_db_builder.py --help`)
+# Set START_FROM_MV to skip earlier MVs (after a failure, prefer `--resume`; see BUILD_JOURNAL_PATH)
 
 # Source table indexes (only needed on first run)
 CREATE_SOURCE_INDEXES = False
@@ -20,11 +32,14 @@ CREATE_SOURCE_INDEXES = False
 BUILD_MVS = {
     "latest_athlete_facts": False,
     "mv_school_fact_wide": False,  # Must come before athlete_stat_wide
+    "mv_athlete_current_school": False,  # Depends on mv_school_fact_wide
     "mv_athlete_fact_wide": False,
-    "mv_athlete_stat_wide": False,  # Depends on mv_school_fact_wide
+    "mv_athlete_stat_wide": False,  # Depends on mv_athlete_current_school
     "mv_athlete_honor_best": False,
     "mv_athlete_commit": False,
     "mv_athlete_sign": False,
+    "mv_athlete_offer_counts": False,  # Depends on mv_school_fact_wide
+    "mv_athlete_camp_attendance": False,
     "mv_tp_athletes_wide": False,
     "mv_college_athletes_wide": False,
     "mv_hs_athletes_wide": False,
@@ -36,6 +51,166 @@ BUILD_MVS = {
 # Set to None to start from the beginning, or specify an MV name to start from
 START_FROM_MV = None  # e.g., "mv_activity_feed" to only rebuild that one
 
+# Number of MVs built at the same time. Each MV starts as soon as the MVs it
+# reads from (see MV_DEPENDENCIES) are finished; 1 builds them one by one.
+MV_BUILD_CONCURRENCY = 4
+
+# How enabled MVs are (re)built:
+#   "rebuild" - DROP ... CASCADE and CREATE in place. Dependent public views disappear
+#               until the view step recreates them.
+#   "shadow"  - build every MV and its indexes in SHADOW_SCHEMA, then swap them into
+#               intermediate inside one short transaction. Readers never see a missing
+#               relation. Everything downstream of an enabled MV is rebuilt as well.
+#   "refresh" - keep each MV and its indexes and REFRESH ... CONCURRENTLY (reads keep
+#               flowing). An MV whose generated definition differs from the one it was
+#               built from is rebuilt, with everything downstream, as in "shadow"
+#               mode; a missing one is created in place.
+MV_BUILD_MODE = "rebuild"
+SHADOW_SCHEMA = "intermediate_next"
+RETIRED_SCHEMA = "intermediate_old"  # previous MVs are moved here during the swap, then dropped
+SWAP_LOCK_TIMEOUT = "5s"  # give up (and retry) rather than queue behind long readers
+SWAP_ATTEMPTS = 3
+
+# Maximum number of open database connections shared by the whole build, including
+# parallel workers. Session settings are reset every time a connection is checked out.
+DB_POOL_SIZE = 12
+
+# Indexes of one MV built at the same time (each on its own pooled connection)
+INDEX_BUILD_CONCURRENCY = 3
+
+# Every DROP/CREATE/REFRESH/index/view statement is timed; the run's report is written
+# here as build_report_<timestamp>.json (None disables the report)
+BUILD_REPORT_DIR = "build_reports"
+
+# Every completed step (MV, index, swap, view) is appended to this journal with the hash
+# of the SQL it ran. `python clean_db_builder.py --resume` continues the last run if it
+# did not finish: steps already completed with the same definition are skipped.
+BUILD_JOURNAL_PATH = "build_journal.jsonl"
+
+# Profiling mode: instead of building anything, run the SELECT of every enabled MV under
+# EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON), save each plan to PROFILE_DIR/<mv>.json and
+# print the most expensive nodes. Upstream MVs must already exist.
+PROFILE_MVS = False
+PROFILE_DIR = "mv_profiles"
+PROFILE_TOP_NODES = 5
+
+# Index advisor mode: instead of building anything, read the app's queries on the
+# generated views and intermediate MVs from pg_stat_statements, collect the columns they
+# filter and sort on, and estimate what an index on them would save each query: with
+# hypopg's hypothetical indexes when the extension is installed (PostgreSQL 16+, to
+# EXPLAIN the normalized queries), otherwise, or when a query cannot be planned, from
+# the columns' planner statistics. The candidates, ranked by estimated time saved, are
+# written to ADVISED_INDEXES_PATH. Entries marked "adopt": true there are built with
+# the MV's own indexes (see mv_indexes()); edit the file to review them. Needs
+# pg_stat_statements. Nothing is created in the database unless ADVISOR_INSTALL_HYPOPG.
+ADVISE_INDEXES = False
+ADVISED_INDEXES_PATH = "advised_indexes.json"
+ADVISOR_MIN_CALLS = 50          # statements called fewer times are ignored
+ADVISOR_MAX_STATEMENTS = 500    # most time-consuming statements read
+ADVISOR_MAX_COLUMNS = 3         # columns per candidate index
+ADVISOR_ADOPT_SHARE = 0.2       # candidates saving this share of their queries' cost start adopted
+ADVISOR_INSTALL_HYPOPG = False  # CREATE EXTENSION hypopg when the server has it but the database does not
+
+# Session settings applied on the connection that runs a build step. Statements run
+# with "default" unless a step names another profile: MV CREATE/REFRESH statements use
+# MV_SESSION_PROFILES, index builds use "index", view DDL uses "light".
+SESSION_PROFILES = {
+    "default": {"statement_timeout": "20min"},
+    "light": {
+        "statement_timeout": "5min",
+        "lock_timeout": "1min",
+        "work_mem": "16MB",
+        "max_parallel_workers_per_gather": 0,
+    },
+    "medium": {
+        "statement_timeout": "20min",
+        "lock_timeout": "2min",
+        "work_mem": "128MB",
+        "max_parallel_workers_per_gather": 2,
+    },
+    "heavy": {
+        "statement_timeout": "60min",
+        "lock_timeout": "2min",
+        "work_mem": "256MB",
+        "max_parallel_workers_per_gather": 4,
+    },
+    "index": {
+        "statement_timeout": "30min",
+        "lock_timeout": "2min",
+        "maintenance_work_mem": "512MB",
+        "max_parallel_maintenance_workers": 2,
+    },
+    "unbounded": {"statement_timeout": 0, "lock_timeout": 0, "work_mem": "256MB"},
+}
+
+MV_SESSION_PROFILES = {
+    "latest_athlete_facts": "heavy",  # DISTINCT ON sort over all of athlete_fact
+    "mv_school_fact_wide": "medium",
+    "mv_athlete_fact_wide": "heavy",  # pivot
+    "mv_athlete_stat_wide": "heavy",  # pivot over every mapped stat
+    "mv_athlete_honor_best": "light",
+    "mv_athlete_commit": "light",
+    "mv_athlete_sign": "light",
+    "mv_athlete_offer_counts": "medium",
+    "mv_athlete_camp_attendance": "light",
+    "mv_athlete_current_school": "medium",
+    "mv_tp_athletes_wide": "heavy",
+    "mv_college_athletes_wide": "heavy",  # window over all athletes
+    "mv_hs_athletes_wide": "heavy",
+    "mv_juco_athletes_wide": "medium",
+    "mv_activity_feed": "heavy",
+}
+
+# How the pivot MVs turn (key, data_type_id, value) rows into one column per mapped
+# data_type_id (compare them with `clean_db_benchmark.py pivot`):
+#   "case"     - MAX(CASE WHEN data_type_id = N THEN value END) per column
+#   "filter"   - MAX(value) FILTER (WHERE data_type_id = N) per column
+#   "jsonb"    - one jsonb_object_agg per key, then ->> per column
+#   "crosstab" - tablefunc's crosstab(); the extension is created when needed. Its source
+#                query is a string, which Postgres records no dependency on and which
+#                names its upstream relations with their build-time schema, so it is
+#                only allowed with MV_BUILD_MODE = "rebuild"
+PIVOT_STRATEGY = "case"
+MV_PIVOT_STRATEGIES = {}  # per-MV override, e.g. {"mv_athlete_stat_wide": "filter"}
+
+# Column types of the pivot keys, which crosstab() needs spelled out
+PIVOT_KEY_TYPES = {"athlete_id": "uuid", "school_id": "uuid"}
+
+# Where the athlete stats live:
+#   "combined"  - one mv_athlete_stat_wide with every mapped stat, selected into each
+#                 athlete wide MV (hundreds of always-NULL columns for most sports)
+#   "per_sport" - one mv_athlete_stat_wide_{suffix} per view_configs sport, holding only
+#                 that sport's stats (see sport_stat_mapping()). The athlete wide MVs
+#                 carry no stats and each sport's views join their own stat MV. The
+#                 all-sport admin views (college, juco) then have no stat columns.
+# Both layouts build under the "mv_athlete_stat_wide" switch of BUILD_MVS.
+STAT_WIDE_LAYOUT = "combined"
+
+# Stat columns a sport shows beyond those named in its view_configs redaction lists,
+# e.g. {"fb": ["long_rush"]}. Only used by the "per_sport" layout.
+SPORT_STAT_COLUMNS = {}
+
+# Athlete wide MVs to store as tables list-partitioned by sport_id: one partition per
+# view_configs sport plus a default one. Each partition is built in SHADOW_SCHEMA and
+# swapped in on its own, so readers keep the old rows of a sport until its new ones are
+# ready, and the views' sport_id filter only reads that sport's partition. These are
+# built after the other MVs whatever MV_BUILD_MODE is. Turning it off for an MV needs a
+# manual `DROP TABLE intermediate.<name> CASCADE` first.
+PARTITIONED_WIDE_MVS = set()  # e.g. {"mv_tp_athletes_wide", "mv_college_athletes_wide"}
+PARTITION_SPORTS = None  # suffixes whose partitions are rebuilt (`--sport`), None for all
+
+# Skip enabled MVs whose inputs are unchanged since their last successful build: the
+# source tables they read (directly or through upstream MVs) and the generated
+# definitions along the way. Fingerprints are stored in BUILD_FINGERPRINT_TABLE.
+SKIP_UNCHANGED_MVS = True
+BUILD_FINGERPRINT_TABLE = "intermediate.build_fingerprint"
+FORCE_MVS = set()  # rebuilt even when unchanged (`--force` on the command line)
+
+# Only re-issue views whose generated SQL (or an MV they read) changed since they were
+# last created, or whose live definition was altered by hand. Every CREATE/DROP VIEW
+# takes catalog locks that block app queries against the view.
+SKIP_UNCHANGED_VIEWS = True
+
 # Views to build
 BUILD_VIEWS = {
     "public_views": True,  # Sport-specific public views (vw_tp_athletes_wide_*, etc.)
@@ -44,6 +219,10 @@ BUILD_VIEWS = {
     "pub_fb_hs_athlete": True,  # vw_pub_fb_hs_athlete
 }
 
+# Only issue these views from the enabled groups (None = all of them). The command line
+# sets this to the requested views plus those reading an MV that was just rebuilt.
+VIEW_TARGETS = None
+
 # Athlete fact mapping
 athlete_fact_mapping = {
     1: "year", 2: "primary_position", 4: "height_feet", 5: "height_inch", 6: "weight",
@@ -101,6 +280,13 @@ sfw_numeric_fields = {
 
 ALLOWED_JUCO_SUFFIXES = {"wsoc", "msoc", "wvol", "wbb", "bsb"}
 
+# Conferences whose athletes the starter/silver/gold views redact
+REDACTED_CONFERENCES = ("ACC", "Big 12", "Big 10", "SEC")
+# Sports where the redaction rules do NOT require games played (gp/gs)
+GP_IGNORED_SUFFIXES = {"mtaf", "wtaf", "wglf", "mglf", "wten", "mten", "wswm", "mswm", "mwre"}
+# Redaction flag columns of mv_tp_athletes_wide, see redaction_rules()
+REDACTION_FLAGS = ("needs_redaction_base", "needs_redaction_gold")
+
 standard_redacted_columns = [
    "ncaa_id", "last_updated", "m_year", "m_division", "m_sport", "m_conference", "m_link", "sport_id",
    "athlete_first_name", "athlete_last_name", "athlete_knack_id", "athlete_created_at", "details_id",
@@ -500,15 +686,67 @@ athlete_stat_mapping = {
     1136: 'verified_rating'
 }
 
+# SQL type each pivot MV stores a data_type_id's values as (data_type_ids are shared by
+# the fact and stat tables). Values are text at the source; those that do not parse as
+# the declared type become NULL. Anything not listed stays text.
+SQL_TYPE_PATTERNS = {
+    "numeric": r"^-?\d+(\.\d+)?$",
+    "integer": r"^-?\d+$",
+}
+DATA_TYPE_SQL_TYPES = {
+    **{dtid: "numeric" for dtid, col in athlete_fact_mapping.items() if col in afw_numeric_fields},
+    **{dtid: "numeric" for dtid, col in school_fact_mapping.items() if col in sfw_numeric_fields},
+    **{dtid: "numeric" for dtid, col in athlete_stat_mapping.items() if col != "b_t"},
+}
+
+# Metrics derived from the pivoted stats, computed as numeric columns of the stat MVs.
+# `{t}` is the alias of the stat relation and `{ip_decimal}` innings pitched as a true
+# decimal (6.2 -> 6.667, see IP_DECIMAL_SQL). mv_athlete_stat_wide has all of them (and
+# ip_decimal); a sport's stat MV the ones named in its view_configs redaction lists.
+DERIVED_STAT_METRICS = {
+    "whip": "({t}.p_bb + {t}.p_h) / NULLIF({ip_decimal}, 0)",
+    "ops": "{t}.ob_pct + {t}.slg_pct",
+    "p_so_bb": "{t}.so / NULLIF({t}.p_bb, 0)",
+    "hitter_bb_so": "{t}.bb / NULLIF({t}.k, 0)",
+    "so_per9": "({t}.so / NULLIF({t}.gp,0)) * 9",
+    "bb_per9": "({t}.p_bb / NULLIF({t}.gp,0)) * 9",
+    "k_pct": "({t}.so / NULLIF({t}.bf,0))",
+    "bb_pct": "({t}.p_bb / NULLIF({t}.bf,0))",
+    "rpg": "({t}.tot_reb / NULLIF({t}.gp,0))",
+    "apg": "({t}.assists / NULLIF({t}.gp,0))",
+    "mpg": "({t}.min_played / NULLIF({t}.gp,0))",
+    "fpg": "({t}.pf / NULLIF({t}.gp,0))",
+    "to_pg": "({t}.to / NULLIF({t}.gp,0))",
+    "stl_pg": "({t}.stl / NULLIF({t}.gp,0))",
+    "blk_pg": "({t}.blk / NULLIF({t}.gp,0))",
+    "kps": "({t}.kills / NULLIF({t}.sets,0))",
+    "dps": "({t}.digs / NULLIF({t}.sets,0))",
+    "pps": "({t}.points / NULLIF({t}.sets,0))",
+}
+
+IP_DECIMAL_SQL = """FLOOR({ip}) + 
+            CASE 
+                WHEN MOD({ip}, 1) = 0.1 THEN 1.0/3 
+                WHEN MOD({ip}, 1) = 0.2 THEN 2.0/3 
+                ELSE 0 
+            END"""
+
+# Per-sport stat MVs, built instead of mv_athlete_stat_wide when STAT_WIDE_LAYOUT = "per_sport"
+SPORT_STAT_WIDE_MVS = {config["suffix"]: f"mv_athlete_stat_wide_{config['suffix']}" for config in view_configs}
+
 # Core materialized views to build
 CORE_MVS = [
     "latest_athlete_facts",
     "mv_athlete_fact_wide",
+    "mv_athlete_current_school",
     "mv_athlete_stat_wide",
+    *SPORT_STAT_WIDE_MVS.values(),
     "mv_school_fact_wide",
     "mv_athlete_honor_best",
     "mv_athlete_commit",
     "mv_athlete_sign",
+    "mv_athlete_offer_counts",
+    "mv_athlete_camp_attendance",
     "mv_tp_athletes_wide",
     "mv_college_athletes_wide",
     "mv_hs_athletes_wide",
@@ -516,6 +754,62 @@ CORE_MVS = [
     "mv_activity_feed"
 ]
 
+# Upstream MVs each MV reads from (intermediate.* only). Used to schedule builds:
+# an MV is started once everything listed here has been built.
+MV_DEPENDENCIES = {
+    "latest_athlete_facts": [],
+    "mv_school_fact_wide": [],
+    "mv_athlete_fact_wide": ["latest_athlete_facts"],
+    "mv_athlete_stat_wide": ["mv_athlete_current_school"],
+    **{mv_name: ["mv_athlete_current_school"] for mv_name in SPORT_STAT_WIDE_MVS.values()},
+    "mv_athlete_honor_best": [],
+    "mv_athlete_commit": [],
+    "mv_athlete_sign": [],
+    "mv_athlete_offer_counts": ["mv_school_fact_wide"],
+    "mv_athlete_camp_attendance": [],
+    "mv_athlete_current_school": ["mv_school_fact_wide"],
+    "mv_tp_athletes_wide": [
+        "mv_athlete_fact_wide", "mv_athlete_stat_wide", "mv_athlete_honor_best",
+        "mv_athlete_commit", "mv_athlete_sign", "mv_school_fact_wide"
+    ],
+    "mv_college_athletes_wide": [
+        "mv_athlete_fact_wide", "mv_athlete_stat_wide", "mv_athlete_honor_best",
+        "mv_athlete_commit", "mv_athlete_sign", "mv_athlete_camp_attendance", "mv_athlete_current_school",
+        "mv_school_fact_wide"
+    ],
+    "mv_hs_athletes_wide": [
+        "mv_athlete_fact_wide", "mv_athlete_stat_wide", "mv_athlete_honor_best",
+        "mv_athlete_commit", "mv_athlete_sign", "mv_athlete_offer_counts", "mv_athlete_camp_attendance",
+        "mv_athlete_current_school", "mv_school_fact_wide"
+    ],
+    "mv_juco_athletes_wide": [
+        "mv_athlete_fact_wide", "mv_athlete_stat_wide", "mv_athlete_honor_best",
+        "mv_athlete_commit", "mv_athlete_sign", "mv_athlete_current_school", "mv_school_fact_wide"
+    ],
+    "mv_activity_feed": ["mv_athlete_fact_wide", "mv_athlete_offer_counts", "mv_school_fact_wide"],
+}
+
+# Source relations (outside intermediate) each MV reads directly. Views are resolved to
+# their underlying tables when fingerprinting.
+MV_SOURCE_TABLES = {
+    "latest_athlete_facts": ["athlete_fact"],
+    "mv_school_fact_wide": ["school_fact", "school", "county", "state", "vw_school_active_coach_with_facts"],
+    "mv_athlete_fact_wide": [],
+    "mv_athlete_stat_wide": ["sport_season_selector", "stat"],
+    **{mv_name: ["sport_season_selector", "stat"] for mv_name in SPORT_STAT_WIDE_MVS.values()},
+    "mv_athlete_honor_best": ["athlete_honor"],
+    "mv_athlete_commit": ["offer", "school"],
+    "mv_athlete_sign": ["offer", "school"],
+    "mv_athlete_offer_counts": ["offer"],
+    "mv_athlete_camp_attendance": ["camp_attendance", "camp_event", "state"],
+    "mv_athlete_current_school": ["athlete", "main_tp_page", "athlete_school"],
+    "mv_tp_athletes_wide": ["main_tp_page", "athlete", "details_tp_page"],
+    "mv_college_athletes_wide": ["athlete", "main_tp_page", "details_tp_page"],
+    "mv_hs_athletes_wide": ["athlete", "main_tp_page", "details_tp_page"],
+    "mv_juco_athletes_wide": ["athlete", "main_tp_page", "details_tp_page"],
+    "mv_activity_feed": ["offer", "athlete_with_school"],
+}
+
 # Thread-safe print function
 print_lock = threading.Lock()
 
@@ -525,57 +819,291 @@ def safe_print(*args, **kwargs):
         print(*args, **kwargs)
 
 
+class BuildReport:
+    """Thread-safe record of timed build statements, written out as JSON at the end of a run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = datetime.datetime.now()
+        self.steps = []
+        self.skipped = {}
+
+    def record(self, step: str, target: str, elapsed: float, rows=None, size_bytes=None, error=None):
+        with self._lock:
+            self.steps.append({
+                "step": step,
+                "target": target,
+                "elapsed_s": round(elapsed, 3),
+                "rows": rows,
+                "size_bytes": size_bytes,
+                "status": "failed" if error else "ok",
+                "error": error,
+            })
+
+    def skip(self, step: str, target: str):
+        """Note a target left alone because it was already up to date."""
+        with self._lock:
+            self.skipped.setdefault(step, []).append(target)
+
+    def totals_by_target(self) -> dict:
+        totals = {}
+        with self._lock:
+            for entry in self.steps:
+                total = totals.setdefault(entry["target"], {"elapsed_s": 0.0, "statements": 0})
+                total["elapsed_s"] = round(total["elapsed_s"] + entry["elapsed_s"], 3)
+                total["statements"] += 1
+                if entry["size_bytes"] is not None:
+                    total["size_bytes"] = entry["size_bytes"]
+                if entry["rows"] is not None:
+                    total["rows"] = entry["rows"]
+        return dict(sorted(totals.items(), key=lambda item: -item[1]["elapsed_s"]))
+
+    def write(self, directory: str, status: str) -> str:
+        finished_at = datetime.datetime.now()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"build_report_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json")
+        with self._lock:
+            steps = list(self.steps)
+            skipped = {step: list(targets) for step, targets in self.skipped.items()}
+        report = {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration_s": round((finished_at - self.started_at).total_seconds(), 3),
+            "status": status,
+            "mv_build_mode": MV_BUILD_MODE,
+            "totals_by_target": self.totals_by_target(),
+            "skipped": skipped,
+            "steps": steps,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return path
+
+
+build_report = BuildReport()
+
+
+class BuildJournal:
+    """Durable, append-only record of completed build steps, used to resume a failed run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.path = None
+        self.run_id = None
+        self.completed = {}
+
+    def start(self, path: str, resume: bool):
+        """Open the journal; with `resume`, reload the steps of the last unfinished run."""
+        self.path = path
+        self.completed = {}
+        last_run_id, last_run_finished = None, False
+        entries = []
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            if entries:
+                last_run_id = entries[-1]["run_id"]
+                last_run_finished = any(
+                    e["run_id"] == last_run_id and e.get("event") == "run_finished" for e in entries
+                )
+
+        if resume and last_run_id and not last_run_finished:
+            self.run_id = last_run_id
+            for entry in entries:
+                if entry["run_id"] == last_run_id and entry.get("event") == "step_done":
+                    self.completed[entry["key"]] = entry["definition_sha"]
+            safe_print(f"[JOURNAL] Resuming run {self.run_id}: {len(self.completed)} steps already done")
+        else:
+            if resume:
+                safe_print("[JOURNAL] Nothing to resume (last run finished or no journal), starting a new run")
+            self.run_id = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            self._append({"event": "run_started"})
+
+    def _append(self, entry: dict):
+        if not self.path:
+            return
+        entry = {"run_id": self.run_id, "at": datetime.datetime.now().isoformat(), **entry}
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def is_done(self, key: str, definition: str) -> bool:
+        """True if this run already completed `key` with the same definition."""
+        with self._lock:
+            return self.completed.get(key) == definition_hash(definition)
+
+    def mark_done(self, key: str, definition: str):
+        sha = definition_hash(definition)
+        with self._lock:
+            self.completed[key] = sha
+        self._append({"event": "step_done", "key": key, "definition_sha": sha})
+
+    def finish(self):
+        self._append({"event": "run_finished"})
+
+
+build_journal = BuildJournal()
+
+
+# Connection arguments for psycopg2. The password comes from the keyring unless these
+# already carry credentials (e.g. {"dsn": "dbname=clean_db_bench"} for a local database).
+DB_SETTINGS = {
+    "host": "db.ljmvmaidepqbiyjvxoyo.supabase.co",
+    "port": 5432,
+    "database": "postgres",
+    "user": "postgres",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_db_password():
+    """Look up the database password once per process."""
+    return keyring.get_password('supabase', 'db_password')
+
+
+def connection_settings() -> dict:
+    """DB_SETTINGS plus the keyring password, unless DB_SETTINGS carries its own credentials."""
+    if "dsn" in DB_SETTINGS or "password" in DB_SETTINGS:
+        return dict(DB_SETTINGS)
+    return {**DB_SETTINGS, "password": get_db_password()}
+
+
 def get_conn():
-    """Get database connection with autocommit enabled."""
-    db_password = keyring.get_password('supabase', 'db_password')
-    conn = psycopg2.connect(
-        host="db.ljmvmaidepqbiyjvxoyo.supabase.co",
-        port=5432,
-        database="postgres",
-        user="postgres",
-        password=db_password
-    )
+    """Get a new (unpooled) database connection with autocommit enabled."""
+    conn = psycopg2.connect(**connection_settings())
     conn.autocommit = True
     return conn
 
 
-def run_sql(stmt: str):
-    """Execute a single SQL statement."""
+_pool = None
+_pool_lock = threading.Lock()
+_pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+
+
+def get_pool():
+    """Create the shared connection pool on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pg_pool.ThreadedConnectionPool(1, DB_POOL_SIZE, **connection_settings())
+        return _pool
+
+
+@contextlib.contextmanager
+def pooled_conn(settings: dict = None):
+    """Check out a pooled connection with autocommit on, session settings reset and `settings` applied.
+
+    Blocks while all DB_POOL_SIZE connections are in use. Connections that were left
+    in a transaction are rolled back, broken ones are discarded.
+    """
+    with _pool_slots:
+        conn_pool = get_pool()
+        conn = conn_pool.getconn()
+        discard = False
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("RESET ALL;")
+                if settings:
+                    cur.execute(
+                        "SELECT " + ", ".join("set_config(%s, %s, false)" for _ in settings) + ";",
+                        [str(v) for item in settings.items() for v in item]
+                    )
+            yield conn
+        except (psycopg2.InterfaceError, psycopg2.OperationalError):
+            discard = True
+            raise
+        finally:
+            if conn.closed:
+                discard = True
+            elif not conn.autocommit:
+                try:
+                    conn.rollback()
+                    conn.autocommit = True
+                except psycopg2.Error:
+                    discard = True
+            conn_pool.putconn(conn, close=discard)
+
+
+def close_pool():
+    """Close every pooled connection (end of run)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def session_settings(profile: str, stmt: str = "") -> dict:
+    """Resolve a SESSION_PROFILES entry into the settings to apply for a statement."""
+    settings = dict(SESSION_PROFILES[profile or "default"])
+    # No timeout for CONCURRENTLY statements: they hold only weak locks and can run long
+    if " CONCURRENTLY " in stmt.upper():
+        settings.pop("statement_timeout", None)
+    return settings
+
+
+def run_sql(stmt: str, profile: str = "default", settings: dict = None,
+            step: str = None, target: str = None, relation: str = None):
+    """Execute a single SQL statement with the session settings of `profile` (plus `settings`).
+
+    When `step` is given the statement is timed into build_report under `target`, with the
+    rows it produced and, if `relation` is given, that relation's total size afterwards.
+    """
     stmt = stmt.strip()
     if not stmt:
         return
 
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            # Set timeout for non-CONCURRENTLY statements
-            if " CONCURRENTLY " not in stmt.upper():
-                cur.execute("SET statement_timeout TO '1200000';")  # 20 min
+    with pooled_conn({**session_settings(profile, stmt), **(settings or {})}) as conn:
+        started = time.monotonic()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(stmt)
+                rows = cur.rowcount if cur.rowcount >= 0 else None
+                size_bytes = None
+                if step and relation:
+                    cur.execute("SELECT pg_total_relation_size(%s::regclass);", (relation,))
+                    size_bytes = cur.fetchone()[0]
+        except Exception as e:
+            if step:
+                build_report.record(step, target, time.monotonic() - started, error=str(e))
+            safe_print(f"[ERROR] SQL execution failed: {e}")
+            safe_print(f"[ERROR] Statement was: {stmt}")
+            raise
+        if step:
+            build_report.record(step, target, time.monotonic() - started, rows, size_bytes)
 
-            cur.execute(stmt)
-    except Exception as e:
-        safe_print(f"[ERROR] SQL execution failed: {e}")
-        safe_print(f"[ERROR] Statement was: {stmt}")
-        raise
-    finally:
-        conn.close()
+
+def fetch_all(stmt: str, params=None, profile: str = None) -> list:
+    """Run a query and return all rows (with the session settings of `profile`, if given)."""
+    with pooled_conn(session_settings(profile, stmt) if profile else None) as conn:
+        with conn.cursor() as cur:
+            cur.execute(stmt, params)
+            return cur.fetchall()
 
 
 def run_sql_no_timeout(stmt: str):
     """Execute SQL with no timeout (for long REFRESH operations)."""
-    stmt = stmt.strip()
-    if not stmt:
-        return
+    run_sql(stmt, profile="unbounded")
 
-    conn = get_conn()
-    try:
-        with conn.cursor() as cur:
-            cur.execute("SET statement_timeout TO 0;")
-            cur.execute("SET lock_timeout TO 0;")
-            cur.execute("SET work_mem TO '256MB';")
-            cur.execute(stmt)
-    finally:
-        conn.close()
+
+def definition_hash(stmt: str) -> str:
+    """Hash a generated SQL definition, ignoring whitespace differences."""
+    normalized = " ".join(stmt.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:32]
+
+
+DEFINITION_COMMENT_PREFIX = "clean_db_builder def_sha="
+
+
+def stamp_mv_definition(mv_name: str, create_stmt: str, schema: str = "intermediate"):
+    """Record the hash of the definition an MV was built from in its comment."""
+    run_sql(
+        f"COMMENT ON MATERIALIZED VIEW {schema}.{mv_name} IS "
+        f"'{DEFINITION_COMMENT_PREFIX}{definition_hash(create_stmt)}';"
+    )
 
 
 def ids_in_clause_from(mapping: dict) -> str:
@@ -583,53 +1111,283 @@ def ids_in_clause_from(mapping: dict) -> str:
     return ", ".join(str(k) for k in sorted(mapping.keys()))
 
 
+def typed_value_sql(value_sql: str, dtid: int) -> str:
+    """`value_sql` (text) as the DATA_TYPE_SQL_TYPES type of `dtid`, NULL when it does not parse."""
+    sql_type = DATA_TYPE_SQL_TYPES.get(dtid)
+    if sql_type is None:
+        return value_sql
+    if sql_type not in SQL_TYPE_PATTERNS:
+        raise ValueError(f"Unknown SQL type '{sql_type}' for data_type_id {dtid}")
+    trimmed = f"NULLIF(TRIM({value_sql}), '')"
+    return f"CASE WHEN {trimmed} ~ '{SQL_TYPE_PATTERNS[sql_type]}' THEN {trimmed}::{sql_type.upper()} END"
+
+
 def build_case_lines(mapping: dict, source_alias: str = "") -> str:
     """Build CASE WHEN lines for pivot operations."""
     prefix = f"{source_alias}." if source_alias else ""
     lines = []
     for dtid, col in mapping.items():
         col_escaped = f'"{col}"' if not col.isidentifier() else col
-        lines.append(f" MAX(CASE WHEN {prefix}data_type_id = {dtid} THEN {prefix}value END) AS {col_escaped}")
+        value = typed_value_sql(f"MAX(CASE WHEN {prefix}data_type_id = {dtid} THEN {prefix}value END)", dtid)
+        lines.append(f" {value} AS {col_escaped}")
     return ",\n".join(lines)
 
 
-def build_cast_line(prefix, col):
-    """Build safe numeric cast line."""
-    no_cast_fields = {"b_t"}
-    col_escaped = f'"{col}"' if not col.isidentifier() else col
-    field = f"{prefix}.{col_escaped}"
-    if col in no_cast_fields:
-        return field
-    else:
-        return f"CASE WHEN {field} ~ '^-?\\d+(\\.\\d+)?$' THEN {field}::NUMERIC END AS {col_escaped}"
+def pivot_strategy(mv_name: str) -> str:
+    """The pivot strategy configured for an MV."""
+    strategy = MV_PIVOT_STRATEGIES.get(mv_name, PIVOT_STRATEGY)
+    if strategy not in ("case", "filter", "jsonb", "crosstab"):
+        raise ValueError(f"Unknown pivot strategy '{strategy}' for {mv_name}")
+    if strategy == "crosstab" and MV_BUILD_MODE != "rebuild":
+        raise ValueError(f"the crosstab pivot strategy ({mv_name}) needs MV_BUILD_MODE = 'rebuild'")
+    return strategy
 
 
-def safe_numeric_from_text(field_sql: str, alias_sql: str) -> str:
-    """Safe numeric conversion from text."""
-    return (
-        f"CASE WHEN NULLIF(TRIM({field_sql}), '') ~ '^-?\\d+(\\.\\d+)?$' "
-        f"THEN (NULLIF(TRIM({field_sql}), '')::NUMERIC) "
-        f"ELSE NULL END AS {alias_sql}"
-    )
+def build_pivot_select(mapping: dict, source: str, key: str, strategy: str = "case",
+                       source_ctes: str = "", unique_pairs: bool = False) -> str:
+    """Build a SELECT of `key` plus one column per mapping entry, pivoted from `source`.
+
+    Columns have the DATA_TYPE_SQL_TYPES type of their data_type_id (text if not listed).
+
+    `source` has `key`, data_type_id and value columns. When it is a CTE, crosstab needs
+    that CTE's definition in `source_ctes`, since its query runs on its own. With
+    `unique_pairs` the source holds one row per (key, data_type_id); otherwise the jsonb
+    and crosstab strategies first take MAX(value) per pair, as the CASE form does.
+    """
+    columns = [(dtid, f'"{col}"' if not col.isidentifier() else col) for dtid, col in mapping.items()]
+
+    if strategy == "case":
+        return f"""SELECT {key}, {build_case_lines(mapping)}
+        FROM {source}
+        GROUP BY {key}"""
+
+    if strategy == "filter":
+        lines = ",\n".join(
+            f" {typed_value_sql(f'MAX(value) FILTER (WHERE data_type_id = {dtid})', dtid)} AS {col}"
+            for dtid, col in columns
+        )
+        return f"""SELECT {key}, {lines}
+        FROM {source}
+        GROUP BY {key}"""
+
+    if unique_pairs:
+        pairs = f"SELECT {key}, data_type_id, value FROM {source}"
+    else:
+        pairs = f"SELECT {key}, data_type_id, MAX(value) AS value FROM {source} GROUP BY {key}, data_type_id"
+
+    if strategy == "jsonb":
+        values = {dtid: f"attrs->>'{dtid}'" for dtid, _ in columns}
+        lines = ",\n".join(f" {typed_value_sql(values[dtid], dtid)} AS {col}" for dtid, col in columns)
+        return f"""SELECT {key}, {lines}
+        FROM (
+            SELECT {key}, jsonb_object_agg(data_type_id::text, value) AS attrs
+            FROM ({pairs}) pairs
+            GROUP BY {key}
+        ) pivoted_json"""
+
+    # crosstab: categories in mapping order, which is also the order of the output columns
+    with_ctes = f"WITH {source_ctes} " if source_ctes else ""
+    categories = ", ".join(f"({dtid})" for dtid, _ in columns)
+    column_defs = ", ".join(f"{col} text" for _, col in columns)
+    lines = ",\n".join(f" {typed_value_sql(f'ct.{col}', dtid)} AS {col}" for dtid, col in columns)
+    return f"""SELECT ct.{key}, {lines}
+        FROM crosstab(
+            $pivot_source${with_ctes}{pairs} ORDER BY 1$pivot_source$,
+            $pivot_categories$VALUES {categories}$pivot_categories$
+        ) AS ct({key} {PIVOT_KEY_TYPES[key]}, {column_defs})"""
+
+
+def ensure_pivot_extensions(mv_names):
+    """Create tablefunc when any of `mv_names` pivots with crosstab()."""
+    if any(pivot_strategy(n) == "crosstab" for n in mv_names):
+        run_sql("CREATE EXTENSION IF NOT EXISTS tablefunc;")
 
 
 def build_school_fact_select_block():
-    """Build school fact select block with proper casting."""
+    """Build school fact select block (the pivot already typed the columns)."""
     cols_skip = {"hc_name", "hc_email", "hc_number"}
     parts = []
     for col in school_fact_mapping.values():
         if col in cols_skip:
             continue
         q = f'"{col}"' if not col.isidentifier() else col
-        if col in sfw_numeric_fields:
-            parts.append(safe_numeric_from_text(f"p.{q}", q))
-        else:
-            parts.append(f"p.{q}")
+        parts.append(f"p.{q}")
     return ",\n ".join(parts)
 
 
-def create_materialized_views():
-    """Create all materialized views with DROP/CREATE approach."""
+def derived_metric_line(metric: str, stat_alias: str, ip_decimal_sql: str) -> str:
+    """Select line of one DERIVED_STAT_METRICS entry."""
+    return f"{DERIVED_STAT_METRICS[metric].format(t=stat_alias, ip_decimal=ip_decimal_sql)} AS {metric}"
+
+
+def derived_metric_inputs(metric: str) -> set:
+    """Stat columns a derived metric reads."""
+    expr = DERIVED_STAT_METRICS[metric]
+    inputs = {m.group(2) for m in re.finditer(r'\{t\}\.("?)(\w+)\1', expr)}
+    if "{ip_decimal}" in expr:
+        inputs.add("ip")
+    return inputs
+
+
+def sport_stat_names(config: dict) -> set:
+    """Column names one sport's views show: its redaction lists plus SPORT_STAT_COLUMNS."""
+    return set(standard_redacted_columns + config["redacted_columns"] + SPORT_STAT_COLUMNS.get(config["suffix"], []))
+
+
+def sport_derived_metrics(config: dict) -> list:
+    """The DERIVED_STAT_METRICS shown by one sport."""
+    names = sport_stat_names(config)
+    return [metric for metric in DERIVED_STAT_METRICS if metric in names]
+
+
+def sport_stat_mapping(config: dict) -> dict:
+    """The part of athlete_stat_mapping pivoted into one sport's stat MV."""
+    names = sport_stat_names(config)
+    for metric in sport_derived_metrics(config):
+        names |= derived_metric_inputs(metric)
+    return {dtid: col for dtid, col in athlete_stat_mapping.items() if col in names}
+
+
+def sport_stat_wide_columns(config: dict) -> list:
+    """Columns of a sport's stat MV besides athlete_id."""
+    return list(sport_stat_mapping(config).values()) + ["gp_prev"] + sport_derived_metrics(config)
+
+
+def stat_source_ctes(sport_id: int = None) -> str:
+    """CTEs ending in latest_stat: every athlete's season stats for their preferred season.
+
+    With `sport_id`, only that sport's athletes are read.
+    """
+    sport_filter = f"\n        WHERE cs.sport_id = {sport_id}" if sport_id is not None else ""
+    return f"""season_pref AS (
+        SELECT cs.athlete_id, sss.season
+        FROM intermediate.mv_athlete_current_school cs
+        JOIN public.sport_season_selector sss ON sss.sport_id = cs.sport_id AND sss.is_juco = cs.is_juco{sport_filter}
+    ),
+    latest_stat AS (
+        SELECT s.athlete_id, s.data_type_id, s.value
+        FROM stat s
+        JOIN season_pref sp ON sp.athlete_id = s.athlete_id AND sp.season = s.season
+        WHERE s.game_id IS NULL
+    )"""
+
+
+def stat_wide_ctes(mv_name: str, mapping: dict, sport_id: int = None) -> str:
+    """WITH clause of a stat wide MV, providing pivoted_stats and prev_season_gp."""
+    source_ctes = stat_source_ctes(sport_id)
+    return f"""WITH {source_ctes},
+    prev_season_gp AS (
+        SELECT DISTINCT ON (s.athlete_id) s.athlete_id, {typed_value_sql("s.value", 98)} AS gp_prev
+        FROM stat s
+        JOIN season_pref sp ON sp.athlete_id = s.athlete_id AND s.season = sp.season - 1
+        WHERE s.game_id IS NULL AND s.data_type_id = 98
+        ORDER BY s.athlete_id, s.created_at DESC
+    ),
+    pivoted_stats AS (
+        {build_pivot_select(
+            mapping, "latest_stat", "athlete_id", pivot_strategy(mv_name), source_ctes=source_ctes
+        )}
+    )"""
+
+
+def run_dependency_graph(names, dependencies: dict, worker, max_workers: int):
+    """Run worker(name) for every name, starting each one as soon as its dependencies finish.
+
+    Dependencies that are not in `names` are treated as already satisfied. When a worker
+    fails, nothing depending on it is started; the first error is re-raised after the
+    work already running has finished.
+    """
+    names = list(names)
+    pending = {n: {d for d in dependencies.get(n, []) if d in names} for n in names}
+    failed = {}
+    skipped = []
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while pending or running:
+            # Drop everything downstream of a failure
+            blocked = [n for n, deps in pending.items() if deps & (set(failed) | set(skipped))]
+            while blocked:
+                for n in blocked:
+                    del pending[n]
+                    skipped.append(n)
+                blocked = [n for n, deps in pending.items() if deps & (set(failed) | set(skipped))]
+
+            for n in names:
+                if n in pending and not pending[n]:
+                    del pending[n]
+                    running[executor.submit(worker, n)] = n
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Dependency cycle between: {', '.join(sorted(pending))}")
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                n = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    safe_print(f"[ERROR] {n} failed: {exc}")
+                    failed[n] = exc
+                    continue
+                for deps in pending.values():
+                    deps.discard(n)
+
+    if failed:
+        if skipped:
+            safe_print(f"[ERROR] Not built because an upstream failed: {', '.join(skipped)}")
+        raise next(iter(failed.values()))
+
+
+def downstream_closure(names, dependencies: dict) -> list:
+    """Return `names` plus every MV that reads from them (transitively), in CORE_MVS order."""
+    selected = set(names)
+    changed = True
+    while changed:
+        changed = False
+        for mv_name, deps in dependencies.items():
+            if mv_name not in selected and selected.intersection(deps):
+                selected.add(mv_name)
+                changed = True
+    return [n for n in CORE_MVS if n in selected] + [n for n in names if n not in CORE_MVS]
+
+
+def upstream_closure(names, dependencies: dict) -> set:
+    """Return `names` plus every MV they read from (transitively)."""
+    selected = set()
+    stack = list(names)
+    while stack:
+        mv_name = stack.pop()
+        if mv_name not in selected:
+            selected.add(mv_name)
+            stack.extend(dependencies.get(mv_name, []))
+    return selected
+
+
+def dependency_order(names, dependencies: dict) -> list:
+    """Return `names` ordered so that every MV comes after the MVs it reads from."""
+    remaining = list(names)
+    ordered = []
+    while remaining:
+        ready = [n for n in remaining if not set(dependencies.get(n, [])) & set(remaining)]
+        if not ready:
+            raise ValueError(f"dependency cycle among: {', '.join(remaining)}")
+        ordered += ready
+        remaining = [n for n in remaining if n not in ready]
+    return ordered
+
+
+def retarget_sql(stmt: str, mv_names, schema: str) -> str:
+    """Point references to intermediate.<mv> at <schema>.<mv> for the given MV names."""
+    if not mv_names:
+        return stmt
+    pattern = r"\bintermediate\.(" + "|".join(re.escape(n) for n in mv_names) + r")\b"
+    return re.sub(pattern, lambda m: f"{schema}.{m.group(1)}", stmt)
+
+
+def build_mv_statements():
+    """Build the DROP/CREATE statements for every materialized view, keyed by MV name."""
 
     # Latest athlete facts
     _AF_IDS_SQL = ids_in_clause_from(athlete_fact_mapping)
@@ -651,9 +1409,10 @@ def create_materialized_views():
     athlete_fact_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_athlete_fact_wide AS
     WITH base AS (
-        SELECT athlete_id, {build_case_lines(athlete_fact_mapping)}
-        FROM intermediate.latest_athlete_facts
-        GROUP BY athlete_id
+        {build_pivot_select(
+            athlete_fact_mapping, "intermediate.latest_athlete_facts", "athlete_id",
+            pivot_strategy("mv_athlete_fact_wide"), unique_pairs=True
+        )}
     )
     SELECT b.*,
         CASE 
@@ -671,69 +1430,68 @@ def create_materialized_views():
     """
 
     # Athlete stat wide
+    ps_ip_decimal = IP_DECIMAL_SQL.format(ip="ps.ip")
+    derived_stat_lines = [f"{ps_ip_decimal} AS ip_decimal"]
+    derived_stat_lines += [derived_metric_line(metric, "ps", ps_ip_decimal) for metric in DERIVED_STAT_METRICS]
+    derived_stat_block = ",\n        ".join(derived_stat_lines)
     athlete_stat_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_athlete_stat_wide CASCADE;"
     athlete_stat_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_athlete_stat_wide AS
-    WITH juco_flag AS (
-        SELECT a.id AS athlete_id, a.sport_id,
-            EXISTS (
-                SELECT 1 FROM athlete_school aths
-                JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = aths.school_id
-                WHERE aths.athlete_id = a.id 
-                    AND aths.end_date IS NULL 
-                    AND scw.school_type ILIKE 'junior college'
-            ) AS is_juco
-        FROM athlete a
-    ),
-    season_pref AS (
-        SELECT j.athlete_id, sss.season
-        FROM juco_flag j
-        JOIN public.sport_season_selector sss ON sss.sport_id = j.sport_id AND sss.is_juco = j.is_juco
-    ),
-    latest_stat AS (
-        SELECT s.athlete_id, s.data_type_id, s.value
-        FROM stat s
-        JOIN season_pref sp ON sp.athlete_id = s.athlete_id AND sp.season = s.season
-        WHERE s.game_id IS NULL
-    ),
-    prev_season_gp AS (
-        SELECT DISTINCT ON (s.athlete_id) s.athlete_id, s.value AS gp_prev
-        FROM stat s
-        JOIN season_pref sp ON sp.athlete_id = s.athlete_id AND s.season = sp.season - 1
-        WHERE s.game_id IS NULL AND s.data_type_id = 98
-        ORDER BY s.athlete_id, s.created_at DESC
-    ),
-    pivoted_stats AS (
-        SELECT athlete_id, {build_case_lines(athlete_stat_mapping)}
-        FROM latest_stat
-        GROUP BY athlete_id
-    )
+    {stat_wide_ctes("mv_athlete_stat_wide", athlete_stat_mapping)}
     SELECT 
         ps.*,
-        psg.gp_prev
+        psg.gp_prev,
+        {derived_stat_block}
     FROM pivoted_stats ps
     LEFT JOIN prev_season_gp psg ON psg.athlete_id = ps.athlete_id
     WITH DATA;
     """
 
+    # Per-sport stat wide (STAT_WIDE_LAYOUT = "per_sport"): only the sport's stats, already
+    # cast, with its derived metrics
+    sport_stat_wide_statements = {}
+    for config in view_configs:
+        mv_name = SPORT_STAT_WIDE_MVS[config["suffix"]]
+        mapping = sport_stat_mapping(config)
+        stat_lines = ["ps.*", "psg.gp_prev"]
+        stat_lines += [derived_metric_line(metric, "ps", ps_ip_decimal) for metric in sport_derived_metrics(config)]
+        stat_block = ",\n        ".join(stat_lines)
+        sport_stat_wide_statements[mv_name] = {
+            "drop": f"DROP MATERIALIZED VIEW IF EXISTS intermediate.{mv_name} CASCADE;",
+            "create": f"""
+    CREATE MATERIALIZED VIEW intermediate.{mv_name} AS
+    {stat_wide_ctes(mv_name, mapping, config["sport_id"])}
+    SELECT 
+        {stat_block}
+    FROM pivoted_stats ps
+    LEFT JOIN prev_season_gp psg ON psg.athlete_id = ps.athlete_id
+    WITH DATA;
+    """,
+        }
+
     # School fact wide
     sfw_block = build_school_fact_select_block()
     school_fact_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_school_fact_wide CASCADE;"
-    school_fact_wide_create = f"""
-    CREATE MATERIALIZED VIEW intermediate.mv_school_fact_wide AS
-    WITH latest_school_facts AS (
+    school_fact_source_ctes = """latest_school_facts AS (
         SELECT DISTINCT ON (school_id, data_type_id) 
             school_id, data_type_id, value
         FROM school_fact 
         WHERE inactive IS NULL
         ORDER BY school_id, data_type_id, created_at DESC
+    )"""
+    school_fact_wide_create = f"""
+    CREATE MATERIALIZED VIEW intermediate.mv_school_fact_wide AS
+    WITH {school_fact_source_ctes},
+    pivoted_facts AS (
+        {build_pivot_select(
+            school_fact_mapping, "latest_school_facts", "school_id",
+            pivot_strategy("mv_school_fact_wide"), source_ctes=school_fact_source_ctes, unique_pairs=True
+        )}
     ),
     pivoted AS (
-        SELECT s.school_id, sch.name AS school_name,
-            {build_case_lines(school_fact_mapping, source_alias="s")}
-        FROM latest_school_facts s
-        LEFT JOIN school sch ON sch.id = s.school_id
-        GROUP BY s.school_id, sch.name
+        SELECT sch.name AS school_name, pf.*
+        FROM pivoted_facts pf
+        LEFT JOIN school sch ON sch.id = pf.school_id
     )
     SELECT p.school_id, p.school_name,
         {sfw_block},
@@ -810,50 +1568,120 @@ def create_materialized_views():
     WITH DATA;
     """
 
+    # Each athlete's current school: that of their latest TP page, else their most recently
+    # started open athlete_school row (the app's own "current school" rule). An athlete with
+    # several open rows, e.g. both a high school and a college one, therefore appears only
+    # under that school's wide MV (college/hs/juco), and is_juco, which picks the stat
+    # season, follows it; their other open rows are dropped.
+    athlete_current_school_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_athlete_current_school CASCADE;"
+    athlete_current_school_create = """
+    CREATE MATERIALIZED VIEW intermediate.mv_athlete_current_school AS
+    WITH open_school AS (
+        SELECT DISTINCT ON (athlete_id) athlete_id, school_id
+        FROM athlete_school
+        WHERE end_date IS NULL
+        ORDER BY athlete_id, start_date DESC NULLS LAST, id DESC
+    ),
+    resolved AS (
+        SELECT a.id AS athlete_id, a.sport_id, COALESCE(m.school_id, os.school_id) AS school_id
+        FROM athlete a
+        LEFT JOIN LATERAL (
+            SELECT m.school_id FROM main_tp_page m 
+            WHERE m.athlete_id = a.id 
+            ORDER BY m.initiated_date DESC NULLS LAST, m.id DESC 
+            LIMIT 1
+        ) m ON true
+        LEFT JOIN open_school os ON os.athlete_id = a.id
+    )
+    SELECT r.athlete_id, r.sport_id, r.school_id, scw.school_type,
+        COALESCE(scw.school_type ILIKE 'junior college', FALSE) AS is_juco
+    FROM resolved r
+    LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = r.school_id
+    WITH DATA;
+    """
+
+    # Camps each athlete attended, as one display string (newest first)
+    athlete_camp_attendance_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_athlete_camp_attendance CASCADE;"
+    athlete_camp_attendance_create = """
+    CREATE MATERIALIZED VIEW intermediate.mv_athlete_camp_attendance AS
+    SELECT 
+        ca.athlete_id,
+        STRING_AGG(
+            '***' || EXTRACT(YEAR FROM ce.start_date)::TEXT || '*** *&*' || COALESCE(ce.source, '') || '*&* **&' || COALESCE(CASE WHEN NULLIF(ce.org, '') IS NOT NULL THEN ce.name ELSE s.name END, '') || '**&',
+            ' | ' ORDER BY ce.start_date DESC
+        ) FILTER (WHERE ce.start_date IS NOT NULL) AS camp_attendance_text
+    FROM camp_attendance ca
+    LEFT JOIN camp_event ce ON ce.id = ca.event_id
+    LEFT JOIN state s ON s.id = ce.state_id
+    WHERE ca.athlete_id IS NOT NULL
+    GROUP BY ca.athlete_id
+    WITH DATA;
+    """
+
+    # Offers by the fbs_conf_group of the offering school, computed once per athlete
+    athlete_offer_counts_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_athlete_offer_counts CASCADE;"
+    athlete_offer_counts_create = """
+    CREATE MATERIALIZED VIEW intermediate.mv_athlete_offer_counts AS
+    WITH offer_groups AS (
+        SELECT o.athlete_id, scw.fbs_conf_group AS category, COUNT(*) AS cnt
+        FROM offer o
+        LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = o.school_id
+        WHERE o.type = 'offer'
+        GROUP BY o.athlete_id, scw.fbs_conf_group
+    )
+    SELECT
+        athlete_id,
+        COALESCE(
+            jsonb_object_agg(category, cnt ORDER BY category) FILTER (WHERE category IS NOT NULL),
+            jsonb_build_object()
+        ) AS counts_by_group,
+        SUM(cnt)::BIGINT AS offer_count_all,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'P4'), 0) AS offer_count_p4,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'G5'), 0) AS offer_count_g5,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'FCS'), 0) AS offer_count_fcs,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'D2'), 0) AS offer_count_d2,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'D3'), 0) AS offer_count_d3,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'NAIA'), 0) AS offer_count_naia,
+        COALESCE(SUM(cnt) FILTER (WHERE category = 'JUCO'), 0) AS offer_count_juco,
+        COALESCE(SUM(cnt) FILTER (WHERE category NOT IN ('P4', 'G5', 'FCS', 'D2', 'D3', 'NAIA', 'JUCO') OR category IS NULL), 0) AS offer_count_other
+    FROM offer_groups
+    WHERE athlete_id IS NOT NULL
+    GROUP BY athlete_id
+    WITH DATA;
+    """
+
     # Define afw_block and asw_block for materialized views
-    afw_lines = [build_cast_line("afw", col) if col in afw_numeric_fields else f"afw.{col}"
-                 for col in athlete_fact_mapping.values() if col != "is_receiving_athletic_aid"]
+    afw_lines = [f"afw.{col}" for col in athlete_fact_mapping.values() if col != "is_receiving_athletic_aid"]
     afw_lines.append("afw.income_category")
     afw_block = ",\n        ".join(afw_lines)
 
-    asw_lines = [build_cast_line("asw", col) for col in athlete_stat_mapping.values()]
-    asw_lines.append(build_cast_line("asw", "gp_prev"))
-    asw_lines += [
-        "(CAST(asw.p_bb AS NUMERIC) + CAST(asw.p_h AS NUMERIC)) / NULLIF(CAST(c.ip_decimal AS NUMERIC), 0) AS whip",
-        "CAST(asw.ob_pct AS NUMERIC) + CAST(asw.slg_pct AS NUMERIC) AS ops",
-        "CAST(asw.so AS NUMERIC) / NULLIF(CAST(asw.p_bb AS NUMERIC), 0) AS p_so_bb",
-        "CAST(asw.bb AS NUMERIC) / NULLIF(CAST(asw.k AS NUMERIC), 0) AS hitter_bb_so",
-        "(CAST(asw.so AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) * 9 AS so_per9",
-        "(CAST(asw.p_bb AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) * 9 AS bb_per9",
-        "(CAST(asw.so AS NUMERIC) / NULLIF(CAST(asw.bf AS NUMERIC),0)) AS k_pct",
-        "(CAST(asw.p_bb AS NUMERIC) / NULLIF(CAST(asw.bf AS NUMERIC),0)) AS bb_pct",
-        '(CAST(asw."tot_reb" AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS rpg',
-        "(CAST(asw.assists AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS apg",
-        "(CAST(asw.min_played AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS mpg",
-        "(CAST(asw.pf AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS fpg",
-        "(CAST(asw.to AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS to_pg",
-        "(CAST(asw.stl AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS stl_pg",
-        "(CAST(asw.blk AS NUMERIC) / NULLIF(CAST(asw.gp AS NUMERIC),0)) AS blk_pg",
-        "(CAST(asw.kills AS NUMERIC) / NULLIF(CAST(asw.sets AS NUMERIC),0)) AS kps",
-        "(CAST(asw.digs AS NUMERIC) / NULLIF(CAST(asw.sets AS NUMERIC),0)) AS dps",
-        "(CAST(asw.points AS NUMERIC) / NULLIF(CAST(asw.sets AS NUMERIC),0)) AS pps",
-    ]
+    asw_lines = [f'asw."{col}"' if not col.isidentifier() else f"asw.{col}" for col in athlete_stat_mapping.values()]
+    asw_lines.append("asw.gp_prev")
+    asw_lines += [f"asw.{metric}" for metric in DERIVED_STAT_METRICS]
     asw_block = ",\n        ".join(asw_lines)
 
+    # With the per_sport layout the athlete wide MVs carry no stats: each sport's views
+    # join its own stat MV (see build_view_statements)
+    if STAT_WIDE_LAYOUT == "per_sport":
+        athlete_block = afw_block
+        stat_joins = ""
+    else:
+        athlete_block = f"{afw_block},\n        {asw_block}"
+        stat_joins = "LEFT JOIN intermediate.mv_athlete_stat_wide asw ON asw.athlete_id = {athlete_key}"
+
+    # The tier views' redaction flags are computed here once per row, over the finished
+    # columns. Without stats (per_sport) the views compute them (see athlete_wide_source)
+    if STAT_WIDE_LAYOUT == "per_sport":
+        tp_select_head = tp_select_tail = ""
+    else:
+        tp_select_head = f"SELECT tp.*,\n        {redaction_flag_columns()}\n    FROM ("
+        tp_select_tail = ") tp"
+
     # Additional missing MVs that public views depend on - using original logic
     mv_tp_athletes_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_tp_athletes_wide CASCADE;"
     mv_tp_athletes_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_tp_athletes_wide AS
-    WITH converted AS (
-        SELECT *, 
-            FLOOR(CAST(ip AS NUMERIC)) + 
-            CASE 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.1 THEN 1.0/3 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.2 THEN 2.0/3 
-                ELSE 0 
-            END AS ip_decimal 
-        FROM intermediate.mv_athlete_stat_wide
-    )
+    {tp_select_head}
     SELECT 
         m.id AS main_tp_page_id,
         m.athlete_id,
@@ -890,8 +1718,7 @@ def create_materialized_views():
         d.comments,
         d.link AS details_link,
         d.email,
-        {afw_block},
-        {asw_block},
+        {athlete_block},
         ahb.best_honor,
         CASE 
             WHEN lower(afw.athletic_projection) IN ('fbs p4 - top half','fbs p4 - top-half') THEN 1 
@@ -951,47 +1778,24 @@ def create_materialized_views():
     JOIN athlete a ON m.athlete_id = a.id
     LEFT JOIN details_tp_page d ON d.main_tp_page_id = m.id
     LEFT JOIN intermediate.mv_athlete_fact_wide afw ON afw.athlete_id = m.athlete_id
-    LEFT JOIN intermediate.mv_athlete_stat_wide asw ON asw.athlete_id = m.athlete_id
+    {stat_joins.format(athlete_key="m.athlete_id")}
     LEFT JOIN intermediate.mv_athlete_honor_best ahb ON ahb.athlete_id = m.athlete_id
     LEFT JOIN intermediate.mv_athlete_commit com ON com.athlete_id = m.athlete_id 
         AND (m.initiated_date IS NULL OR com.created_at >= m.initiated_date)
     LEFT JOIN intermediate.mv_athlete_sign sig ON sig.athlete_id = m.athlete_id
     LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = m.school_id
-    LEFT JOIN converted c ON c.athlete_id = asw.athlete_id
+    {tp_select_tail}
     WITH DATA;
     """
 
     mv_college_athletes_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_college_athletes_wide CASCADE;"
     mv_college_athletes_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_college_athletes_wide AS
-    WITH converted AS (
-        SELECT *, 
-            FLOOR(CAST(ip AS NUMERIC)) + 
-            CASE 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.1 THEN 1.0/3 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.2 THEN 2.0/3 
-                ELSE 0 
-            END AS ip_decimal 
-        FROM intermediate.mv_athlete_stat_wide
-    ),
-    camp_data AS (
-        SELECT 
-            ca.athlete_id,
-            STRING_AGG(
-                '***' || EXTRACT(YEAR FROM ce.start_date)::TEXT || '*** *&*' || COALESCE(ce.source, '') || '*&* **&' || COALESCE(CASE WHEN NULLIF(ce.org, '') IS NOT NULL THEN ce.name ELSE s.name END, '') || '**&',
-                ' | ' ORDER BY ce.start_date DESC
-            ) FILTER (WHERE ca.athlete_id IS NOT NULL AND ce.start_date IS NOT NULL) AS camp_attendance_text
-        FROM camp_attendance ca
-        LEFT JOIN camp_event ce ON ce.id = ca.event_id
-        LEFT JOIN state s ON s.id = ce.state_id
-        WHERE ca.athlete_id IS NOT NULL
-        GROUP BY ca.athlete_id
-    ),
-    base AS (
+    WITH base AS (
         SELECT 
             m.id AS main_tp_page_id,
             a.id AS athlete_id,
-            COALESCE(m.school_id, aths.school_id) AS school_id,
+            cs.school_id AS school_id,
             a.sport_id,
             m.initiated_date,
             m.last_updated,
@@ -1024,8 +1828,7 @@ def create_materialized_views():
             d.link AS details_link,
             d.email,
 
-            {afw_block},
-            {asw_block},
+            {athlete_block},
 
             ahb.best_honor,
             CASE 
@@ -1089,9 +1892,9 @@ def create_materialized_views():
             ) AS is_receiving_athletic_aid,
 
             -- >>> ADDED: normalized roster year and windowed max per (sport_id, school_id)
-            CASE WHEN afw.roster_year ~ '^\d+$' THEN afw.roster_year::int END AS roster_year_int,
-            MAX(CASE WHEN afw.roster_year ~ '^\d+$' THEN afw.roster_year::int END)
-              OVER (PARTITION BY a.sport_id, COALESCE(m.school_id, aths.school_id)) AS max_roster_year,
+            CASE WHEN afw.roster_year = TRUNC(afw.roster_year) THEN afw.roster_year::int END AS roster_year_int,
+            MAX(CASE WHEN afw.roster_year = TRUNC(afw.roster_year) THEN afw.roster_year::int END)
+              OVER (PARTITION BY a.sport_id, cs.school_id) AS max_roster_year,
 
             -- >>> ADDED: camp attendance text field
             COALESCE(cd.camp_attendance_text, '') AS camp_attendance_text
@@ -1104,16 +1907,15 @@ def create_materialized_views():
             LIMIT 1
         ) m ON true
         LEFT JOIN details_tp_page d ON d.main_tp_page_id = m.id
-        LEFT JOIN athlete_school aths ON aths.athlete_id = a.id AND aths.end_date IS NULL
+        LEFT JOIN intermediate.mv_athlete_current_school cs ON cs.athlete_id = a.id
         LEFT JOIN intermediate.mv_athlete_fact_wide afw ON afw.athlete_id = a.id
-        LEFT JOIN intermediate.mv_athlete_stat_wide asw ON asw.athlete_id = a.id
+        {stat_joins.format(athlete_key="a.id")}
         LEFT JOIN intermediate.mv_athlete_honor_best ahb ON ahb.athlete_id = a.id
         LEFT JOIN intermediate.mv_athlete_commit com ON com.athlete_id = a.id 
             AND (m.initiated_date IS NULL OR com.created_at >= m.initiated_date)
         LEFT JOIN intermediate.mv_athlete_sign sig ON sig.athlete_id = a.id
-        LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = COALESCE(m.school_id, aths.school_id)
-        LEFT JOIN converted c ON c.athlete_id = asw.athlete_id
-        LEFT JOIN camp_data cd ON cd.athlete_id = a.id
+        LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = cs.school_id
+        LEFT JOIN intermediate.mv_athlete_camp_attendance cd ON cd.athlete_id = a.id
         WHERE scw.school_type IN ('University/College','Dropped')
     )
     SELECT *
@@ -1126,33 +1928,10 @@ def create_materialized_views():
     mv_hs_athletes_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_hs_athletes_wide CASCADE;"
     mv_hs_athletes_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_hs_athletes_wide AS
-    WITH converted AS (
-        SELECT *, 
-            FLOOR(CAST(ip AS NUMERIC)) + 
-            CASE 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.1 THEN 1.0/3 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.2 THEN 2.0/3 
-                ELSE 0 
-            END AS ip_decimal 
-        FROM intermediate.mv_athlete_stat_wide
-    ),
-    camp_data AS (
-        SELECT 
-            ca.athlete_id,
-            STRING_AGG(
-                '***' || EXTRACT(YEAR FROM ce.start_date)::TEXT || '*** *&*' || COALESCE(ce.source, '') || '*&* **&' || COALESCE(CASE WHEN NULLIF(ce.org, '') IS NOT NULL THEN ce.name ELSE s.name END, '') || '**&',
-                ' | ' ORDER BY ce.start_date DESC
-            ) FILTER (WHERE ca.athlete_id IS NOT NULL AND ce.start_date IS NOT NULL) AS camp_attendance_text
-        FROM camp_attendance ca
-        LEFT JOIN camp_event ce ON ce.id = ca.event_id
-        LEFT JOIN state s ON s.id = ce.state_id
-        WHERE ca.athlete_id IS NOT NULL
-        GROUP BY ca.athlete_id
-    )
     SELECT 
         m.id AS main_tp_page_id,
         a.id AS athlete_id,
-        COALESCE(m.school_id, aths.school_id) AS school_id,
+        cs.school_id AS school_id,
         a.sport_id,
         m.initiated_date,
         m.last_updated,
@@ -1184,8 +1963,7 @@ def create_materialized_views():
         d.comments,
         d.link AS details_link,
         d.email,
-        {afw_block},
-        {asw_block},
+        {athlete_block},
         ahb.best_honor,
         CASE 
             WHEN lower(afw.athletic_projection) IN ('fbs p4 - top half','fbs p4 - top-half') THEN 1 
@@ -1262,47 +2040,15 @@ def create_materialized_views():
         LIMIT 1
     ) m ON true
     LEFT JOIN details_tp_page d ON d.main_tp_page_id = m.id
-    LEFT JOIN athlete_school aths ON aths.athlete_id = a.id AND aths.end_date IS NULL
+    LEFT JOIN intermediate.mv_athlete_current_school cs ON cs.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_fact_wide afw ON afw.athlete_id = a.id
-    LEFT JOIN intermediate.mv_athlete_stat_wide asw ON asw.athlete_id = a.id
+    {stat_joins.format(athlete_key="a.id")}
     LEFT JOIN intermediate.mv_athlete_honor_best ahb ON ahb.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_commit com ON com.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_sign sig ON sig.athlete_id = a.id
-    LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = COALESCE(m.school_id, aths.school_id)
-    LEFT JOIN converted c ON c.athlete_id = asw.athlete_id
-    LEFT JOIN camp_data cd ON cd.athlete_id = a.id
-    LEFT JOIN LATERAL (
-        WITH all_offers AS (
-            SELECT o2.id, sf.value AS category
-            FROM offer o2
-            LEFT JOIN school_fact sf ON sf.school_id = o2.school_id AND sf.data_type_id = 252
-            WHERE o2.type = 'offer' AND o2.athlete_id = a.id
-        ),
-        offer_counts AS (
-            SELECT category, COUNT(*) AS cnt
-            FROM all_offers
-            GROUP BY category
-        ),
-        total_count AS (
-            SELECT COUNT(*) AS total FROM all_offers
-        )
-        SELECT 
-            COALESCE(
-                (SELECT jsonb_object_agg(category, cnt ORDER BY category) FROM offer_counts WHERE category IS NOT NULL),
-                jsonb_build_object()
-            ) AS counts_by_group,
-            -- Individual count columns
-            COALESCE((SELECT total FROM total_count), 0) AS offer_count_all,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'P4'), 0) AS offer_count_p4,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'G5'), 0) AS offer_count_g5,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'FCS'), 0) AS offer_count_fcs,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'D2'), 0) AS offer_count_d2,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'D3'), 0) AS offer_count_d3,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'NAIA'), 0) AS offer_count_naia,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'JUCO'), 0) AS offer_count_juco,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category NOT IN ('P4', 'G5', 'FCS', 'D2', 'D3', 'NAIA', 'JUCO') OR category IS NULL), 0) AS offer_count_other
-        FROM (SELECT 1) AS dummy
-    ) agg ON TRUE
+    LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = cs.school_id
+    LEFT JOIN intermediate.mv_athlete_camp_attendance cd ON cd.athlete_id = a.id
+    LEFT JOIN intermediate.mv_athlete_offer_counts agg ON agg.athlete_id = a.id
     WHERE scw.school_type ILIKE ANY(ARRAY['high school', 'junior college'])
     {HIDE_PREDICATE}
     WITH DATA;
@@ -1311,20 +2057,10 @@ def create_materialized_views():
     mv_juco_athletes_wide_drop = "DROP MATERIALIZED VIEW IF EXISTS intermediate.mv_juco_athletes_wide CASCADE;"
     mv_juco_athletes_wide_create = f"""
     CREATE MATERIALIZED VIEW intermediate.mv_juco_athletes_wide AS
-    WITH converted AS (
-        SELECT *, 
-            FLOOR(CAST(ip AS NUMERIC)) + 
-            CASE 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.1 THEN 1.0/3 
-                WHEN MOD(CAST(ip AS NUMERIC), 1) = 0.2 THEN 2.0/3 
-                ELSE 0 
-            END AS ip_decimal 
-        FROM intermediate.mv_athlete_stat_wide
-    )
     SELECT 
         m.id AS main_tp_page_id,
         a.id AS athlete_id,
-        COALESCE(m.school_id, aths.school_id) AS school_id,
+        cs.school_id AS school_id,
         a.sport_id,
         m.initiated_date,
         m.last_updated,
@@ -1356,8 +2092,7 @@ def create_materialized_views():
         d.comments,
         d.link AS details_link,
         d.email,
-        {afw_block},
-        {asw_block},
+        {athlete_block},
         ahb.best_honor,
         CASE 
             WHEN lower(afw.athletic_projection) IN ('fbs p4 - top half','fbs p4 - top-half') THEN 1 
@@ -1421,14 +2156,13 @@ def create_materialized_views():
         LIMIT 1
     ) m ON true
     LEFT JOIN details_tp_page d ON d.main_tp_page_id = m.id
-    LEFT JOIN athlete_school aths ON aths.athlete_id = a.id AND aths.end_date IS NULL
+    LEFT JOIN intermediate.mv_athlete_current_school cs ON cs.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_fact_wide afw ON afw.athlete_id = a.id
-    LEFT JOIN intermediate.mv_athlete_stat_wide asw ON asw.athlete_id = a.id
+    {stat_joins.format(athlete_key="a.id")}
     LEFT JOIN intermediate.mv_athlete_honor_best ahb ON ahb.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_commit com ON com.athlete_id = a.id
     LEFT JOIN intermediate.mv_athlete_sign sig ON sig.athlete_id = a.id
-    LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = COALESCE(m.school_id, aths.school_id)
-    LEFT JOIN converted c ON c.athlete_id = asw.athlete_id
+    LEFT JOIN intermediate.mv_school_fact_wide scw ON scw.school_id = cs.school_id
     WHERE scw.school_type ILIKE 'junior college'
     WITH DATA;
     """
@@ -1460,9 +2194,9 @@ def create_materialized_views():
         afw.athlete_id AS afw_athlete_id,
         afw.year AS afw_year,
         afw.primary_position AS afw_primary_position,
-        CASE WHEN afw.height_feet ~ '^-?\\d+(\\.\\d+)?$' THEN afw.height_feet::NUMERIC END AS afw_height_feet,
-        CASE WHEN afw.height_inch ~ '^-?\\d+(\\.\\d+)?$' THEN afw.height_inch::NUMERIC END AS afw_height_inch,
-        CASE WHEN afw.weight ~ '^-?\\d+(\\.\\d+)?$' THEN afw.weight::NUMERIC END AS afw_weight,
+        afw.height_feet AS afw_height_feet,
+        afw.height_inch AS afw_height_inch,
+        afw.weight AS afw_weight,
         afw.high_school AS afw_high_school,
         afw.previous_schools AS afw_previous_schools,
         afw.major AS afw_major,
@@ -1472,7 +2206,7 @@ def create_materialized_views():
         afw.image_url AS afw_image_url,
         afw.address_state AS afw_address_state,
         afw.elig_remaining AS afw_elig_remaining,
-        CASE WHEN afw.gpa ~ '^-?\\d+(\\.\\d+)?$' THEN afw.gpa::NUMERIC END AS afw_gpa,
+        afw.gpa AS afw_gpa,
         afw.highlight AS afw_highlight,
         afw.summer_league AS afw_summer_league,
         afw.survey_completed AS afw_survey_completed,
@@ -1481,14 +2215,14 @@ def create_materialized_views():
         afw.track_wrestling_profile AS afw_track_wrestling_profile,
         afw.wrestle_stat_link AS afw_wrestle_stat_link,
         afw.stats_url AS afw_stats_url,
-        CASE WHEN afw.roster_year ~ '^-?\\d+(\\.\\d+)?$' THEN afw.roster_year::NUMERIC END AS afw_roster_year,
+        afw.roster_year AS afw_roster_year,
         afw.utr_link AS afw_utr_link,
         afw.long_jump AS afw_long_jump,
         afw.college_career_score AS afw_college_career_score,
         afw.hs_career_score AS afw_hs_career_score,
         afw.football_career_score AS afw_football_career_score,
         afw.predicted_transfer_destination AS afw_predicted_transfer_destination,
-        CASE WHEN afw.transfer_odds ~ '^-?\\d+(\\.\\d+)?$' THEN afw.transfer_odds::NUMERIC END AS afw_transfer_odds,
+        afw.transfer_odds AS afw_transfer_odds,
         afw.up_predictions AS afw_up_predictions,
         afw.down_predictions AS afw_down_predictions,
         afw.flat_predictions AS afw_flat_predictions,
@@ -1503,10 +2237,10 @@ def create_materialized_views():
         afw.vert_jump AS afw_vert_jump,
         afw.roster_link AS afw_roster_link,
         afw.athletic_projection AS afw_athletic_projection,
-        CASE WHEN afw.grad_year ~ '^-?\\d+(\\.\\d+)?$' THEN afw.grad_year::NUMERIC END AS afw_grad_year,
+        afw.grad_year AS afw_grad_year,
         afw.hs_highlight AS afw_hs_highlight,
-        CASE WHEN afw.sat ~ '^-?\\d+(\\.\\d+)?$' THEN afw.sat::NUMERIC END AS afw_sat,
-        CASE WHEN afw.act ~ '^-?\\d+(\\.\\d+)?$' THEN afw.act::NUMERIC END AS afw_act,
+        afw.sat AS afw_sat,
+        afw.act AS afw_act,
         afw.gpa_type AS afw_gpa_type,
         afw.hs_coach_hide AS afw_hs_coach_hide,
         afw.best_offer AS afw_best_offer,
@@ -1569,189 +2303,1244 @@ def create_materialized_views():
         sfw.hc_email AS sfw_hc_email,
         sfw.hc_number AS sfw_hc_number,
         sfw.hs_county AS sfw_hs_county,
-        agg.counts_by_group AS offer_counts_by_group,
+        COALESCE(agg.counts_by_group, jsonb_build_object()) AS offer_counts_by_group,
         -- Individual offer count columns
-        agg.offer_count_all AS offer_count_all,
-        agg.offer_count_p4 AS offer_count_p4,
-        agg.offer_count_g5 AS offer_count_g5,
-        agg.offer_count_fcs AS offer_count_fcs,
-        agg.offer_count_d2 AS offer_count_d2,
-        agg.offer_count_d3 AS offer_count_d3,
-        agg.offer_count_naia AS offer_count_naia,
-        agg.offer_count_juco AS offer_count_juco,
-        agg.offer_count_other AS offer_count_other
+        COALESCE(agg.offer_count_all, 0) AS offer_count_all,
+        COALESCE(agg.offer_count_p4, 0) AS offer_count_p4,
+        COALESCE(agg.offer_count_g5, 0) AS offer_count_g5,
+        COALESCE(agg.offer_count_fcs, 0) AS offer_count_fcs,
+        COALESCE(agg.offer_count_d2, 0) AS offer_count_d2,
+        COALESCE(agg.offer_count_d3, 0) AS offer_count_d3,
+        COALESCE(agg.offer_count_naia, 0) AS offer_count_naia,
+        COALESCE(agg.offer_count_juco, 0) AS offer_count_juco,
+        COALESCE(agg.offer_count_other, 0) AS offer_count_other
     FROM offer o
     LEFT JOIN intermediate.mv_athlete_fact_wide afw ON afw.athlete_id = o.athlete_id
     LEFT JOIN intermediate.mv_school_fact_wide sfw ON sfw.school_id = o.school_id
     LEFT JOIN athlete_with_school a ON a.id = o.athlete_id
     LEFT JOIN intermediate.mv_school_fact_wide sfw_ath ON sfw_ath.school_id = a.school_id
-    LEFT JOIN LATERAL (
-        WITH all_offers AS (
-            SELECT o2.id, sf.value AS category
-            FROM offer o2
-            LEFT JOIN school_fact sf ON sf.school_id = o2.school_id AND sf.data_type_id = 252
-            WHERE o2.type = 'offer' AND o2.athlete_id = o.athlete_id
-        ),
-        offer_counts AS (
-            SELECT category, COUNT(*) AS cnt
-            FROM all_offers
-            GROUP BY category
-        ),
-        total_count AS (
-            SELECT COUNT(*) AS total FROM all_offers
-        )
-        SELECT 
-            COALESCE(
-                (SELECT jsonb_object_agg(category, cnt ORDER BY category) FROM offer_counts WHERE category IS NOT NULL),
-                jsonb_build_object()
-            ) AS counts_by_group,
-            -- Individual count columns
-            COALESCE((SELECT total FROM total_count), 0) AS offer_count_all,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'P4'), 0) AS offer_count_p4,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'G5'), 0) AS offer_count_g5,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'FCS'), 0) AS offer_count_fcs,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'D2'), 0) AS offer_count_d2,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'D3'), 0) AS offer_count_d3,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'NAIA'), 0) AS offer_count_naia,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category = 'JUCO'), 0) AS offer_count_juco,
-            COALESCE((SELECT SUM(cnt) FROM offer_counts WHERE category NOT IN ('P4', 'G5', 'FCS', 'D2', 'D3', 'NAIA', 'JUCO') OR category IS NULL), 0) AS offer_count_other
-        FROM (SELECT 1) AS dummy
-    ) agg ON TRUE
+    LEFT JOIN intermediate.mv_athlete_offer_counts agg ON agg.athlete_id = o.athlete_id
     WHERE o.coach_ask_to_remove IS NULL
     WITH DATA;
     """
 
-    # Execute all DROP and CREATE statements with detailed labels
-    # Order matters: dependencies must be created after their dependencies
-    mv_operations = [
-        ("latest_athlete_facts", latest_athlete_facts_drop, latest_athlete_facts_create),
-        ("mv_school_fact_wide", school_fact_wide_drop, school_fact_wide_create),  # Must come before athlete_stat_wide
-        ("mv_athlete_fact_wide", athlete_fact_wide_drop, athlete_fact_wide_create),
-        ("mv_athlete_stat_wide", athlete_stat_wide_drop, athlete_stat_wide_create),  # Depends on mv_school_fact_wide
-        ("mv_athlete_honor_best", athlete_honor_best_drop, athlete_honor_best_create),
-        ("mv_athlete_commit", athlete_commit_drop, athlete_commit_create),
-        ("mv_athlete_sign", athlete_sign_drop, athlete_sign_create),
-        ("mv_tp_athletes_wide", mv_tp_athletes_wide_drop, mv_tp_athletes_wide_create),
-        ("mv_college_athletes_wide", mv_college_athletes_wide_drop, mv_college_athletes_wide_create),
-        ("mv_hs_athletes_wide", mv_hs_athletes_wide_drop, mv_hs_athletes_wide_create),
-        ("mv_juco_athletes_wide", mv_juco_athletes_wide_drop, mv_juco_athletes_wide_create),
-        ("mv_activity_feed", mv_activity_feed_drop, mv_activity_feed_create)
-    ]
+    # Listed in dependency order; MV_DEPENDENCIES holds the actual graph
+    return {
+        "latest_athlete_facts": {"drop": latest_athlete_facts_drop, "create": latest_athlete_facts_create},
+        "mv_school_fact_wide": {"drop": school_fact_wide_drop, "create": school_fact_wide_create},
+        "mv_athlete_fact_wide": {"drop": athlete_fact_wide_drop, "create": athlete_fact_wide_create},
+        "mv_athlete_current_school": {
+            "drop": athlete_current_school_drop, "create": athlete_current_school_create
+        },
+        **(
+            sport_stat_wide_statements if STAT_WIDE_LAYOUT == "per_sport"
+            else {"mv_athlete_stat_wide": {"drop": athlete_stat_wide_drop, "create": athlete_stat_wide_create}}
+        ),
+        "mv_athlete_honor_best": {"drop": athlete_honor_best_drop, "create": athlete_honor_best_create},
+        "mv_athlete_commit": {"drop": athlete_commit_drop, "create": athlete_commit_create},
+        "mv_athlete_sign": {"drop": athlete_sign_drop, "create": athlete_sign_create},
+        "mv_athlete_offer_counts": {"drop": athlete_offer_counts_drop, "create": athlete_offer_counts_create},
+        "mv_athlete_camp_attendance": {
+            "drop": athlete_camp_attendance_drop, "create": athlete_camp_attendance_create
+        },
+        "mv_tp_athletes_wide": {"drop": mv_tp_athletes_wide_drop, "create": mv_tp_athletes_wide_create},
+        "mv_college_athletes_wide": {"drop": mv_college_athletes_wide_drop, "create": mv_college_athletes_wide_create},
+        "mv_hs_athletes_wide": {"drop": mv_hs_athletes_wide_drop, "create": mv_hs_athletes_wide_create},
+        "mv_juco_athletes_wide": {"drop": mv_juco_athletes_wide_drop, "create": mv_juco_athletes_wide_create},
+        "mv_activity_feed": {"drop": mv_activity_feed_drop, "create": mv_activity_feed_create},
+    }
+
+
+def mv_enabled(mv_name: str) -> bool:
+    """The BUILD_MVS switch of an MV; per-sport stat MVs follow mv_athlete_stat_wide's unless listed."""
+    if mv_name not in BUILD_MVS and mv_name in SPORT_STAT_WIDE_MVS.values():
+        return BUILD_MVS.get("mv_athlete_stat_wide", False)
+    return BUILD_MVS.get(mv_name, False)
+
 
+def select_mvs_to_build(mv_statements: dict, dry_run: bool = False) -> tuple:
+    """Return the enabled MVs that need building, in CORE_MVS order, and every MV's fingerprint.
+
+    With `dry_run` nothing is written, not even the fingerprint table.
+    """
     # Filter MVs based on BUILD_MVS configuration
-    mv_operations = [
-        (name, drop, create) for name, drop, create in mv_operations
-        if BUILD_MVS.get(name, False)
-    ]
+    mv_names = [name for name in mv_statements if mv_enabled(name)]
 
     # Apply START_FROM_MV if specified
     if START_FROM_MV:
-        start_index = next(
-            (i for i, (name, _, _) in enumerate(mv_operations) if name == START_FROM_MV),
-            None
-        )
-        if start_index is not None:
+        if START_FROM_MV in mv_names:
+            start_index = mv_names.index(START_FROM_MV)
             safe_print(f"[MVs] Starting from {START_FROM_MV} (skipping {start_index} earlier MVs)")
-            mv_operations = mv_operations[start_index:]
+            mv_names = mv_names[start_index:]
         else:
             safe_print(f"[WARNING] START_FROM_MV='{START_FROM_MV}' not found in enabled MVs. Starting from beginning.")
 
-    if not mv_operations:
+    if not mv_names:
         safe_print("[MVs] No materialized views to build (all disabled in BUILD_MVS)")
+        return [], {}
+
+    # Fingerprints are always recorded so that a later run can skip unchanged MVs
+    if not dry_run:
+        ensure_fingerprint_table()
+    fingerprints = compute_mv_fingerprints(mv_statements)
+    if SKIP_UNCHANGED_MVS:
+        mv_names = select_changed_mvs(mv_names, fingerprints)
+        if not mv_names:
+            safe_print("[MVs] All enabled MVs are up to date")
+            return [], fingerprints
+
+    if MV_BUILD_MODE == "rebuild":
+        # DROP ... CASCADE takes every MV reading from a rebuilt one with it
+        closure = [n for n in downstream_closure(mv_names, MV_DEPENDENCIES) if n in mv_statements]
+        added = [n for n in closure if n not in mv_names]
+        if added:
+            safe_print(f"[MVs] Also rebuilding downstream MVs: {', '.join(added)}")
+        mv_names = closure
+    return mv_names, fingerprints
+
+
+def create_materialized_views() -> list:
+    """Create all enabled materialized views, in parallel along MV_DEPENDENCIES.
+
+    Returns the names of the MVs that were (re)built.
+    """
+    mv_statements = build_mv_statements()
+    mv_names, fingerprints = select_mvs_to_build(mv_statements)
+    if not mv_names:
+        return []
+    ensure_pivot_extensions(mv_names)
+
+    # Partitioned wide MVs are plain tables: nothing cascades to them, and they are
+    # rebuilt from the new upstream MVs once those are in place
+    if MV_BUILD_MODE == "shadow":
+        partitioned = downstream_closure(mv_names, MV_DEPENDENCIES)
+    else:
+        partitioned = mv_names
+    partitioned = [n for n in partitioned if n in PARTITIONED_WIDE_MVS and n in mv_statements]
+    mv_names = [n for n in mv_names if n not in PARTITIONED_WIDE_MVS]
+
+    built = []
+    if mv_names and MV_BUILD_MODE == "shadow":
+        built = build_shadow_mvs(mv_statements, mv_names, fingerprints)
+    elif mv_names and MV_BUILD_MODE == "refresh":
+        built = refresh_mvs(mv_statements, mv_names, fingerprints)
+    elif mv_names:
+        rebuild_mvs(mv_statements, mv_names, fingerprints)
+        built = mv_names
+
+    for mv_name in partitioned:
+        build_partitioned_mv(mv_name, mv_statements[mv_name]["create"], fingerprints)
+    return built + partitioned
+
+
+def rebuild_mvs(mv_statements: dict, mv_names: list, fingerprints: dict):
+    """Drop and recreate MVs in place, in parallel along MV_DEPENDENCIES."""
+    total = len(mv_names)
+
+    # Drop everything up front, downstream first. DROP ... CASCADE from parallel
+    # workers would otherwise contend for the same dependent objects.
+    for i, mv_name in enumerate(reversed(mv_names), 1):
+        if build_journal.is_done(f"mv:{mv_name}", mv_statements[mv_name]["create"]):
+            continue
+        safe_print(f"[DROP MVs] {i}/{total} - Dropping {mv_name}...")
+        run_sql(mv_statements[mv_name]["drop"], step="drop_mv", target=mv_name)
+
+    def build_one(mv_name):
+        position = mv_names.index(mv_name) + 1
+        create_stmt = mv_statements[mv_name]["create"]
+        if build_journal.is_done(f"mv:{mv_name}", create_stmt):
+            safe_print(f"[CREATE MVs] {position}/{total} - {mv_name} already built (resumed)")
+        else:
+            safe_print(f"[CREATE MVs] {position}/{total} - Creating {mv_name}...")
+            run_sql(
+                create_stmt, profile=MV_SESSION_PROFILES.get(mv_name),
+                step="create_mv", target=mv_name, relation=f"intermediate.{mv_name}"
+            )
+            stamp_mv_definition(mv_name, create_stmt)
+            build_journal.mark_done(f"mv:{mv_name}", create_stmt)
+
+        # CREATE indexes immediately after each MV
+        create_indexes_for_mv(mv_name)
+        record_mv_fingerprint(mv_name, fingerprints)
+        safe_print(f"[CREATE MVs] ✓ {mv_name} done")
+
+    safe_print(f"[MVs] Building {total} MVs with up to {MV_BUILD_CONCURRENCY} in parallel")
+    run_dependency_graph(mv_names, MV_DEPENDENCIES, build_one, MV_BUILD_CONCURRENCY)
+
+
+# Current state of an MV in intermediate: definition comment, whether it holds data and
+# whether it has a plain unique index (required by REFRESH ... CONCURRENTLY)
+MV_STATE_SQL = """
+SELECT obj_description(c.oid, 'pg_class'),
+       m.ispopulated,
+       EXISTS (
+           SELECT 1 FROM pg_index i
+           WHERE i.indrelid = c.oid AND i.indisunique AND i.indisvalid
+             AND i.indpred IS NULL AND i.indexprs IS NULL
+       )
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_matviews m ON m.schemaname = n.nspname AND m.matviewname = c.relname
+WHERE n.nspname = 'intermediate' AND c.relname = %s;
+"""
+
+
+# Change counters of the base tables behind each requested relation. Views are followed
+# through pg_depend down to tables; the filenode catches TRUNCATE, which the counters miss.
+SOURCE_TABLE_STATS_SQL = """
+WITH RECURSIVE rels(root, oid) AS (
+    SELECT c.relname::text, c.oid
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relname = ANY(%s)
+  UNION
+    SELECT rels.root, d.refobjid
+    FROM rels
+    JOIN pg_class v ON v.oid = rels.oid AND v.relkind = 'v'
+    JOIN pg_rewrite r ON r.ev_class = v.oid
+    JOIN pg_depend d ON d.objid = r.oid
+                    AND d.classid = 'pg_rewrite'::regclass
+                    AND d.refclassid = 'pg_class'::regclass
+    WHERE d.refobjid <> v.oid
+)
+SELECT rels.root,
+       s.schemaname || '.' || s.relname || ':' || pg_relation_filenode(s.relid)
+           || ':' || s.n_tup_ins || ':' || s.n_tup_upd || ':' || s.n_tup_del
+FROM rels
+JOIN pg_stat_user_tables s ON s.relid = rels.oid
+WHERE s.schemaname NOT LIKE 'intermediate%%';
+"""
+
+
+def compute_mv_fingerprints(mv_statements: dict) -> dict:
+    """Fingerprint every MV from its transitive source tables and upstream definitions."""
+    relations = sorted({rel for rels in MV_SOURCE_TABLES.values() for rel in rels})
+    table_stats = {}
+    for root, stats in fetch_all(SOURCE_TABLE_STATS_SQL, (relations,)):
+        table_stats.setdefault(root, set()).add(stats)
+
+    fingerprints = {}
+    for mv_name in mv_statements:
+        # MVs of the other STAT_WIDE_LAYOUT are not built and do not count
+        upstream = sorted(m for m in upstream_closure([mv_name], MV_DEPENDENCIES) if m in mv_statements)
+        parts = [f"def:{m}:{definition_hash(mv_statements[m]['create'])}" for m in upstream]
+        parts += sorted({
+            stats
+            for m in upstream
+            for rel in MV_SOURCE_TABLES.get(m, [])
+            for stats in table_stats.get(rel, {f"{rel}:missing"})
+        })
+        fingerprints[mv_name] = definition_hash("\n".join(parts))
+    return fingerprints
+
+
+def ensure_fingerprint_table():
+    """Create the table holding the fingerprint each MV was last built from."""
+    run_sql(f"""
+    CREATE TABLE IF NOT EXISTS {BUILD_FINGERPRINT_TABLE} (
+        mv_name TEXT PRIMARY KEY,
+        fingerprint TEXT NOT NULL,
+        built_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );""")
+
+
+def select_changed_mvs(mv_names: list, fingerprints: dict) -> list:
+    """Keep MVs that are missing or whose fingerprint changed, plus everything downstream of them."""
+    stored = {}
+    if fetch_all("SELECT to_regclass(%s) IS NOT NULL;", (BUILD_FINGERPRINT_TABLE,))[0][0]:
+        stored = dict(fetch_all(f"SELECT mv_name, fingerprint FROM {BUILD_FINGERPRINT_TABLE};"))
+    existing = {row[0] for row in fetch_all(
+        "SELECT c.relname FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = 'intermediate' AND c.relkind IN ('m', 'p');"
+    )}
+
+    changed = [
+        n for n in mv_names
+        if n in FORCE_MVS or n not in existing or stored.get(n) != fingerprints.get(n)
+    ]
+    selected = [n for n in downstream_closure(changed, MV_DEPENDENCIES) if n in mv_names]
+    unchanged = [n for n in mv_names if n not in selected]
+    if unchanged:
+        safe_print(f"[MVs] Sources unchanged, skipping: {', '.join(unchanged)}")
+    for mv_name in unchanged:
+        build_report.skip("create_mv", mv_name)
+    return selected
+
+
+def record_mv_fingerprint(mv_name: str, fingerprints: dict):
+    """Store the fingerprint an MV was just built from."""
+    if mv_name not in fingerprints:
         return
+    run_sql(f"""
+    INSERT INTO {BUILD_FINGERPRINT_TABLE} (mv_name, fingerprint, built_at)
+    VALUES ('{mv_name}', '{fingerprints[mv_name]}', now())
+    ON CONFLICT (mv_name) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, built_at = EXCLUDED.built_at;""")
 
-    for i, (mv_name, drop_stmt, create_stmt) in enumerate(mv_operations, 1):
-        # DROP operation
-        safe_print(f"[DROP MVs] {i}/{len(mv_operations)} - Dropping {mv_name}...")
-        run_sql(drop_stmt)
 
-        # CREATE operation
-        safe_print(f"[CREATE MVs] {i}/{len(mv_operations)} - Creating {mv_name}...")
-        run_sql(create_stmt)
+def refresh_mvs(mv_statements: dict, mv_names: list, fingerprints: dict) -> list:
+    """Refresh MVs in place, creating those that are missing.
 
-        # CREATE indexes immediately after each MV
-        create_indexes_for_mv(mv_name)
+    Dropping an MV whose definition changed would cascade to every MV and view reading it,
+    so those are rebuilt in SHADOW_SCHEMA with everything downstream of them and swapped
+    in (see build_shadow_mvs), after the other MVs were refreshed. Returns the refreshed
+    and rebuilt MVs.
+    """
+    changed = []
+    for mv_name in mv_names:
+        rows = fetch_all(MV_STATE_SQL, (mv_name,))
+        expected_comment = f"{DEFINITION_COMMENT_PREFIX}{definition_hash(mv_statements[mv_name]['create'])}"
+        if rows and rows[0][0] != expected_comment:
+            changed.append(mv_name)
+    rebuilt = [
+        n for n in downstream_closure(changed, MV_DEPENDENCIES)
+        if n in mv_statements and n not in PARTITIONED_WIDE_MVS
+    ]
+    if changed:
+        safe_print(f"[REFRESH MVs] Definition changed, rebuilding through a shadow swap: {', '.join(rebuilt)}")
+    mv_names = [n for n in mv_names if n not in rebuilt]
+    total = len(mv_names)
+
+    def refresh_one(mv_name):
+        position = mv_names.index(mv_name) + 1
+        create_stmt = mv_statements[mv_name]["create"]
+        if build_journal.is_done(f"refresh:{mv_name}", create_stmt):
+            safe_print(f"[REFRESH MVs] {position}/{total} - {mv_name} already refreshed (resumed)")
+            return
+        rows = fetch_all(MV_STATE_SQL, (mv_name,))
+
+        if not rows:
+            # Nothing can read an MV that does not exist, so creating it in place is safe
+            safe_print(f"[REFRESH MVs] {position}/{total} - Creating {mv_name} (missing)...")
+            run_sql(
+                create_stmt, profile=MV_SESSION_PROFILES.get(mv_name),
+                step="create_mv", target=mv_name, relation=f"intermediate.{mv_name}"
+            )
+            stamp_mv_definition(mv_name, create_stmt)
+            create_indexes_for_mv(mv_name)
+            record_mv_fingerprint(mv_name, fingerprints)
+            build_journal.mark_done(f"refresh:{mv_name}", create_stmt)
+            safe_print(f"[REFRESH MVs] ✓ {mv_name} created")
+            return
+
+        _, is_populated, has_unique_index = rows[0]
+        if not has_unique_index or advised_indexes(mv_name):
+            # Indexes are IF NOT EXISTS, so this only adds what is missing (e.g. newly adopted ones)
+            create_indexes_for_mv(mv_name)
+
+        if is_populated:
+            safe_print(f"[REFRESH MVs] {position}/{total} - Refreshing {mv_name} concurrently...")
+            run_sql(
+                f"REFRESH MATERIALIZED VIEW CONCURRENTLY intermediate.{mv_name};",
+                profile=MV_SESSION_PROFILES.get(mv_name),
+                step="refresh_mv", target=mv_name, relation=f"intermediate.{mv_name}"
+            )
+        else:
+            # CONCURRENTLY is not allowed on an MV that has never been populated
+            safe_print(f"[REFRESH MVs] {position}/{total} - Refreshing {mv_name} (not populated)...")
+            run_sql(
+                f"REFRESH MATERIALIZED VIEW intermediate.{mv_name};",
+                profile=MV_SESSION_PROFILES.get(mv_name),
+                step="refresh_mv", target=mv_name, relation=f"intermediate.{mv_name}"
+            )
+        record_mv_fingerprint(mv_name, fingerprints)
+        build_journal.mark_done(f"refresh:{mv_name}", create_stmt)
+        safe_print(f"[REFRESH MVs] ✓ {mv_name} refreshed")
+
+    if mv_names:
+        safe_print(f"[REFRESH MVs] Refreshing {total} MVs with up to {MV_BUILD_CONCURRENCY} in parallel")
+        run_dependency_graph(mv_names, MV_DEPENDENCIES, refresh_one, MV_BUILD_CONCURRENCY)
+    if changed:
+        rebuilt = build_shadow_mvs(mv_statements, changed, fingerprints)
+    return mv_names + rebuilt
+
+
+def build_shadow_mvs(mv_statements: dict, mv_names: list, fingerprints: dict) -> list:
+    """Build MVs in SHADOW_SCHEMA and swap them into intermediate once all are ready.
+
+    Returns the swapped MVs, which include everything downstream of `mv_names`.
+    """
+    closure = [
+        n for n in downstream_closure(mv_names, MV_DEPENDENCIES)
+        if n in mv_statements and n not in PARTITIONED_WIDE_MVS
+    ]
+    added = [n for n in closure if n not in mv_names]
+    if added:
+        safe_print(f"[SHADOW] Also rebuilding downstream MVs: {', '.join(added)}")
+    mv_names = closure
+    total = len(mv_names)
 
+    run_sql(f"CREATE SCHEMA IF NOT EXISTS {SHADOW_SCHEMA};")
 
-def create_indexes_for_mv(mv_name: str):
-    """Create indexes for a specific materialized view."""
-    # Index mapping for each MV
-    mv_indexes = {
-        "latest_athlete_facts": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS latest_athlete_facts_uq ON intermediate.latest_athlete_facts (athlete_id, data_type_id);",
-            "CREATE INDEX IF NOT EXISTS latest_athlete_facts_athlete_id ON intermediate.latest_athlete_facts (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS latest_athlete_facts_data_type_id ON intermediate.latest_athlete_facts (data_type_id);"
-        ],
-        "mv_school_fact_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_school_fact_wide_uq ON intermediate.mv_school_fact_wide (school_id);",
-            "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_school_type ON intermediate.mv_school_fact_wide (school_type);",
-            "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_division ON intermediate.mv_school_fact_wide (division);",
-            "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_conference ON intermediate.mv_school_fact_wide (conference);"
-        ],
-        "mv_athlete_fact_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_fact_wide_uq ON intermediate.mv_athlete_fact_wide (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_year ON intermediate.mv_athlete_fact_wide (year);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_primary_position ON intermediate.mv_athlete_fact_wide (primary_position);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_high_school ON intermediate.mv_athlete_fact_wide (high_school);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_survey_completed ON intermediate.mv_athlete_fact_wide (survey_completed);"
-        ],
-        "mv_athlete_stat_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_stat_wide__athlete_id ON intermediate.mv_athlete_stat_wide (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_stat_wide_gp ON intermediate.mv_athlete_stat_wide (gp);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_stat_wide_gs ON intermediate.mv_athlete_stat_wide (gs);"
-        ],
-        "mv_athlete_honor_best": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_honor_best_uq ON intermediate.mv_athlete_honor_best (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_honor_best_award ON intermediate.mv_athlete_honor_best (best_honor);"
-        ],
-        "mv_athlete_commit": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_commit_uq ON intermediate.mv_athlete_commit (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_commit_school_id ON intermediate.mv_athlete_commit (school_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_commit_created_at ON intermediate.mv_athlete_commit (created_at);"
-        ],
-        "mv_athlete_sign": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_sign_uq ON intermediate.mv_athlete_sign (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_sign_school_id ON intermediate.mv_athlete_sign (school_id);",
-            "CREATE INDEX IF NOT EXISTS mv_athlete_sign_created_at ON intermediate.mv_athlete_sign (created_at);"
-        ],
-        "mv_tp_athletes_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_tp_athletes_wide_uq ON intermediate.mv_tp_athletes_wide (main_tp_page_id);",
-            "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_sport_id ON intermediate.mv_tp_athletes_wide (sport_id);",
-            "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_school_id ON intermediate.mv_tp_athletes_wide (school_id);",
-            "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_initiated_date ON intermediate.mv_tp_athletes_wide (initiated_date DESC);"
-        ],
-        "mv_college_athletes_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_college_athletes_wide_uq ON intermediate.mv_college_athletes_wide (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_college_athletes_wide_sport_id ON intermediate.mv_college_athletes_wide (sport_id);",
-            "CREATE INDEX IF NOT EXISTS mv_college_athletes_wide_school_id ON intermediate.mv_college_athletes_wide (school_id);"
-        ],
-        "mv_hs_athletes_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_hs_athletes_wide_uq ON intermediate.mv_hs_athletes_wide (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_hs_athletes_wide_sport_id ON intermediate.mv_hs_athletes_wide (sport_id);",
-            "CREATE INDEX IF NOT EXISTS mv_hs_athletes_wide_school_id ON intermediate.mv_hs_athletes_wide (school_id);"
-        ],
-        "mv_juco_athletes_wide": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS mv_juco_athletes_wide_uq ON intermediate.mv_juco_athletes_wide (athlete_id);",
-            "CREATE INDEX IF NOT EXISTS mv_juco_athletes_wide_sport_id ON intermediate.mv_juco_athletes_wide (sport_id);",
-            "CREATE INDEX IF NOT EXISTS mv_juco_athletes_wide_school_id ON intermediate.mv_juco_athletes_wide (school_id);"
-        ],
-        "mv_activity_feed": [
-            "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_activity_feed__offer_id ON intermediate.mv_activity_feed (offer_id);",
-            "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sport_id ON intermediate.mv_activity_feed (sport_id);",
-            "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__afw_athletic_projection ON intermediate.mv_activity_feed (afw_athletic_projection);",
-            "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sfw_division ON intermediate.mv_activity_feed (sfw_division);",
-            "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sfw_conference ON intermediate.mv_activity_feed (sfw_conference);"
-        ]
-    }
+    # Clear leftovers from an earlier run that failed before swapping
+    for mv_name in reversed(mv_names):
+        if build_journal.is_done(f"shadow:{mv_name}", mv_statements[mv_name]["create"]):
+            continue
+        run_sql(f"DROP MATERIALIZED VIEW IF EXISTS {SHADOW_SCHEMA}.{mv_name} CASCADE;", step="drop_mv", target=mv_name)
 
-    indexes = mv_indexes.get(mv_name, [])
+    def build_one(mv_name):
+        position = mv_names.index(mv_name) + 1
+        create_stmt = mv_statements[mv_name]["create"]
+        if build_journal.is_done(f"shadow:{mv_name}", create_stmt):
+            safe_print(f"[SHADOW] {position}/{total} - {SHADOW_SCHEMA}.{mv_name} already built (resumed)")
+        else:
+            safe_print(f"[SHADOW] {position}/{total} - Creating {SHADOW_SCHEMA}.{mv_name}...")
+            run_sql(
+                retarget_sql(create_stmt, mv_names, SHADOW_SCHEMA),
+                profile=MV_SESSION_PROFILES.get(mv_name),
+                step="create_mv", target=mv_name, relation=f"{SHADOW_SCHEMA}.{mv_name}"
+            )
+            stamp_mv_definition(mv_name, create_stmt, schema=SHADOW_SCHEMA)
+            build_journal.mark_done(f"shadow:{mv_name}", create_stmt)
+        create_indexes_for_mv(mv_name, schema=SHADOW_SCHEMA)
+        safe_print(f"[SHADOW] ✓ {mv_name} ready")
+
+    safe_print(f"[SHADOW] Building {total} MVs in {SHADOW_SCHEMA} with up to {MV_BUILD_CONCURRENCY} in parallel")
+    run_dependency_graph(mv_names, MV_DEPENDENCIES, build_one, MV_BUILD_CONCURRENCY)
+
+    swap_definition = "\n".join(mv_statements[n]["create"] for n in mv_names)
+    if build_journal.is_done("swap", swap_definition):
+        safe_print("[SWAP] Already swapped (resumed)")
+        return mv_names
+
+    retired = retry_swap(swap_shadow_mvs, mv_names)
+    build_journal.mark_done("swap", swap_definition)
+
+    for mv_name in mv_names:
+        record_mv_fingerprint(mv_name, fingerprints)
+
+    # Nothing reads the retired MVs any more; dropping them is outside the swap transaction.
+    # Readers first: a retired MV still references the retired MVs it was built from
+    for mv_name in reversed(dependency_order(retired, MV_DEPENDENCIES)):
+        try:
+            run_sql(f"DROP MATERIALIZED VIEW IF EXISTS {RETIRED_SCHEMA}.{mv_name};", step="drop_mv", target=mv_name)
+        except Exception as e:
+            safe_print(f"[SWAP] Left {RETIRED_SCHEMA}.{mv_name} in place, still referenced: {e}")
+    return mv_names
+
+
+def retry_swap(swap, *args):
+    """Call swap(*args), retrying up to SWAP_ATTEMPTS times when its locks time out."""
+    for attempt in range(1, SWAP_ATTEMPTS + 1):
+        try:
+            return swap(*args)
+        except pg_errors.LockNotAvailable:
+            if attempt == SWAP_ATTEMPTS:
+                raise
+            safe_print(f"[SWAP] Lock not available (attempt {attempt}/{SWAP_ATTEMPTS}), retrying...")
+            time.sleep(2 * attempt)
+
+
+# Views outside the swapped MVs that read from them, with their current definitions
+DEPENDENT_VIEWS_SQL = """
+SELECT DISTINCT vn.nspname, v.relname, v.reloptions, pg_get_viewdef(v.oid)
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+JOIN pg_namespace vn ON vn.oid = v.relnamespace
+JOIN pg_class m ON m.oid = d.refobjid
+JOIN pg_namespace mn ON mn.oid = m.relnamespace
+WHERE d.classid = 'pg_rewrite'::regclass
+  AND d.refclassid = 'pg_class'::regclass
+  AND v.relkind = 'v'
+  AND v.oid <> m.oid
+  AND mn.nspname = 'intermediate'
+  AND m.relname = ANY(%s);
+"""
+
+
+def swap_shadow_mvs(mv_names: list) -> list:
+    """Move the shadow MVs into intermediate in one transaction and repoint dependent views.
+
+    Views bind to the MV they were created against, so each dependent view is re-issued
+    with its own definition after the rename, which binds it to the new MV. Returns the
+    names of the previous MVs now sitting in RETIRED_SCHEMA.
+    """
+    with pooled_conn() as conn:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %s;", (SWAP_LOCK_TIMEOUT,))
+                cur.execute("SET LOCAL statement_timeout = '60s';")
+                cur.execute(f"CREATE SCHEMA IF NOT EXISTS {RETIRED_SCHEMA};")
+
+                cur.execute(
+                    "SELECT matviewname FROM pg_matviews WHERE schemaname = 'intermediate' AND matviewname = ANY(%s);",
+                    (mv_names,)
+                )
+                live = [row[0] for row in cur.fetchall()]
+
+                # Capture definitions while they still resolve to intermediate.*
+                cur.execute(DEPENDENT_VIEWS_SQL, (live,))
+                dependent_views = cur.fetchall()
+
+                swap_start = time.monotonic()
+                for mv_name in live:
+                    cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {RETIRED_SCHEMA}.{mv_name} CASCADE;")
+                    cur.execute(f"ALTER MATERIALIZED VIEW intermediate.{mv_name} SET SCHEMA {RETIRED_SCHEMA};")
+                for mv_name in mv_names:
+                    cur.execute(f"ALTER MATERIALIZED VIEW {SHADOW_SCHEMA}.{mv_name} SET SCHEMA intermediate;")
+                reissue_views(cur, dependent_views)
+            conn.commit()
+            swap_elapsed = time.monotonic() - swap_start
+            build_report.record("swap", "intermediate", swap_elapsed, rows=len(mv_names))
+            safe_print(
+                f"[SWAP] Swapped {len(mv_names)} MVs and repointed {len(dependent_views)} views "
+                f"in {swap_elapsed * 1000:.0f} ms"
+            )
+            return live
+        except Exception:
+            conn.rollback()
+            raise
+
+
+# GRANT statements re-creating a relation's ACL (the owner's implicit rights aside)
+RELATION_GRANTS_SQL = """
+SELECT format('GRANT %%s ON %%I.%%I TO %%s%%s', a.privilege_type, n.nspname, c.relname,
+              CASE WHEN a.grantee = 0 THEN 'PUBLIC' ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+              CASE WHEN a.is_grantable THEN ' WITH GRANT OPTION' ELSE '' END)
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+CROSS JOIN aclexplode(c.relacl) a
+WHERE c.oid = %s::regclass AND a.grantee <> c.relowner;
+"""
+
+# Views reading a relation
+VIEW_DEPENDENTS_SQL = """
+SELECT DISTINCT format('%%I.%%I', vn.nspname, v.relname)
+FROM pg_depend d
+JOIN pg_rewrite r ON r.oid = d.objid
+JOIN pg_class v ON v.oid = r.ev_class
+JOIN pg_namespace vn ON vn.oid = v.relnamespace
+WHERE d.classid = 'pg_rewrite'::regclass
+  AND d.refclassid = 'pg_class'::regclass
+  AND d.refobjid = %s::regclass
+  AND v.oid <> d.refobjid;
+"""
+
+
+def reissue_views(cur, views):
+    """Re-create views captured with DEPENDENT_VIEWS_SQL, binding them to the relations now in place.
+
+    A view whose columns changed type in the new relation cannot be replaced, so it is
+    dropped and created again (still inside the caller's transaction) with its grants and
+    comment. When other views read it, that would drop them too, so the swap is refused.
+    """
+    for view_schema, view_name, reloptions, definition in views:
+        options = f" WITH ({', '.join(reloptions)})" if reloptions else ""
+        relation = f'"{view_schema}"."{view_name}"'
+        cur.execute("SAVEPOINT reissue_view;")
+        try:
+            cur.execute(f"CREATE OR REPLACE VIEW {relation}{options} AS {definition}")
+        except pg_errors.InvalidTableDefinition:
+            # "cannot change data type of view column"
+            cur.execute("ROLLBACK TO SAVEPOINT reissue_view;")
+            cur.execute(VIEW_DEPENDENTS_SQL, (relation,))
+            dependents = [row[0] for row in cur.fetchall()]
+            if dependents:
+                raise ValueError(
+                    f"{view_schema}.{view_name} must be re-created because a column it reads changed type, "
+                    f"but {', '.join(dependents)} read it; drop those views first (the view step re-creates them)"
+                )
+            cur.execute(RELATION_GRANTS_SQL, (relation,))
+            grants = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT obj_description(%s::regclass, 'pg_class');", (relation,))
+            comment = cur.fetchone()[0]
+            cur.execute(f"DROP VIEW {relation};")
+            cur.execute(f"CREATE VIEW {relation}{options} AS {definition}")
+            for grant in grants:
+                cur.execute(grant)
+            if comment is not None:
+                cur.execute(f"COMMENT ON VIEW {relation} IS %s;", (comment,))
+        cur.execute("RELEASE SAVEPOINT reissue_view;")
+
+
+# ============================================================================
+# PARTITIONED WIDE MVS
+# ============================================================================
+# Kind and definition comment of a relation in intermediate
+RELATION_STATE_SQL = """
+SELECT c.relkind, obj_description(c.oid, 'pg_class')
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'intermediate' AND c.relname = %s;
+"""
+
+
+def sport_partitions(mv_name: str) -> list:
+    """(suffix, table, bound, rows filter) of every partition of a partitioned wide MV."""
+    sport_ids = ", ".join(str(config["sport_id"]) for config in view_configs)
+    partitions = [
+        (config["suffix"], f"{mv_name}_{config['suffix']}", f"FOR VALUES IN ({config['sport_id']})",
+         f"sport_id = {config['sport_id']}")
+        for config in view_configs
+    ]
+    # Athletes of sports without views still show up in the all-sport admin views
+    partitions.append(("other", f"{mv_name}_other", "DEFAULT", f"sport_id IS NULL OR sport_id NOT IN ({sport_ids})"))
+    return partitions
+
+
+def partition_index_statements(mv_name: str, suffix: str, table: str) -> list:
+    """mv_indexes() of an MV, as (DDL, settings) on one of its partitions in SHADOW_SCHEMA."""
+    statements = []
+    for entry in mv_indexes(mv_name):
+        idx, settings = entry if isinstance(entry, tuple) else (entry, None)
+        if idx.rstrip(";").endswith("(sport_id)"):
+            continue  # one value per partition
+        idx = re.sub(
+            rf"INDEX IF NOT EXISTS (\w+) ON intermediate\.{mv_name}\b",
+            rf"INDEX IF NOT EXISTS \1_{suffix} ON {SHADOW_SCHEMA}.{table}", idx
+        )
+        statements.append((idx, settings))
+    return statements
+
+
+def build_partition(mv_name: str, create_stmt: str, partition: tuple):
+    """Build one partition of a wide MV, with its indexes, in SHADOW_SCHEMA."""
+    suffix, table, _, rows_filter = partition
+    journal_key = f"partition:{mv_name}:{suffix}"
+    if build_journal.is_done(journal_key, create_stmt):
+        safe_print(f"[PARTITIONS] {SHADOW_SCHEMA}.{table} already built (resumed)")
+        return
+    safe_print(f"[PARTITIONS] Creating {SHADOW_SCHEMA}.{table}...")
+    run_sql(f"DROP TABLE IF EXISTS {SHADOW_SCHEMA}.{table};", step="drop_mv", target=table)
+    run_sql(
+        f"CREATE TABLE {SHADOW_SCHEMA}.{table} AS SELECT * FROM ({mv_select_body(create_stmt)}) wide "
+        f"WHERE {rows_filter};",
+        profile=MV_SESSION_PROFILES.get(mv_name),
+        step="create_partition", target=table, relation=f"{SHADOW_SCHEMA}.{table}"
+    )
+    # Lets ATTACH PARTITION (and attaching next to the default partition) skip its validation scan
+    run_sql(f"ALTER TABLE {SHADOW_SCHEMA}.{table} ADD CONSTRAINT {table}_sport CHECK ({rows_filter});")
+    for idx, settings in partition_index_statements(mv_name, suffix, table):
+        run_sql(idx, profile="index", settings=settings, step="create_index", target=table,
+                relation=f"{SHADOW_SCHEMA}.{table}")
+    build_journal.mark_done(journal_key, create_stmt)
+
+
+def swap_partition(mv_name: str, partition: tuple):
+    """Replace one live partition by its copy in SHADOW_SCHEMA, in one short transaction."""
+    _, table, bound, _ = partition
+    with pooled_conn() as conn:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %s;", (SWAP_LOCK_TIMEOUT,))
+                cur.execute("SET LOCAL statement_timeout = '60s';")
+                swap_start = time.monotonic()
+                cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (f"intermediate.{table}",))
+                if cur.fetchone()[0]:
+                    cur.execute(f"ALTER TABLE intermediate.{mv_name} DETACH PARTITION intermediate.{table};")
+                    cur.execute(f"DROP TABLE intermediate.{table};")
+                cur.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{table} SET SCHEMA intermediate;")
+                cur.execute(f"ALTER TABLE intermediate.{mv_name} ATTACH PARTITION intermediate.{table} {bound};")
+            conn.commit()
+            build_report.record("swap", table, time.monotonic() - swap_start)
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def swap_partitioned_parent(mv_name: str, create_stmt: str, partitions: list):
+    """Replace a whole wide MV (or a plain MV of that name) by a new partitioned table.
+
+    The new parent and its partitions are assembled in SHADOW_SCHEMA, then moved into
+    intermediate in one transaction. The old relation (with its partitions) is moved to
+    RETIRED_SCHEMA rather than dropped, so the views reading it survive and are re-issued
+    against the new one (see reissue_views(): a view whose column types changed is
+    re-created with its grants and comment, and the swap is refused if other views read
+    it). The old relation is dropped once nothing reads it.
+    """
+    run_sql(f"DROP TABLE IF EXISTS {SHADOW_SCHEMA}.{mv_name};")
+    run_sql(
+        f"CREATE TABLE {SHADOW_SCHEMA}.{mv_name} (LIKE {SHADOW_SCHEMA}.{partitions[0][1]}) "
+        f"PARTITION BY LIST (sport_id);"
+    )
+    run_sql(
+        f"COMMENT ON TABLE {SHADOW_SCHEMA}.{mv_name} IS "
+        f"'{DEFINITION_COMMENT_PREFIX}{definition_hash(create_stmt)}';"
+    )
+    for _, table, bound, _ in partitions:
+        run_sql(f"ALTER TABLE {SHADOW_SCHEMA}.{mv_name} ATTACH PARTITION {SHADOW_SCHEMA}.{table} {bound};")
+
+    with pooled_conn() as conn:
+        conn.autocommit = False
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL lock_timeout = %s;", (SWAP_LOCK_TIMEOUT,))
+                cur.execute("SET LOCAL statement_timeout = '60s';")
+                cur.execute(f"CREATE SCHEMA IF NOT EXISTS {RETIRED_SCHEMA};")
+                cur.execute(RELATION_STATE_SQL, (mv_name,))
+                live = cur.fetchone()
+                kind = "MATERIALIZED VIEW" if live and live[0] == "m" else "TABLE"
+                cur.execute(DEPENDENT_VIEWS_SQL, ([mv_name] if live else [],))
+                dependent_views = cur.fetchall()
+                cur.execute(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(%s);",
+                    (f"intermediate.{mv_name}",)
+                )
+                old_partitions = [row[0] for row in cur.fetchall()]
+
+                swap_start = time.monotonic()
+                if live:
+                    # Leftovers of an earlier swap: nothing reads RETIRED_SCHEMA
+                    cur.execute(f"DROP MATERIALIZED VIEW IF EXISTS {RETIRED_SCHEMA}.{mv_name} CASCADE;")
+                    cur.execute(f"DROP TABLE IF EXISTS {RETIRED_SCHEMA}.{mv_name} CASCADE;")
+                    for table in old_partitions:
+                        cur.execute(f"DROP TABLE IF EXISTS {RETIRED_SCHEMA}.{table} CASCADE;")
+                    cur.execute(f"ALTER {kind} intermediate.{mv_name} SET SCHEMA {RETIRED_SCHEMA};")
+                    for table in old_partitions:
+                        cur.execute(f"ALTER TABLE intermediate.{table} SET SCHEMA {RETIRED_SCHEMA};")
+                cur.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{mv_name} SET SCHEMA intermediate;")
+                for _, table, _, _ in partitions:
+                    cur.execute(f"ALTER TABLE {SHADOW_SCHEMA}.{table} SET SCHEMA intermediate;")
+                reissue_views(cur, dependent_views)
+            conn.commit()
+            build_report.record("swap", mv_name, time.monotonic() - swap_start, rows=len(partitions))
+        except Exception:
+            conn.rollback()
+            raise
+
+    if live:
+        try:
+            run_sql(f"DROP {kind} IF EXISTS {RETIRED_SCHEMA}.{mv_name};", step="drop_mv", target=mv_name)
+        except Exception as e:
+            safe_print(f"[PARTITIONS] Left {RETIRED_SCHEMA}.{mv_name} in place, still referenced: {e}")
+
+
+def build_partitioned_mv(mv_name: str, create_stmt: str, fingerprints: dict):
+    """Build a wide MV as a sport-partitioned table, partition by partition.
+
+    Only the PARTITION_SPORTS partitions are rebuilt, unless the definition changed (or
+    the relation is not a partitioned table yet), which rebuilds all of them and the
+    parent. The fingerprint is only recorded when every partition was rebuilt.
+    """
+    partitions = sport_partitions(mv_name)
+    rows = fetch_all(RELATION_STATE_SQL, (mv_name,))
+    expected_comment = f"{DEFINITION_COMMENT_PREFIX}{definition_hash(create_stmt)}"
+    replace_parent = not rows or rows[0] != ("p", expected_comment)
+    if PARTITION_SPORTS is not None:
+        if replace_parent:
+            safe_print(f"[PARTITIONS] {mv_name} is new or its definition changed, rebuilding every partition")
+        else:
+            partitions = [p for p in partitions if p[0] in PARTITION_SPORTS]
+
+    run_sql(f"CREATE SCHEMA IF NOT EXISTS {SHADOW_SCHEMA};")
+    safe_print(
+        f"[PARTITIONS] Building {len(partitions)} partitions of {mv_name} "
+        f"with up to {MV_BUILD_CONCURRENCY} in parallel"
+    )
+    by_table = {p[1]: p for p in partitions}
+
+    def build_and_swap(table):
+        build_partition(mv_name, create_stmt, by_table[table])
+        if replace_parent:
+            return
+        journal_key = f"partition_swap:{mv_name}:{by_table[table][0]}"
+        if not build_journal.is_done(journal_key, create_stmt):
+            retry_swap(swap_partition, mv_name, by_table[table])
+            build_journal.mark_done(journal_key, create_stmt)
+        safe_print(f"[PARTITIONS] ✓ {table} swapped in")
+
+    run_dependency_graph(list(by_table), {}, build_and_swap, MV_BUILD_CONCURRENCY)
+
+    if replace_parent:
+        journal_key = f"partition_swap:{mv_name}"
+        if not build_journal.is_done(journal_key, create_stmt):
+            retry_swap(swap_partitioned_parent, mv_name, create_stmt, partitions)
+            build_journal.mark_done(journal_key, create_stmt)
+        safe_print(f"[PARTITIONS] ✓ {mv_name} replaced by a table partitioned by sport_id")
+
+    if len(partitions) == len(sport_partitions(mv_name)):
+        record_mv_fingerprint(mv_name, fingerprints)
+
+
+# Indexes for each MV. An entry is either the DDL or (DDL, settings), where settings
+# override the "index" session profile for that one statement.
+MV_INDEXES = {
+    "latest_athlete_facts": [
+        ("CREATE UNIQUE INDEX IF NOT EXISTS latest_athlete_facts_uq ON intermediate.latest_athlete_facts (athlete_id, data_type_id);", {"max_parallel_maintenance_workers": 4}),
+        "CREATE INDEX IF NOT EXISTS latest_athlete_facts_athlete_id ON intermediate.latest_athlete_facts (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS latest_athlete_facts_data_type_id ON intermediate.latest_athlete_facts (data_type_id);"
+    ],
+    "mv_school_fact_wide": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_school_fact_wide_uq ON intermediate.mv_school_fact_wide (school_id);",
+        "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_school_type ON intermediate.mv_school_fact_wide (school_type);",
+        "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_division ON intermediate.mv_school_fact_wide (division);",
+        "CREATE INDEX IF NOT EXISTS mv_school_fact_wide_conference ON intermediate.mv_school_fact_wide (conference);"
+    ],
+    "mv_athlete_fact_wide": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_fact_wide_uq ON intermediate.mv_athlete_fact_wide (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_year ON intermediate.mv_athlete_fact_wide (year);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_primary_position ON intermediate.mv_athlete_fact_wide (primary_position);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_high_school ON intermediate.mv_athlete_fact_wide (high_school);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_fact_wide_survey_completed ON intermediate.mv_athlete_fact_wide (survey_completed);"
+    ],
+    "mv_athlete_stat_wide": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_stat_wide__athlete_id ON intermediate.mv_athlete_stat_wide (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_stat_wide_gp ON intermediate.mv_athlete_stat_wide (gp);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_stat_wide_gs ON intermediate.mv_athlete_stat_wide (gs);"
+    ],
+    **{
+        mv_name: [f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{mv_name}__athlete_id ON intermediate.{mv_name} (athlete_id);"]
+        for mv_name in SPORT_STAT_WIDE_MVS.values()
+    },
+    "mv_athlete_honor_best": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_honor_best_uq ON intermediate.mv_athlete_honor_best (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_honor_best_award ON intermediate.mv_athlete_honor_best (best_honor);"
+    ],
+    "mv_athlete_commit": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_commit_uq ON intermediate.mv_athlete_commit (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_commit_school_id ON intermediate.mv_athlete_commit (school_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_commit_created_at ON intermediate.mv_athlete_commit (created_at);"
+    ],
+    "mv_athlete_sign": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_sign_uq ON intermediate.mv_athlete_sign (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_sign_school_id ON intermediate.mv_athlete_sign (school_id);",
+        "CREATE INDEX IF NOT EXISTS mv_athlete_sign_created_at ON intermediate.mv_athlete_sign (created_at);"
+    ],
+    "mv_athlete_offer_counts": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_offer_counts__athlete_id ON intermediate.mv_athlete_offer_counts (athlete_id);"
+    ],
+    "mv_athlete_camp_attendance": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_camp_attendance__athlete_id ON intermediate.mv_athlete_camp_attendance (athlete_id);"
+    ],
+    "mv_athlete_current_school": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_current_school__athlete_id ON intermediate.mv_athlete_current_school (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS ix_mv_athlete_current_school__school_id ON intermediate.mv_athlete_current_school (school_id);"
+    ],
+    "mv_tp_athletes_wide": [
+        ("CREATE UNIQUE INDEX IF NOT EXISTS mv_tp_athletes_wide_uq ON intermediate.mv_tp_athletes_wide (main_tp_page_id);", {"max_parallel_maintenance_workers": 4}),
+        "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_sport_id ON intermediate.mv_tp_athletes_wide (sport_id);",
+        "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_school_id ON intermediate.mv_tp_athletes_wide (school_id);",
+        "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_initiated_date ON intermediate.mv_tp_athletes_wide (initiated_date DESC);"
+    ],
+    "mv_college_athletes_wide": [
+        ("CREATE UNIQUE INDEX IF NOT EXISTS mv_college_athletes_wide_uq ON intermediate.mv_college_athletes_wide (athlete_id);", {"max_parallel_maintenance_workers": 4}),
+        "CREATE INDEX IF NOT EXISTS mv_college_athletes_wide_sport_id ON intermediate.mv_college_athletes_wide (sport_id);",
+        "CREATE INDEX IF NOT EXISTS mv_college_athletes_wide_school_id ON intermediate.mv_college_athletes_wide (school_id);"
+    ],
+    "mv_hs_athletes_wide": [
+        ("CREATE UNIQUE INDEX IF NOT EXISTS mv_hs_athletes_wide_uq ON intermediate.mv_hs_athletes_wide (athlete_id);", {"max_parallel_maintenance_workers": 4}),
+        "CREATE INDEX IF NOT EXISTS mv_hs_athletes_wide_sport_id ON intermediate.mv_hs_athletes_wide (sport_id);",
+        "CREATE INDEX IF NOT EXISTS mv_hs_athletes_wide_school_id ON intermediate.mv_hs_athletes_wide (school_id);"
+    ],
+    "mv_juco_athletes_wide": [
+        "CREATE UNIQUE INDEX IF NOT EXISTS mv_juco_athletes_wide_uq ON intermediate.mv_juco_athletes_wide (athlete_id);",
+        "CREATE INDEX IF NOT EXISTS mv_juco_athletes_wide_sport_id ON intermediate.mv_juco_athletes_wide (sport_id);",
+        "CREATE INDEX IF NOT EXISTS mv_juco_athletes_wide_school_id ON intermediate.mv_juco_athletes_wide (school_id);"
+    ],
+    "mv_activity_feed": [
+        ("CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_activity_feed__offer_id ON intermediate.mv_activity_feed (offer_id);", {"max_parallel_maintenance_workers": 4}),
+        "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sport_id ON intermediate.mv_activity_feed (sport_id);",
+        "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__afw_athletic_projection ON intermediate.mv_activity_feed (afw_athletic_projection);",
+        "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sfw_division ON intermediate.mv_activity_feed (sfw_division);",
+        "CREATE INDEX IF NOT EXISTS ix_mv_activity_feed__sfw_conference ON intermediate.mv_activity_feed (sfw_conference);"
+    ]
+}
+
+# Indexes on the redaction flags of mv_tp_athletes_wide, stored only by the "combined"
+# STAT_WIDE_LAYOUT
+REDACTION_FLAG_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS mv_tp_athletes_wide_sport_redaction ON intermediate.mv_tp_athletes_wide "
+    "(sport_id, needs_redaction_base, needs_redaction_gold);",
+]
+
+
+def advised_indexes(mv_name: str) -> list:
+    """DDL of the adopted entries of ADVISED_INDEXES_PATH on an MV."""
+    if not ADVISED_INDEXES_PATH or not os.path.exists(ADVISED_INDEXES_PATH):
+        return []
+    with open(ADVISED_INDEXES_PATH) as f:
+        entries = json.load(f)["indexes"]
+    return [entry["ddl"] for entry in entries if entry["mv"] == mv_name and entry.get("adopt")]
+
+
+def mv_indexes(mv_name: str) -> list:
+    """MV_INDEXES entries of an MV, plus those on columns only the current STAT_WIDE_LAYOUT
+    has and the adopted advisor ones."""
+    indexes = list(MV_INDEXES.get(mv_name, []))
+    if mv_name == "mv_tp_athletes_wide" and STAT_WIDE_LAYOUT != "per_sport":
+        indexes += REDACTION_FLAG_INDEXES
+    return indexes + [idx for idx in advised_indexes(mv_name) if idx not in indexes]
+
+
+def create_indexes_for_mv(mv_name: str, schema: str = "intermediate"):
+    """Create indexes for a specific materialized view (optionally on its copy in another schema).
+
+    Up to INDEX_BUILD_CONCURRENCY indexes are built at once, each on its own pooled connection.
+    """
+    indexes = mv_indexes(mv_name)
     if not indexes:
         safe_print(f"[INDEXES] No indexes defined for {mv_name}")
         return
 
-    for i, idx in enumerate(indexes, 1):
-        safe_print(f"[INDEXES] {i}/{len(indexes)} - Creating index for {mv_name}...")
-        run_sql(idx)
+    def build_index(position, entry):
+        idx, settings = entry if isinstance(entry, tuple) else (entry, None)
+        if schema != "intermediate":
+            idx = retarget_sql(idx, [mv_name], schema)
+        journal_key = f"index:{schema}.{mv_name}:{position}"
+        if build_journal.is_done(journal_key, idx):
+            return
+        safe_print(f"[INDEXES] {position}/{len(indexes)} - Creating index for {mv_name}...")
+        run_sql(
+            idx, profile="index", settings=settings,
+            step="create_index", target=mv_name, relation=f"{schema}.{mv_name}"
+        )
+        build_journal.mark_done(journal_key, idx)
+
+    with ThreadPoolExecutor(max_workers=max(1, INDEX_BUILD_CONCURRENCY)) as executor:
+        futures = [executor.submit(build_index, i, entry) for i, entry in enumerate(indexes, 1)]
+        wait(futures)
+    for future in futures:
+        future.result()  # re-raise the first failure
+
+
+def mv_select_body(create_stmt: str) -> str:
+    """Extract the SELECT of a CREATE MATERIALIZED VIEW ... AS <select> WITH DATA statement."""
+    match = re.search(
+        r"CREATE\s+MATERIALIZED\s+VIEW\s+\S+\s+AS\s+(.*?)\s+WITH\s+(?:NO\s+)?DATA\s*;?\s*$",
+        create_stmt, re.IGNORECASE | re.DOTALL
+    )
+    if not match:
+        raise ValueError("Not a CREATE MATERIALIZED VIEW ... AS ... WITH DATA statement")
+    return match.group(1)
+
+
+def plan_nodes(node: dict, depth: int = 0):
+    """Yield (node, depth, self_time_ms, self_blocks) for every node of an EXPLAIN JSON plan.
+
+    Self values subtract the node's children from its inclusive totals (times loops).
+    """
+    def total_time(n):
+        return n.get("Actual Total Time", 0.0) * n.get("Actual Loops", 1)
+
+    def blocks(n):
+        return (n.get("Shared Read Blocks", 0) + n.get("Shared Hit Blocks", 0)
+                + n.get("Temp Read Blocks", 0) + n.get("Temp Written Blocks", 0))
+
+    children = node.get("Plans", [])
+    self_time = total_time(node) - sum(total_time(c) for c in children)
+    self_blocks = blocks(node) - sum(blocks(c) for c in children)
+    yield node, depth, max(self_time, 0.0), max(self_blocks, 0)
+    for child in children:
+        yield from plan_nodes(child, depth + 1)
+
+
+def describe_plan_node(node: dict) -> str:
+    """One-line description of a plan node."""
+    label = node["Node Type"]
+    relation = node.get("Relation Name") or node.get("CTE Name") or node.get("Index Name")
+    if relation:
+        label += f" on {relation}"
+    return f"{label} (rows={node.get('Actual Rows', 0) * node.get('Actual Loops', 1):,})"
+
+
+def plan_spills(node: dict) -> list:
+    """Describe sorts, hashes and other nodes of a plan that went to disk."""
+    spills = []
+    for n, _, _, _ in plan_nodes(node):
+        if n.get("Sort Space Type") == "Disk":
+            spills.append(f"{describe_plan_node(n)} sorted on disk: {n.get('Sort Space Used', 0):,} kB")
+        if n.get("Hash Batches", 1) > 1:
+            spills.append(f"{describe_plan_node(n)} hash in {n['Hash Batches']} batches: {n.get('Disk Usage', 0):,} kB on disk")
+        if n.get("Temp Written Blocks", 0) and n["Node Type"] not in ("Sort", "Hash"):
+            spills.append(f"{describe_plan_node(n)} wrote {n['Temp Written Blocks']:,} temp blocks")
+    return spills
+
+
+def profile_materialized_views():
+    """EXPLAIN ANALYZE the SELECT of every enabled MV and report where its time goes."""
+    mv_statements = build_mv_statements()
+    mv_names = [name for name in mv_statements if mv_enabled(name)]
+    if not mv_names:
+        safe_print("[PROFILE] No materialized views to profile (all disabled in BUILD_MVS)")
+        return
+    ensure_pivot_extensions(mv_names)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    for i, mv_name in enumerate(mv_names, 1):
+        safe_print(f"\n[PROFILE] {i}/{len(mv_names)} - Profiling {mv_name}...")
+        body = mv_select_body(mv_statements[mv_name]["create"])
+        rows = fetch_all(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {body}",
+            profile=MV_SESSION_PROFILES.get(mv_name)
+        )
+        explain = rows[0][0]
+        if isinstance(explain, str):
+            explain = json.loads(explain)
+        result = explain[0]
+
+        plan_path = os.path.join(PROFILE_DIR, f"{mv_name}.json")
+        with open(plan_path, "w") as f:
+            json.dump(result, f, indent=2)
+
+        nodes = list(plan_nodes(result["Plan"]))
+        safe_print(
+            f"[PROFILE] {mv_name}: execution {result.get('Execution Time', 0) / 1000:.1f}s, "
+            f"planning {result.get('Planning Time', 0):.0f}ms, plan saved to {plan_path}"
+        )
+        safe_print("[PROFILE]   Top nodes by own time:")
+        for node, _, self_time, _ in sorted(nodes, key=lambda n: -n[2])[:PROFILE_TOP_NODES]:
+            safe_print(f"[PROFILE]     {self_time / 1000:8.2f}s  {describe_plan_node(node)}")
+        safe_print("[PROFILE]   Top nodes by own buffers (8 kB blocks):")
+        for node, _, _, self_blocks in sorted(nodes, key=lambda n: -n[3])[:PROFILE_TOP_NODES]:
+            safe_print(f"[PROFILE]     {self_blocks:12,}  {describe_plan_node(node)}")
+        spills = plan_spills(result["Plan"])
+        if spills:
+            safe_print("[PROFILE]   Spills to disk:")
+            for spill in spills:
+                safe_print(f"[PROFILE]     {spill}")
+
+
+# The app's statements on the generated relations, most time-consuming first
+ADVISOR_STATEMENTS_SQL = """
+SELECT s.query, s.calls, s.total_exec_time
+FROM pg_stat_statements s
+JOIN pg_database d ON d.oid = s.dbid AND d.datname = current_database()
+WHERE s.calls >= %s AND s.query ~ %s
+ORDER BY s.total_exec_time DESC
+LIMIT %s;
+"""
+
+ADVISOR_COLUMN_STATS_SQL = """
+SELECT a.attname, s.n_distinct, c.reltuples
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+LEFT JOIN pg_stats s ON s.schemaname = 'intermediate' AND s.tablename = c.relname AND s.attname = a.attname
+WHERE a.attrelid = to_regclass(%s) AND a.attnum > 0 AND NOT a.attisdropped;
+"""
+
+# Comparison of a (possibly qualified) column with anything; <> and != are not indexable
+ADVISOR_PREDICATE_RE = re.compile(r'(?:\w+\.)?"?(\w+)"?\s*(<>|!=|<=|>=|=|<|>|\bIN\b|\bBETWEEN\b)', re.IGNORECASE)
+ADVISOR_WHERE_RE = re.compile(
+    r"\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bOFFSET\b|$)", re.IGNORECASE | re.DOTALL
+)
+ADVISOR_ORDER_RE = re.compile(r"\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|\bOFFSET\b|\)|$)", re.IGNORECASE | re.DOTALL)
+ADVISOR_ORDER_ITEM_RE = re.compile(r'^(?:\w+\.)?"?(\w+)"?(?:\s+(ASC|DESC))?$', re.IGNORECASE)
+
+# Selectivities the planner also assumes without better statistics
+DEFAULT_EQ_SELECTIVITY = 0.005
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+
+
+def query_filter_columns(stmt: str) -> tuple:
+    """Columns a statement compares for equality, by range and sorts on, in statement order.
+
+    Returns (equality columns, range columns, [(sort column, descending)], has LIMIT).
+    """
+    equality, ranges = [], []
+    for clause in ADVISOR_WHERE_RE.findall(stmt):
+        for column, operator in ADVISOR_PREDICATE_RE.findall(clause):
+            operator = operator.upper()
+            if operator in ("=", "IN"):
+                equality.append(column)
+            elif operator not in ("<>", "!="):
+                ranges.append(column)
+    sort = []
+    orders = ADVISOR_ORDER_RE.findall(stmt)
+    for item in (orders[-1].split(",") if orders else []):
+        match = ADVISOR_ORDER_ITEM_RE.match(item.strip())
+        if not match:
+            break  # an expression: no plain index serves the rest of the sort
+        sort.append((match.group(1), (match.group(2) or "").upper() == "DESC"))
+    has_limit = re.search(r"\bLIMIT\b", stmt, re.IGNORECASE) is not None
+    return list(dict.fromkeys(equality)), list(dict.fromkeys(ranges)), sort, has_limit
+
+
+def candidate_index_columns(stmt: str, columns: set, view_equality: list = ()) -> list:
+    """(column, kind) pairs of the index that would serve `stmt` on a relation with `columns`.
+
+    Equality columns come first, then one range column or, for a LIMITed statement, the
+    sort columns. The `view_equality` columns filtered inside the view the statement reads
+    go after the statement's own equality columns when there is room left.
+    kind is "eq", "range", "asc" or "desc".
+    """
+    equality, ranges, sort, has_limit = query_filter_columns(stmt)
+    head = [(c, "eq") for c in equality if c in columns]
+    used = {c for c, _ in head}
+    tail = []
+    range_columns = [c for c in ranges if c in columns and c not in used]
+    if range_columns:
+        tail.append((range_columns[0], "range"))
+    elif has_limit and sort and all(c in columns for c, _ in sort):
+        tail += [(c, "desc" if desc else "asc") for c, desc in sort if c not in used]
+    used |= {c for c, _ in tail}
+    room = ADVISOR_MAX_COLUMNS - len(head) - len(tail)
+    view_columns = [(c, "eq") for c in view_equality if c in columns and c not in used][:max(room, 0)]
+    return (head + view_columns + tail)[:ADVISOR_MAX_COLUMNS]
+
+
+def index_key_columns(index_ddl: str) -> list:
+    """Plain column names of an index definition's key, in order."""
+    match = re.search(r"\bON\s+\S+\s+(?:USING\s+\w+\s+)?\(([^)]*)\)", index_ddl, re.IGNORECASE)
+    if not match:
+        return []
+    return [item.strip().split()[0].strip('"') for item in match.group(1).split(",") if item.strip()]
+
+
+def index_keys_sql(candidate: list) -> str:
+    """Key list of an index on a candidate's columns."""
+    return ", ".join(
+        (f'"{column}"' if not column.isidentifier() else column) + (" DESC" if kind == "desc" else "")
+        for column, kind in candidate
+    )
+
+
+def advised_index_ddl(mv_name: str, candidate: list) -> str:
+    """CREATE INDEX statement of a candidate, named like the hand-written MV_INDEXES."""
+    index_name = f"ix_{mv_name}__{'_'.join(column for column, _ in candidate)}"
+    if len(index_name) > 63:  # PostgreSQL would truncate it, maybe onto another index's name
+        index_name = f"{index_name[:54]}_{definition_hash(index_name)[:8]}"
+    return f"CREATE INDEX IF NOT EXISTS {index_name} ON intermediate.{mv_name} ({index_keys_sql(candidate)});"
+
+
+def explain_cost(cur, stmt: str) -> float:
+    """Planner total cost of a normalized pg_stat_statements statement ($n parameters)."""
+    cur.execute(f"EXPLAIN (FORMAT JSON, GENERIC_PLAN) {stmt}")
+    explain = cur.fetchone()[0]
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    return explain[0]["Plan"]["Total Cost"]
+
+
+def hypothetical_saved_share(cur, stmt: str, mv_name: str, candidate: list) -> float:
+    """Share of a statement's planned cost a hypopg index on `candidate` saves."""
+    before = explain_cost(cur, stmt)
+    cur.execute(
+        "SELECT indexrelid FROM hypopg_create_index(%s);",
+        (f"CREATE INDEX ON intermediate.{mv_name} ({index_keys_sql(candidate)})",)
+    )
+    try:
+        after = explain_cost(cur, stmt)
+    finally:
+        cur.execute("SELECT hypopg_reset();")
+    return max(0.0, (before - after) / before) if before else 0.0
+
+
+def heuristic_saved_share(column_stats: dict, candidate: list) -> float:
+    """Share of an MV's rows an index on `candidate` lets a statement skip, from pg_stats.
+
+    Rough: sort columns (only used for LIMITed statements) count like a range.
+    """
+    selectivity = 1.0
+    for column, kind in candidate:
+        n_distinct, reltuples = column_stats[column]
+        if kind != "eq":
+            selectivity *= DEFAULT_RANGE_SELECTIVITY
+        elif n_distinct:
+            distinct = n_distinct if n_distinct > 0 else -n_distinct * max(reltuples, 1)
+            selectivity *= 1 / max(distinct, 1)
+        else:
+            selectivity *= DEFAULT_EQ_SELECTIVITY
+    return 1 - selectivity
+
+
+def advise_indexes():
+    """Rank candidate MV indexes by the time they would save the app's statements (see ADVISE_INDEXES)."""
+    if not fetch_all("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements';"):
+        safe_print("[ADVISOR] pg_stat_statements is not installed in this database; nothing to read")
+        return
+
+    # Generated view -> (MVs it reads, columns it filters on for equality itself)
+    view_sources = {
+        name: (referenced_mvs(view["create"]), query_filter_columns(view["create"])[0])
+        for group_views in view_statements_by_group().values()
+        for name, view in group_views.items()
+    }
+    relation_pattern = r"\mintermediate\.mv_\w+|\m(" + "|".join(sorted(view_sources)) + r")\M"
+    statements = fetch_all(ADVISOR_STATEMENTS_SQL, (ADVISOR_MIN_CALLS, relation_pattern, ADVISOR_MAX_STATEMENTS))
+    safe_print(f"[ADVISOR] {len(statements)} statements with at least {ADVISOR_MIN_CALLS} calls read the generated relations")
+
+    candidates = {}
+    fallbacks = 0
+    with pooled_conn(session_settings("default")) as conn:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT installed_version IS NOT NULL FROM pg_available_extensions WHERE name = 'hypopg';"
+            )
+            hypopg = cur.fetchone()
+            method = "hypopg" if hypopg and (hypopg[0] or ADVISOR_INSTALL_HYPOPG) else "heuristic"
+            if method == "hypopg" and not hypopg[0]:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS hypopg;")
+            elif hypopg and not hypopg[0]:
+                safe_print("[ADVISOR] hypopg is available but not installed (see ADVISOR_INSTALL_HYPOPG)")
+            safe_print(f"[ADVISOR] Estimating with {method}")
+
+            column_stats, existing_keys = {}, {}
+            for stmt, calls, total_exec_time in statements:
+                words = set(re.findall(r"\w+", stmt))
+                targets = [(mv_name, ()) for mv_name in referenced_mvs(stmt)]
+                targets += [
+                    (mv_name, view_equality)
+                    for name, (mv_names, view_equality) in view_sources.items() if name in words
+                    for mv_name in mv_names
+                ]
+                for mv_name, view_equality in targets:
+                    if mv_name not in column_stats:
+                        cur.execute(ADVISOR_COLUMN_STATS_SQL, (f"intermediate.{mv_name}",))
+                        column_stats[mv_name] = {name: (nd, rt) for name, nd, rt in cur.fetchall()}
+                        cur.execute(
+                            "SELECT pg_get_indexdef(indexrelid) FROM pg_index WHERE indrelid = to_regclass(%s);",
+                            (f"intermediate.{mv_name}",)
+                        )
+                        existing_keys[mv_name] = [index_key_columns(ddl) for (ddl,) in cur.fetchall()]
+                    candidate = candidate_index_columns(stmt, set(column_stats[mv_name]), view_equality)
+                    names = [column for column, _ in candidate]
+                    if not candidate or any(keys[:len(names)] == names for keys in existing_keys[mv_name]):
+                        continue
+                    share = None
+                    if method == "hypopg":
+                        try:
+                            share = hypothetical_saved_share(cur, stmt, mv_name, candidate)
+                        except psycopg2.Error as e:
+                            # e.g. EXPLAIN (GENERIC_PLAN) before PostgreSQL 16
+                            if not fallbacks:
+                                safe_print(f"[ADVISOR] Could not plan a statement, using statistics instead: {str(e).strip()}")
+                            fallbacks += 1
+                    if share is None:
+                        share = heuristic_saved_share(column_stats[mv_name], candidate)
+                    if share <= 0:
+                        continue
+                    ddl = advised_index_ddl(mv_name, candidate)
+                    entry = candidates.setdefault(ddl, {
+                        "mv": mv_name, "columns": names, "ddl": ddl,
+                        "estimated_saved_ms": 0.0, "statements": 0, "calls": 0, "exec_time_ms": 0.0,
+                    })
+                    entry["estimated_saved_ms"] += total_exec_time * share
+                    entry["statements"] += 1
+                    entry["calls"] += calls
+                    entry["exec_time_ms"] += total_exec_time
+
+    ranked = sorted(candidates.values(), key=lambda e: -e["estimated_saved_ms"])
+    for entry in ranked:
+        entry["saved_share"] = round(entry["estimated_saved_ms"] / entry["exec_time_ms"], 3) if entry["exec_time_ms"] else 0.0
+        entry["estimated_saved_ms"] = round(entry["estimated_saved_ms"], 1)
+        entry["exec_time_ms"] = round(entry["exec_time_ms"], 1)
+        entry["adopt"] = entry["saved_share"] >= ADVISOR_ADOPT_SHARE
+
+    # Indexes adopted earlier exist now, so they are not candidates any more: keep them
+    if os.path.exists(ADVISED_INDEXES_PATH):
+        with open(ADVISED_INDEXES_PATH) as f:
+            previous = json.load(f)["indexes"]
+        ranked += [entry for entry in previous if entry.get("adopt") and entry["ddl"] not in candidates]
+
+    with open(ADVISED_INDEXES_PATH, "w") as f:
+        json.dump({
+            "generated_at": datetime.datetime.now().isoformat(),
+            "method": method,
+            "statements": len(statements),
+            "heuristic_fallbacks": fallbacks,
+            "indexes": ranked,
+        }, f, indent=2)
+
+    safe_print(f"[ADVISOR] {len(candidates)} candidate indexes written to {ADVISED_INDEXES_PATH} "
+               f"({fallbacks} estimates fell back to statistics after a planning failure)")
+    for entry in ranked[:10]:
+        safe_print(
+            f"[ADVISOR]   {'adopt' if entry['adopt'] else '     '} {entry['estimated_saved_ms'] / 1000:10.1f}s "
+            f"saved over {entry['calls']:,} calls  {entry['ddl']}"
+        )
 
 
 def create_indexes():
@@ -1763,16 +3552,106 @@ def create_indexes():
         ("mv_school_fact_wide", "CREATE UNIQUE INDEX IF NOT EXISTS mv_school_fact_wide_uq ON intermediate.mv_school_fact_wide (school_id);"),
         ("mv_athlete_honor_best", "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_honor_best_uq ON intermediate.mv_athlete_honor_best (athlete_id);"),
         ("mv_athlete_commit", "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_commit_uq ON intermediate.mv_athlete_commit (athlete_id);"),
-        ("mv_athlete_sign", "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_sign_uq ON intermediate.mv_athlete_sign (athlete_id);")
+        ("mv_athlete_sign", "CREATE UNIQUE INDEX IF NOT EXISTS mv_athlete_sign_uq ON intermediate.mv_athlete_sign (athlete_id);"),
+        ("mv_athlete_offer_counts", "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_offer_counts__athlete_id ON intermediate.mv_athlete_offer_counts (athlete_id);"),
+        ("mv_athlete_camp_attendance", "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_camp_attendance__athlete_id ON intermediate.mv_athlete_camp_attendance (athlete_id);"),
+        ("mv_athlete_current_school", "CREATE UNIQUE INDEX IF NOT EXISTS ux_mv_athlete_current_school__athlete_id ON intermediate.mv_athlete_current_school (athlete_id);")
     ]
 
     for i, (mv_name, idx) in enumerate(indexes, 1):
         safe_print(f"[CREATE INDEXES] {i}/{len(indexes)} - Creating index for {mv_name}...")
-        run_sql(idx)
+        run_sql(idx, profile="index")
         safe_print(f"[CREATE INDEXES] ✓ Index for {mv_name} created successfully")
 
 
-# Removed refresh function - no longer needed with WITH DATA approach
+# Entitlement lookup of the gated views. The index makes the check an index-only probe.
+# The function runs as its owner, so callers keep seeing only their own packages
+# through the views without needing access to user_package_access.
+ENTITLEMENT_SQL = [
+    "CREATE INDEX IF NOT EXISTS idx_user_package_access_user_package "
+    "ON public.user_package_access (user_id, customer_package_id);",
+    """CREATE OR REPLACE FUNCTION public.has_any_package(packages bigint[])
+RETURNS boolean
+LANGUAGE sql STABLE SECURITY DEFINER
+SET search_path = ''
+AS $$
+    SELECT EXISTS (
+        SELECT 1 FROM public.user_package_access upa
+        WHERE upa.user_id = auth.uid() AND upa.customer_package_id = ANY(packages)
+    )
+$$;""",
+]
+
+
+def create_entitlement_lookup():
+    """Create the index and function the views' package checks use (see package_check_sql)."""
+    safe_print("[ENTITLEMENTS] Creating the package access lookup...")
+    for stmt in ENTITLEMENT_SQL:
+        run_sql(stmt, profile="index")
+
+
+def package_check_sql(*packages) -> str:
+    """Condition true when the current user holds any of `packages` (ids or id lists).
+
+    As a scalar subquery it becomes a one-time InitPlan rather than a check per row.
+    """
+    package_list = ", ".join(str(p) for p in packages)
+    return f"(SELECT public.has_any_package(ARRAY[{package_list}]::bigint[]))"
+
+
+def conference_field(config: dict) -> str:
+    """Conference column of mv_tp_athletes_wide the sport's redaction rules read."""
+    return "conference" if config["suffix"] == "fb" else f"{config['suffix']}_conference"
+
+
+def redaction_rules(config: dict) -> dict:
+    """Condition held by each redaction flag column for one sport's rows.
+
+    needs_redaction_base drives the starter (silver for football) views, needs_redaction_gold
+    the football gold view.
+    """
+    conferences = ", ".join(f"'{conference}'" for conference in REDACTED_CONFERENCES)
+    in_conference = f"{conference_field(config)} IN ({conferences})"
+    stat_rules = {"needs_redaction_base": "gp > 0"}
+    if config["suffix"] == "fb":
+        stat_rules["needs_redaction_gold"] = "gs > 6"
+    if config["suffix"] in GP_IGNORED_SUFFIXES:
+        return {flag: f"({in_conference})" for flag in stat_rules}
+    return {flag: f"({in_conference} AND {stat_rule})" for flag, stat_rule in stat_rules.items()}
+
+
+def redaction_flag_columns() -> str:
+    """SELECT list of the REDACTION_FLAGS, picking each row's rule by its sport_id."""
+    rules = {config["sport_id"]: redaction_rules(config) for config in view_configs}
+    columns = []
+    for flag in REDACTION_FLAGS:
+        whens = "".join(
+            f"\n            WHEN {sport_id} THEN {sport_rules[flag]}"
+            for sport_id, sport_rules in rules.items() if flag in sport_rules
+        )
+        columns.append(f"CASE sport_id{whens}\n        END AS {flag}")
+    return ",\n        ".join(columns)
+
+
+def athlete_wide_source(mv_name: str, config: dict, alias: str = "t") -> str:
+    """FROM item for one sport's rows of an athlete wide MV, aliased `alias`.
+
+    With STAT_WIDE_LAYOUT = "per_sport" the wide MVs carry no stats, so the sport's own
+    stat MV is joined in, and mv_tp_athletes_wide's redaction flags are computed from it.
+    """
+    if STAT_WIDE_LAYOUT != "per_sport":
+        return f"intermediate.{mv_name} {alias}"
+    stat_cols = ", ".join(
+        f's."{col}"' if not col.isidentifier() or col == "to" else f"s.{col}"
+        for col in sport_stat_wide_columns(config)
+    )
+    if mv_name == "mv_tp_athletes_wide":
+        stat_cols += "".join(f", {rule} AS {flag}" for flag, rule in redaction_rules(config).items())
+    return (
+        f"(SELECT w.*, {stat_cols} FROM intermediate.{mv_name} w "
+        f"LEFT JOIN intermediate.{SPORT_STAT_WIDE_MVS[config['suffix']]} s ON s.athlete_id = w.athlete_id) {alias}"
+    )
+
 
 def build_view_statements(config):
     import re
@@ -1804,14 +3683,12 @@ def build_view_statements(config):
     # Football: only platinum + old_gold count as "full access"
     if is_football:
         full_access_pkgs_for_sport = [p for p in [platinum_pkg, old_gold_pkg] if p is not None]
-        conf_field = "conference"
         naia_pkgs = [p for p in [naia_pkg, naia_plus_pkg] if p is not None]
         naia_pkgs_list = ", ".join(str(p) for p in naia_pkgs)
     else:
         full_access_pkgs_for_sport = [p for p in full_access_pkgs_default if p is not None]
-        # For non-football sports, use {suffix}_conference
-        conf_field = f"{suffix}_conference"
         naia_pkgs_list = naia_pkg if naia_pkg is not None else -1  # impossible package id
+    conf_field = conference_field(config)
 
     # Combine and deduplicate redacted columns (preserve order, keep first occurrence)
     redacted_cols = list(dict.fromkeys(standard_redacted_columns + config["redacted_columns"]))
@@ -1821,44 +3698,28 @@ def build_view_statements(config):
     def quote_if_needed(col):
         return f'"{col}"' if (not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', col) or col.lower() in RESERVED_WORDS) else col
 
-    starter_select_lines = [
-        f" CASE WHEN needs_redaction THEN NULL ELSE {quote_if_needed(col)} END AS {quote_if_needed(col)}"
-        if col != conf_field else f" {quote_if_needed(col)}"
-        for col in redacted_cols
-    ]
-
-    starter_select = ",\n".join([
-        " main_tp_page_id",
-        " athlete_id",
-        " school_id",
-        " initiated_date",
-        " m_first_name",
-        " m_last_name",
-        " m_status",
-        " m_created_at",
-        " m_designated_student_athlete",
-        " school_name",
-        " division",
-        " fbs_conf_group",
-        f" {conf_field}",
-        *starter_select_lines
-    ])
-
-    # Sports where GP requirement is NOT applied (your original set)
-    gp_ignored_suffixes = {"mtaf", "wtaf", "wglf", "mglf", "wten", "mten", "wswm", "mswm", "mwre"}
-
-    # Base redaction condition (used for non-football starter-like behavior)
-    if suffix in gp_ignored_suffixes:
-        base_redaction_condition = f"({conf_field} IN ('ACC', 'Big 12', 'Big 10', 'SEC'))"
-    else:
-        base_redaction_condition = f"({conf_field} IN ('ACC', 'Big 12', 'Big 10', 'SEC') AND gp::int > 0)"
-
-    # Football GOLD redaction condition (gs > 6 instead of gp > 0)
-    if is_football:
-        if suffix in gp_ignored_suffixes:
-            gold_redaction_condition = f"({conf_field} IN ('ACC', 'Big 12', 'Big 10', 'SEC'))"
-        else:
-            gold_redaction_condition = f"({conf_field} IN ('ACC', 'Big 12', 'Big 10', 'SEC') AND gs::int > 6)"
+    def tier_select(flag):
+        """Select list of a redacted tier view, nulling the redacted columns where `flag` is set."""
+        return ",\n".join([
+            " main_tp_page_id",
+            " athlete_id",
+            " school_id",
+            " initiated_date",
+            " m_first_name",
+            " m_last_name",
+            " m_status",
+            " m_created_at",
+            " m_designated_student_athlete",
+            " school_name",
+            " division",
+            " fbs_conf_group",
+            f" {conf_field}",
+            *[
+                f" CASE WHEN {flag} THEN NULL ELSE {quote_if_needed(col)} END AS {quote_if_needed(col)}"
+                if col != conf_field else f" {quote_if_needed(col)}"
+                for col in redacted_cols
+            ]
+        ])
 
     full_access_pkgs_for_sport = sorted(set(full_access_pkgs_for_sport + EXTRA_FULL_ACCESS_PKGS))
     full_access_pkg_list = ", ".join(str(p) for p in full_access_pkgs_for_sport)
@@ -1869,30 +3730,18 @@ def build_view_statements(config):
     views[f"vw_tp_athletes_wide_{suffix}"] = {
         "drop": "",  # ← do not drop public views
         "create": f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix} AS
-SELECT t.* FROM intermediate.mv_tp_athletes_wide t  -- ← read from MV directly
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({elite_pkg}, {ultra_pkg})
-);""" if not is_football else f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix} AS
-SELECT t.* FROM intermediate.mv_tp_athletes_wide t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({platinum_pkg}, {old_gold_pkg})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_tp_athletes_wide", config)}  -- ← read from MV directly
+WHERE t.sport_id = {sport_id} AND {package_check_sql(elite_pkg, ultra_pkg)};""" if not is_football else f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix} AS
+SELECT t.* FROM {athlete_wide_source("mv_tp_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(platinum_pkg, old_gold_pkg)};"""
     }
 
     # ===== TP NAIA VIEW (same for all sports) =====
     views[f"vw_tp_athletes_wide_{suffix}_naia"] = {
         "drop": "",
         "create": f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix}_naia AS
-SELECT t.* FROM intermediate.mv_tp_athletes_wide t
-WHERE t.sport_id = {sport_id} AND t.survey_completed = 'true' AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({naia_pkgs_list})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_tp_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND t.survey_completed = 'true' AND {package_check_sql(naia_pkgs_list)};"""
     }
 
     # ===== TP STARTER-LIKE VIEW(S) =====
@@ -1902,17 +3751,9 @@ WHERE t.sport_id = {sport_id} AND t.survey_completed = 'true' AND EXISTS (
             views[f"vw_tp_athletes_wide_{suffix}_starter"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix}_starter AS
-WITH base AS (
-    SELECT *, {base_redaction_condition} AS needs_redaction
-    FROM intermediate.mv_tp_athletes_wide  -- ← pointer
-)
-SELECT {starter_select}
-FROM base
-WHERE sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id = {starter_pkg}
-);"""
+SELECT {tier_select("needs_redaction_base")}
+FROM {athlete_wide_source("mv_tp_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(starter_pkg)};"""
             }
     else:
         # Football: SILVER/SILVER_PLUS -> "_silver" (same layout as starter; GP rule)
@@ -1921,17 +3762,9 @@ WHERE sport_id = {sport_id} AND EXISTS (
             views[f"vw_tp_athletes_wide_{suffix}_silver"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix}_silver AS
-WITH base AS (
-    SELECT *, {base_redaction_condition} AS needs_redaction
-    FROM intermediate.mv_tp_athletes_wide
-)
-SELECT {starter_select}
-FROM base
-WHERE sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({pkg_list})
-);"""
+SELECT {tier_select("needs_redaction_base")}
+FROM {athlete_wide_source("mv_tp_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(pkg_list)};"""
             }
 
         # Football: GOLD -> "_gold" (uses GS > 6 rule)
@@ -1939,17 +3772,9 @@ WHERE sport_id = {sport_id} AND EXISTS (
             views[f"vw_tp_athletes_wide_{suffix}_gold"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_tp_athletes_wide_{suffix}_gold AS
-WITH base AS (
-    SELECT *, {gold_redaction_condition} AS needs_redaction
-    FROM intermediate.mv_tp_athletes_wide
-)
-SELECT {starter_select}
-FROM base
-WHERE sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id = {gold_pkg}
-);"""
+SELECT {tier_select("needs_redaction_gold")}
+FROM {athlete_wide_source("mv_tp_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(gold_pkg)};"""
             }
 
     # ===== NON-TP FULL ACCESS VIEW =====
@@ -1959,12 +3784,8 @@ WHERE sport_id = {sport_id} AND EXISTS (
         views[f"vw_athletes_wide_{suffix}"] = {
             "drop": "",
             "create": f"""CREATE OR REPLACE VIEW public.vw_athletes_wide_{suffix} AS
-SELECT t.* FROM intermediate.mv_college_athletes_wide t  -- ← pointer
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({full_access_pkg_list})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_college_athletes_wide", config)}  -- ← pointer
+WHERE t.sport_id = {sport_id} AND {package_check_sql(full_access_pkg_list)};"""
         }
 
     # ===== HIGH SCHOOL VIEWS =====
@@ -1975,24 +3796,16 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
             views[f"vw_hs_athletes_wide_{suffix}_platinum"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_hs_athletes_wide_{suffix}_platinum AS
-SELECT t.* FROM intermediate.mv_hs_athletes_wide t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({platinum_pkg}, {old_gold_pkg})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_hs_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(platinum_pkg, old_gold_pkg)};"""
             }
 
         if gold_pkg is not None:
             views[f"vw_hs_athletes_wide_{suffix}_gold"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_hs_athletes_wide_{suffix}_gold AS
-SELECT t.* FROM intermediate.mv_hs_athletes_wide t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id = {gold_pkg}
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_hs_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(gold_pkg)};"""
             }
 
         if silver_plus_pkg is not None:
@@ -2004,12 +3817,8 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
             views[f"vw_hs_athletes_wide_{suffix}_silver_plus"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_hs_athletes_wide_{suffix}_silver_plus AS
-SELECT t.* FROM intermediate.mv_hs_athletes_wide t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({pkg_list})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_hs_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(pkg_list)};"""
             }
 
         if silver_pkg is not None:
@@ -2021,12 +3830,8 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
             views[f"vw_hs_athletes_wide_{suffix}_silver"] = {
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_hs_athletes_wide_{suffix}_silver AS
-SELECT t.* FROM intermediate.mv_hs_athletes_wide t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({pkg_list})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_hs_athletes_wide", config)}
+WHERE t.sport_id = {sport_id} AND {package_check_sql(pkg_list)};"""
             }
 
     # ===== JUCO VIEW (unchanged behavior if applicable) =====
@@ -2036,12 +3841,8 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
         views[f"vw_juco_athletes_wide_{suffix}"] = {
             "drop": "",
             "create": f"""CREATE OR REPLACE VIEW public.vw_juco_athletes_wide_{suffix} AS
-SELECT t.* FROM intermediate.mv_juco_athletes_wide t  -- ← pointer
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({juco_pkg_list})
-);"""
+SELECT t.* FROM {athlete_wide_source("mv_juco_athletes_wide", config)}  -- ← pointer
+WHERE t.sport_id = {sport_id} AND {package_check_sql(juco_pkg_list)};"""
         }
 
     # ===== ACTIVITY FEED VIEWS =====
@@ -2053,11 +3854,7 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_activity_feed_{suffix}_platinum AS
 SELECT t.* FROM intermediate.mv_activity_feed t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id IN ({platinum_pkg}, {old_gold_pkg})
-);"""
+WHERE t.sport_id = {sport_id} AND {package_check_sql(platinum_pkg, old_gold_pkg)};"""
             }
 
         if gold_pkg is not None:
@@ -2065,11 +3862,7 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_activity_feed_{suffix}_gold AS
 SELECT t.* FROM intermediate.mv_activity_feed t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id = {gold_pkg}
-);"""
+WHERE t.sport_id = {sport_id} AND {package_check_sql(gold_pkg)};"""
             }
 
         if silver_plus_pkg is not None:
@@ -2077,22 +3870,131 @@ WHERE t.sport_id = {sport_id} AND EXISTS (
                 "drop": "",
                 "create": f"""CREATE OR REPLACE VIEW public.vw_activity_feed_{suffix}_silver_plus AS
 SELECT t.* FROM intermediate.mv_activity_feed t
-WHERE t.sport_id = {sport_id} AND EXISTS (
-    SELECT 1 FROM public.user_package_access upa
-    WHERE upa.user_id = auth.uid() 
-      AND upa.customer_package_id = {silver_plus_pkg}
-);"""
+WHERE t.sport_id = {sport_id} AND {package_check_sql(silver_plus_pkg)};"""
             }
 
     return views
 
 
-def create_admin_views():
-    """Create admin views for packages 3, 4, 5"""
-    safe_print("[ADMIN VIEWS] Creating admin views...")
+VIEW_COMMENT_PREFIX = "clean_db_builder view_sha="
 
+VIEW_STATE_SQL = """
+SELECT c.relname, obj_description(c.oid, 'pg_class'), pg_get_viewdef(c.oid)
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'public' AND c.relkind = 'v' AND c.relname = ANY(%s);
+"""
+
+MV_COMMENTS_SQL = """
+SELECT c.relname, obj_description(c.oid, 'pg_class')
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = 'intermediate' AND c.relkind IN ('m', 'p');
+"""
+
+
+def referenced_mvs(stmt: str) -> set:
+    """Names of the intermediate relations a statement reads."""
+    return set(re.findall(r"\bintermediate\.(\w+)", stmt))
+
+
+def view_source_hash(create_stmt: str, mv_comments: dict) -> str:
+    """Hash a view's generated SQL together with the definitions of the MVs it reads.
+
+    `SELECT t.*` is expanded when a view is created, so the view has to be re-issued
+    when an MV it reads is rebuilt from a new definition, even if its own SQL is the same.
+    """
+    referenced = sorted(referenced_mvs(create_stmt))
+    parts = [create_stmt] + [f"{mv_name}:{mv_comments.get(mv_name)}" for mv_name in referenced]
+    return definition_hash("\n".join(parts))
+
+
+def view_stamp(source_hash: str, viewdef: str) -> str:
+    """The comment a view carries after being issued from `source_hash`."""
+    return f"{VIEW_COMMENT_PREFIX}{source_hash} viewdef_sha={definition_hash(viewdef)}"
+
+
+def stamp_view_definition(view_name: str, source_hash: str):
+    """Record the generated-SQL hash and the resulting pg_get_viewdef hash in the view's comment."""
+    (viewdef,), = fetch_all("SELECT pg_get_viewdef(%s::regclass);", (f"public.{view_name}",))
+    run_sql(f"COMMENT ON VIEW public.{view_name} IS '{view_stamp(source_hash, viewdef)}';")
+
+
+def issue_views(views: dict, label: str, replace: bool = False):
+    """Create each view in `views`, skipping those whose definition is unchanged.
+
+    A view is unchanged when its comment matches both the hash of the freshly generated
+    SQL and the hash of its current pg_get_viewdef, so hand edits are also reverted.
+    With `replace`, views are updated with CREATE OR REPLACE and only dropped when a
+    column rename makes that impossible; otherwise they are dropped and recreated.
+    """
+    if VIEW_TARGETS is not None:
+        views = {name: view_def for name, view_def in views.items() if name in VIEW_TARGETS}
+        if not views:
+            return
+
+    if SKIP_UNCHANGED_VIEWS:
+        view_state = {
+            name: (comment, viewdef)
+            for name, comment, viewdef in fetch_all(VIEW_STATE_SQL, (list(views),))
+        }
+        mv_comments = dict(fetch_all(MV_COMMENTS_SQL))
+    else:
+        view_state, mv_comments = {}, {}
+
+    view_count = len(views)
+    skipped = 0
+    for i, (view_name, view_def) in enumerate(views.items(), 1):
+        if build_journal.is_done(f"view:{view_name}", view_def["create"]):
+            safe_print(f"[{label}] {i}/{view_count} - {view_name} already created (resumed)")
+            continue
+
+        source_hash = view_source_hash(view_def["create"], mv_comments)
+        comment, viewdef = view_state.get(view_name, (None, None))
+        if viewdef is not None and comment == view_stamp(source_hash, viewdef):
+            skipped += 1
+            build_report.skip("create_view", view_name)
+            continue
+
+        safe_print(f"[{label}] {i}/{view_count} - Creating {view_name}...")
+        if replace:
+            # Try CREATE OR REPLACE first (faster for most cases)
+            try:
+                run_sql(view_def["create"], profile="light", step="create_view", target=view_name)
+            except Exception as e:
+                error_msg = str(e)
+                # Check if it's a column rename conflict error (or columns removed, e.g. by a STAT_WIDE_LAYOUT switch)
+                if ("cannot change name of view column" in error_msg or "rename column" in error_msg.lower()
+                        or "cannot drop columns from view" in error_msg):
+                    safe_print(f"[{label}] Column rename conflict detected for {view_name}, dropping and recreating...")
+                    # Drop the view first, then recreate
+                    if view_def.get("drop"):
+                        run_sql(view_def["drop"], profile="light", step="drop_view", target=view_name)
+                    else:
+                        # Generate a default DROP statement if none provided
+                        run_sql(f"DROP VIEW IF EXISTS public.{view_name} CASCADE;", profile="light", step="drop_view", target=view_name)
+                    # Now recreate
+                    run_sql(view_def["create"], profile="light", step="create_view", target=view_name)
+                else:
+                    # Re-raise if it's a different error
+                    raise
+        else:
+            # Only drop if it's not empty (some views don't need dropping)
+            if view_def.get("drop"):
+                run_sql(view_def["drop"], profile="light", step="drop_view", target=view_name)
+            run_sql(view_def["create"], profile="light", step="create_view", target=view_name)
+
+        stamp_view_definition(view_name, source_hash)
+        build_journal.mark_done(f"view:{view_name}", view_def["create"])
+
+    safe_print(f"[{label}] Skipped {skipped} of {view_count} views (definition unchanged)")
+
+
+def admin_view_statements():
+    """Admin views for packages 3, 4, 5"""
     # Admin package list
     _admin_pkg_list = ", ".join(str(p) for p in EXTRA_FULL_ACCESS_PKGS)  # "3, 4, 5"
+    fb_config = next(config for config in view_configs if config["suffix"] == "fb")
 
     admin_views = {
         "vw_admin_college_athlete": {
@@ -2101,26 +4003,16 @@ def create_admin_views():
 CREATE VIEW public.vw_admin_college_athlete AS
 SELECT t.*
 FROM intermediate.mv_college_athletes_wide t
-WHERE EXISTS (
-  SELECT 1
-  FROM public.user_package_access upa
-  WHERE upa.user_id = auth.uid()
-    AND upa.customer_package_id IN ({_admin_pkg_list})
-);"""
+WHERE {package_check_sql(_admin_pkg_list)};"""
         },
         "vw_admin_hs_athlete": {
             "drop": "DROP VIEW IF EXISTS public.vw_admin_hs_athlete;",
             "create": f"""
 CREATE VIEW public.vw_admin_hs_athlete AS
 SELECT t.*
-FROM intermediate.mv_hs_athletes_wide t
+FROM {athlete_wide_source("mv_hs_athletes_wide", fb_config)}
 WHERE t.sport_id = 21
-  AND EXISTS (
-  SELECT 1
-  FROM public.user_package_access upa
-  WHERE upa.user_id = auth.uid()
-    AND upa.customer_package_id IN ({_admin_pkg_list})
-);"""
+  AND {package_check_sql(_admin_pkg_list)};"""
         },
         "vw_admin_juco_athlete": {
             "drop": "DROP VIEW IF EXISTS public.vw_admin_juco_athlete;",
@@ -2128,12 +4020,7 @@ WHERE t.sport_id = 21
 CREATE VIEW public.vw_admin_juco_athlete AS
 SELECT t.*
 FROM intermediate.mv_juco_athletes_wide t
-WHERE EXISTS (
-  SELECT 1
-  FROM public.user_package_access upa
-  WHERE upa.user_id = auth.uid()
-    AND upa.customer_package_id IN ({_admin_pkg_list})
-);"""
+WHERE {package_check_sql(_admin_pkg_list)};"""
         },
         "vw_admin_school": {
             "drop": "DROP VIEW IF EXISTS public.vw_admin_school;",
@@ -2141,33 +4028,26 @@ WHERE EXISTS (
 CREATE VIEW public.vw_admin_school AS
 SELECT t.*
 FROM intermediate.mv_school_fact_wide t
-WHERE EXISTS (
-  SELECT 1
-  FROM public.user_package_access upa
-  WHERE upa.user_id = auth.uid()
-    AND upa.customer_package_id IN ({_admin_pkg_list})
-);"""
+WHERE {package_check_sql(_admin_pkg_list)};"""
         }
     }
+    return admin_views
 
-    view_count = len(admin_views)
-    safe_print(f"[ADMIN VIEWS] Total admin views to create: {view_count}")
 
-    for i, (view_name, view_def) in enumerate(admin_views.items(), 1):
-        safe_print(f"[ADMIN VIEWS] {i}/{view_count} - Creating {view_name}...")
-
-        # Drop the view first
-        run_sql(view_def["drop"])
+def create_admin_views():
+    """Create admin views for packages 3, 4, 5"""
+    safe_print("[ADMIN VIEWS] Creating admin views...")
 
-        # Create the view
-        run_sql(view_def["create"])
+    admin_views = admin_view_statements()
+    view_count = len(admin_views)
+    safe_print(f"[ADMIN VIEWS] Total admin views to create: {view_count}")
 
+    issue_views(admin_views, "ADMIN VIEWS")
 
-def create_high_school_view():
-    """Create the high school view (public, not admin-only)"""
-    safe_print("[HIGH SCHOOL VIEW] Creating vw_high_school...")
 
-    high_school_view = {
+def high_school_view_statements():
+    """The high school view (public, not admin-only)"""
+    return {
         "vw_high_school": {
             "drop": "DROP VIEW IF EXISTS public.vw_high_school;",
             "create": """
@@ -2179,20 +4059,16 @@ WHERE school_type = 'High School'
         }
     }
 
-    for view_name, view_def in high_school_view.items():
-        safe_print(f"[HIGH SCHOOL VIEW] Creating {view_name}...")
 
-        # Drop the view first
-        run_sql(view_def["drop"])
+def create_high_school_view():
+    """Create the high school view (public, not admin-only)"""
+    safe_print("[HIGH SCHOOL VIEW] Creating vw_high_school...")
 
-        # Create the view
-        run_sql(view_def["create"])
+    issue_views(high_school_view_statements(), "HIGH SCHOOL VIEW")
 
 
-def create_pub_fb_hs_athlete_view():
-    """Create the public football high school athlete view"""
-    safe_print("[PUBLIC VIEW] Creating vw_pub_fb_hs_athlete...")
-
+def pub_fb_hs_athlete_view_statements():
+    """The public football high school athlete view"""
     view_def = {
         "drop": "DROP VIEW IF EXISTS public.vw_pub_fb_hs_athlete;",
         "create": """
@@ -2207,12 +4083,14 @@ SELECT
 FROM intermediate.mv_hs_athletes_wide
 WHERE sport_id = 21;"""
     }
+    return {"vw_pub_fb_hs_athlete": view_def}
 
-    # Drop the view first
-    run_sql(view_def["drop"])
 
-    # Create the view
-    run_sql(view_def["create"])
+def create_pub_fb_hs_athlete_view():
+    """Create the public football high school athlete view"""
+    safe_print("[PUBLIC VIEW] Creating vw_pub_fb_hs_athlete...")
+
+    issue_views(pub_fb_hs_athlete_view_statements(), "PUBLIC VIEW")
 
 
 def create_activity_feed_views():
@@ -2234,61 +4112,41 @@ def create_activity_feed_views():
     view_count = len(activity_feed_views)
     safe_print(f"[ACTIVITY FEED VIEWS] Total activity feed views to create: {view_count}")
 
-    for i, (view_name, view_def) in enumerate(activity_feed_views.items(), 1):
-        safe_print(f"[ACTIVITY FEED VIEWS] {i}/{view_count} - Creating {view_name}...")
-
-        # Only drop if it's not empty (some views don't need dropping)
-        if view_def["drop"]:
-            run_sql(view_def["drop"])
-
-        run_sql(view_def["create"])
+    issue_views(activity_feed_views, "ACTIVITY FEED VIEWS")
 
 
-def create_public_views():
-    """Create public views exactly as in original code"""
-    safe_print("[PUBLIC VIEWS] Creating public views...")
-
+def public_view_statements(verbose: bool = True):
+    """Sport-specific public views for every entry in view_configs."""
     # Generate all sport-specific views using the original logic
     all_views = {}
 
     for i, config in enumerate(view_configs, 1):
         try:
-            safe_print(f"[PUBLIC VIEWS] Processing sport {i}/{len(view_configs)}: {config['suffix']}")
+            if verbose:
+                safe_print(f"[PUBLIC VIEWS] Processing sport {i}/{len(view_configs)}: {config['suffix']}")
             sport_views = build_view_statements(config)
-            safe_print(f"[PUBLIC VIEWS] Generated {len(sport_views)} views for {config['suffix']}")
+            if verbose:
+                safe_print(f"[PUBLIC VIEWS] Generated {len(sport_views)} views for {config['suffix']}")
             all_views.update(sport_views)
         except Exception as e:
             safe_print(f"[PUBLIC VIEWS] ERROR generating views for {config['suffix']}: {e}")
             import traceback
             safe_print(f"[PUBLIC VIEWS] Traceback: {traceback.format_exc()}")
             raise
+    return all_views
+
+
+def create_public_views():
+    """Create public views exactly as in original code"""
+    safe_print("[PUBLIC VIEWS] Creating public views...")
+
+    all_views = public_view_statements()
 
     # Create all views
     view_count = len(all_views)
     safe_print(f"[PUBLIC VIEWS] Total views to create: {view_count}")
 
-    for i, (view_name, view_def) in enumerate(all_views.items(), 1):
-        safe_print(f"[PUBLIC VIEWS] {i}/{view_count} - Creating {view_name}...")
-
-        # Try CREATE OR REPLACE first (faster for most cases)
-        try:
-            run_sql(view_def["create"])
-        except Exception as e:
-            error_msg = str(e)
-            # Check if it's a column rename conflict error
-            if "cannot change name of view column" in error_msg or "rename column" in error_msg.lower():
-                safe_print(f"[PUBLIC VIEWS] Column rename conflict detected for {view_name}, dropping and recreating...")
-                # Drop the view first, then recreate
-                if view_def.get("drop"):
-                    run_sql(view_def["drop"])
-                else:
-                    # Generate a default DROP statement if none provided
-                    run_sql(f"DROP VIEW IF EXISTS public.{view_name} CASCADE;")
-                # Now recreate
-                run_sql(view_def["create"])
-            else:
-                # Re-raise if it's a different error
-                raise
+    issue_views(all_views, "PUBLIC VIEWS", replace=True)
 
 
 def create_source_table_indexes():
@@ -2339,7 +4197,7 @@ def create_source_table_indexes():
     for i, idx in enumerate(source_indexes, 1):
         safe_print(f"[SOURCE INDEXES] {i}/{len(source_indexes)} - Creating source table index...")
         try:
-            run_sql(idx)
+            run_sql(idx, profile="index", step="source_index", target=idx.split(" ON ")[1].split(" ")[0])
         except Exception as e:
             safe_print(f"[SOURCE INDEXES] Source index {i} failed (may already exist): {e}")
 
@@ -2350,8 +4208,7 @@ def test_connection():
 
     try:
         # Test basic connection
-        conn = get_conn()
-        with conn.cursor() as cur:
+        with pooled_conn() as conn, conn.cursor() as cur:
             cur.execute("SELECT version();")
             version = cur.fetchone()[0]
             safe_print(f"[TEST] Connected to: {version[:50]}...")
@@ -2376,21 +4233,215 @@ def test_connection():
     except Exception as e:
         safe_print(f"[TEST] Connection test failed: {e}")
         raise
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 
-def main():
+def view_statements_by_group() -> dict:
+    """Every generated view, keyed by its BUILD_VIEWS group."""
+    return {
+        "public_views": public_view_statements(verbose=False),
+        "admin_views": admin_view_statements(),
+        "high_school_view": high_school_view_statements(),
+        "pub_fb_hs_athlete": pub_fb_hs_athlete_view_statements(),
+    }
+
+
+def resolve_targets(targets: list, view_groups: dict) -> tuple:
+    """Split command-line targets into the MVs and the views they name.
+
+    A target is an MV name, `source_indexes`, a view name, `views:<sport suffix>` for
+    that sport's public views, `views:<group>` for a BUILD_VIEWS group (`views:admin`
+    is short for `views:admin_views`), or `views:all`.
+    """
+    mv_targets, view_names = [], set()
+    all_views = {name for views in view_groups.values() for name in views}
+    suffixes = {config["suffix"]: config for config in view_configs}
+
+    for target in targets:
+        if target in CORE_MVS:
+            mv_targets.append(target)
+        elif target == "source_indexes":
+            continue
+        elif target in all_views:
+            view_names.add(target)
+        elif target.startswith("views:"):
+            selector = target[len("views:"):]
+            groups = [g for g in (selector, f"{selector}_views", f"{selector}_view") if g in view_groups]
+            if selector == "all":
+                view_names |= all_views
+            elif selector in suffixes:
+                view_names |= set(build_view_statements(suffixes[selector]))
+            elif groups:
+                view_names |= set(view_groups[groups[0]])
+            else:
+                raise ValueError(f"unknown view selector '{target}'")
+        else:
+            raise ValueError(f"unknown target '{target}'")
+    return mv_targets, view_names
+
+
+def select_target_views(view_names: set, built_mvs: list, view_groups: dict):
+    """Limit the view step to `view_names` plus every view reading one of `built_mvs`."""
+    global VIEW_TARGETS
+    affected = {
+        name
+        for views in view_groups.values()
+        for name, view_def in views.items()
+        if referenced_mvs(view_def["create"]) & set(built_mvs)
+    }
+    VIEW_TARGETS = view_names | affected
+    for group, views in view_groups.items():
+        BUILD_VIEWS[group] = bool(VIEW_TARGETS & set(views))
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(
+        description="Build the intermediate MVs and public views.",
+        epilog="Without targets, BUILD_MVS, BUILD_VIEWS and CREATE_SOURCE_INDEXES decide what is built."
+    )
+    parser.add_argument(
+        "targets", nargs="*",
+        help="MV names (their stale upstream MVs are built too), views:<sport suffix>, "
+             "views:<group> such as views:admin, views:all, a view name, or source_indexes"
+    )
+    parser.add_argument("--mode", choices=["rebuild", "shadow", "refresh"], help="override MV_BUILD_MODE")
+    parser.add_argument("--concurrency", type=int, help="override MV_BUILD_CONCURRENCY")
+    parser.add_argument("--stat-layout", choices=["combined", "per_sport"], help="override STAT_WIDE_LAYOUT")
+    parser.add_argument(
+        "--sport", action="append", metavar="SUFFIX",
+        help="only rebuild this sport's partition of the PARTITIONED_WIDE_MVS (repeatable; 'other' for the default one)"
+    )
+    parser.add_argument("--dsn", help="connect with this libpq connection string instead of DB_SETTINGS")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="rebuild the named MVs and re-issue the named views even if unchanged"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="print the MVs and views that would be built, without changing anything"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="EXPLAIN ANALYZE the selected MVs instead of building them (see PROFILE_MVS)"
+    )
+    parser.add_argument(
+        "--advise-indexes", action="store_true",
+        help="rank candidate MV indexes from pg_stat_statements instead of building (see ADVISE_INDEXES)"
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="continue the last unfinished run, skipping steps the journal records as done"
+    )
+    return parser.parse_args(argv)
+
+
+def apply_args(args) -> tuple:
+    """Apply command-line options to the build configuration.
+
+    Returns the view names requested explicitly and the generated views by group,
+    or (None, None) when no targets were given.
+    """
+    global MV_BUILD_MODE, MV_BUILD_CONCURRENCY, PROFILE_MVS, ADVISE_INDEXES, CREATE_SOURCE_INDEXES
+    global START_FROM_MV, FORCE_MVS, SKIP_UNCHANGED_VIEWS, DB_SETTINGS, STAT_WIDE_LAYOUT
+    global PARTITION_SPORTS
+
+    wide_mvs = {"mv_tp_athletes_wide", "mv_college_athletes_wide", "mv_hs_athletes_wide", "mv_juco_athletes_wide"}
+    if PARTITIONED_WIDE_MVS - wide_mvs:
+        raise ValueError(f"only the athlete wide MVs can be partitioned: {', '.join(sorted(PARTITIONED_WIDE_MVS - wide_mvs))}")
+    if args.sport:
+        suffixes = {config["suffix"] for config in view_configs} | {"other"}
+        unknown = [suffix for suffix in args.sport if suffix not in suffixes]
+        if unknown:
+            raise ValueError(f"unknown sport: {', '.join(unknown)} (expected one of {', '.join(sorted(suffixes))})")
+        PARTITION_SPORTS = set(args.sport)
+    if args.dsn:
+        DB_SETTINGS = {"dsn": args.dsn}
+    if args.mode:
+        MV_BUILD_MODE = args.mode
+    if MV_BUILD_MODE != "rebuild" and "crosstab" in {PIVOT_STRATEGY, *MV_PIVOT_STRATEGIES.values()}:
+        raise ValueError(f"the crosstab pivot strategy needs --mode rebuild, not {MV_BUILD_MODE}")
+    if args.concurrency:
+        MV_BUILD_CONCURRENCY = args.concurrency
+    if args.stat_layout:
+        STAT_WIDE_LAYOUT = args.stat_layout
+    if args.profile:
+        PROFILE_MVS = True
+    if args.advise_indexes:
+        ADVISE_INDEXES = True
+    if not args.targets:
+        if args.force:
+            FORCE_MVS = {name for name in CORE_MVS if mv_enabled(name)}
+            SKIP_UNCHANGED_VIEWS = False
+        return None, None
+
+    view_groups = view_statements_by_group()
+    mv_targets, view_names = resolve_targets(args.targets, view_groups)
+
+    # Upstream MVs are candidates only; the fingerprints decide which of them are stale
+    candidates = upstream_closure(mv_targets, MV_DEPENDENCIES)
+    for mv_name in CORE_MVS:
+        BUILD_MVS[mv_name] = mv_name in candidates
+    START_FROM_MV = None
+    CREATE_SOURCE_INDEXES = "source_indexes" in args.targets
+    if args.force:
+        FORCE_MVS = set(mv_targets)
+        SKIP_UNCHANGED_VIEWS = not view_names
+    select_target_views(view_names, [], view_groups)
+    return view_names, view_groups
+
+
+def print_build_plan(view_names, view_groups):
+    """Print what a run with the current configuration would build (for `--dry-run`)."""
+    mv_names, _ = select_mvs_to_build(build_mv_statements(), dry_run=True)
+    safe_print(f"\n[PLAN] Build mode: {MV_BUILD_MODE}")
+    safe_print(f"[PLAN] Source table indexes: {'yes' if CREATE_SOURCE_INDEXES else 'no'}")
+    safe_print(f"[PLAN] MVs to build ({len(mv_names)}): {', '.join(mv_names) or 'none'}")
+
+    if view_groups is None:
+        view_groups = view_statements_by_group()
+        views = [name for group, group_views in view_groups.items() if BUILD_VIEWS.get(group) for name in group_views]
+    else:
+        select_target_views(view_names, mv_names, view_groups)
+        views = [name for group_views in view_groups.values() for name in group_views if name in VIEW_TARGETS]
+    safe_print(f"[PLAN] Views to issue if changed ({len(views)}): {', '.join(views) or 'none'}")
+
+
+def main(argv=None):
     """Main execution function."""
+    args = parse_args(argv)
+    try:
+        view_names, view_groups = apply_args(args)
+    except ValueError as e:
+        raise SystemExit(f"clean_db_builder: {e}")
     start_time = datetime.datetime.now()
     safe_print(f"== Clean DB Builder starting @ {start_time.isoformat()} ==")
+    build_report.started_at = start_time
+    status = "failed"
 
     try:
         # Test connection first
         test_connection()
 
+        if PROFILE_MVS:
+            safe_print("\n[PROFILE] Profiling MV definitions (nothing is built)...")
+            profile_materialized_views()
+            status = "ok"
+            return
+
+        if ADVISE_INDEXES:
+            safe_print("\n[ADVISOR] Advising MV indexes from pg_stat_statements (nothing is built)...")
+            advise_indexes()
+            status = "ok"
+            return
+
+        if args.dry_run:
+            print_build_plan(view_names, view_groups)
+            status = "ok"
+            return
+
+        build_journal.start(BUILD_JOURNAL_PATH, resume=args.resume)
         step_num = 1
+        built_mvs = []
 
         # Step 1: Create source table indexes (if enabled)
         if CREATE_SOURCE_INDEXES:
@@ -2403,14 +4454,19 @@ def main():
         # Step 2: Create materialized views (if any are enabled)
         if any(BUILD_MVS.values()):
             safe_print(f"\n[STEP {step_num}] Creating materialized views...")
-            create_materialized_views()
+            built_mvs = create_materialized_views()
             step_num += 1
         else:
             safe_print("\n[SKIP] Materialized views (all disabled in BUILD_MVS)")
 
+        if view_groups is not None:
+            # Targeted run: the requested views plus those reading a rebuilt MV
+            select_target_views(view_names, built_mvs, view_groups)
+
         # Step 3: Create views (based on BUILD_VIEWS configuration)
         if any(BUILD_VIEWS.values()):
             safe_print(f"\n[STEP {step_num}] Creating views...")
+            create_entitlement_lookup()
 
             if BUILD_VIEWS.get("public_views", False):
                 safe_print("[VIEWS] Creating public views...")
@@ -2434,10 +4490,20 @@ def main():
         duration = end_time - start_time
         safe_print(f"\n== Clean DB Builder completed @ {end_time.isoformat()} ==")
         safe_print(f"Total duration: {duration}")
+        build_journal.finish()
+        status = "ok"
 
     except Exception as e:
         safe_print(f"\n[ERROR] Build failed: {e}")
         raise
+    finally:
+        close_pool()
+        if BUILD_REPORT_DIR and not args.dry_run:
+            report_path = build_report.write(BUILD_REPORT_DIR, status)
+            slowest = list(build_report.totals_by_target().items())[:5]
+            for target, total in slowest:
+                safe_print(f"  {target}: {total['elapsed_s']:.1f}s over {total['statements']} statements")
+            safe_print(f"Build report written to {report_path}")
 
 
 if __name__ == "__main__":